@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Aineko's advice: Monte Carlo tree search hints for Accelerando: Lobsters
+
+When Aineko offers advice, the advisor looks ahead from the current state
+and recommends the option that wins most often. Each search iteration
+walks down the tree choosing options by UCB1, samples the game's own
+randomness (the option's roll and bonus, the next turn's regeneration and
+event draw), and when it reaches a state it has not seen, plays the rest
+of the game out with random choices. The result, victory or not, is
+credited to every (state, option) on the path.
+
+Search states are stat vectors: every move builds a new vector and never
+changes the old one, so states are persistent snapshots and forking one
+for a branch costs nothing. Tree nodes are interned by (stat vector,
+event), so the same state reached by different paths shares one set of
+statistics.
+
+The search is anytime and runs against a wall-clock deadline (50 ms by
+default): the hint is the option visited most when time runs out, however
+many iterations that allowed. The game server runs it in slices between
+other sessions' work, so a hint never stalls the event loop.
+
+Usage:
+    python3 advisor.py --budget 50 --hints 200
+    python3 advisor.py --budget 5 --games 100
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from math import log, sqrt
+
+import event_table
+from event_table import FIELD_INDEX, play_choice, regenerate
+from rules import DEFAULT_RULES
+from scheduler import EventScheduler
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # The game imports this module; typing costs milliseconds of startup
+    from typing import Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUDGET = 0.05        # Seconds per hint
+DEFAULT_EXPLORATION = 0.7    # UCB1 constant; rewards are 0 or 1
+DEFAULT_HORIZON = 60         # Turns looked ahead before a game counts as not won
+TURN = FIELD_INDEX["turn"]
+
+
+class Hint:
+    """The advisor's recommendation and the statistics behind it"""
+
+    __slots__ = ("event", "choice", "visits", "wins", "iterations", "nodes", "elapsed")
+
+    def __init__(self, event: str, visits: List[int], wins: List[float],
+                 iterations: int, nodes: int, elapsed: float):
+        self.event = event
+        self.visits = visits   # Per option, searches through it
+        self.wins = wins       # Per option, searches through it that were won
+        self.iterations = iterations
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.choice = max(range(len(visits)), key=lambda index: (visits[index],
+                                                                 wins[index])) + 1
+
+    def win_rate(self, choice: int) -> float:
+        visits = self.visits[choice - 1]
+        return self.wins[choice - 1] / visits if visits else 0.0
+
+    def __repr__(self) -> str:
+        return (f"Hint({self.event!r}, choice={self.choice}, "
+                f"win_rate={self.win_rate(self.choice):.3f}, iterations={self.iterations})")
+
+
+class _Node:
+    """Statistics of one decision: a stat vector with an event to play"""
+
+    __slots__ = ("options", "visits", "counts", "wins")
+
+    def __init__(self, options: tuple):
+        self.options = options
+        self.visits = 0
+        self.counts = [0] * len(options)
+        self.wins = [0.0] * len(options)
+
+    def select(self, exploration: float) -> int:
+        counts = self.counts
+        if 0 in counts:
+            return counts.index(0)
+        scale = exploration * sqrt(log(self.visits))
+        wins = self.wins
+        best, best_score = 0, -1.0
+        for index, count in enumerate(counts):
+            score = wins[index] / count + scale / sqrt(count)
+            if score > best_score:
+                best, best_score = index, score
+        return best
+
+
+class Search:
+    """One anytime search from a decision; run() may be called repeatedly"""
+
+    def __init__(self, advisor: "Advisor", vector: Sequence[int], event: str):
+        self.advisor = advisor
+        self.event = event
+        self.start_turn = vector[TURN]
+        self.key = (tuple(vector), event)
+        self.nodes: Dict[tuple, _Node] = {}  # Interned by (stat vector, event)
+        self.root = self._node(self.key)
+        self.iterations = 0
+        self.elapsed = 0.0
+
+    def _node(self, key: tuple) -> _Node:
+        node = _Node(self.advisor.options(key[1]))
+        self.nodes[key] = node
+        return node
+
+    def run(self, until: Optional[float] = None, iterations: Optional[int] = None) -> int:
+        """Search until time.perf_counter() reaches `until` or for `iterations`"""
+        clock = time.perf_counter
+        started = clock()
+        done = 0
+        while (iterations is None or done < iterations) and (until is None or clock() < until):
+            self._iterate()
+            done += 1
+        self.iterations += done
+        self.elapsed += clock() - started
+        return done
+
+    def hint(self) -> Hint:
+        root = self.root
+        return Hint(self.event, list(root.counts), list(root.wins), self.iterations,
+                    len(self.nodes), self.elapsed)
+
+    def _iterate(self):
+        advisor, nodes, rng = self.advisor, self.nodes, self.advisor.rng
+        first, draw = advisor.rules.first, advisor.scheduler.draw
+        exploration, last_turn = advisor.exploration, self.start_turn + advisor.horizon
+        vector, node = self.key[0], self.root
+        path: List[Tuple[_Node, int]] = []
+        while True:
+            index = node.select(exploration)
+            path.append((node, index))
+            vector = play_choice(node.options[index], vector, rng)[0]
+            rule = first(vector)
+            if rule is not None:
+                reward = 1.0 if rule.victory else 0.0
+                break
+            if vector[TURN] >= last_turn:
+                reward = 0.0
+                break
+            vector = regenerate(vector, rng)
+            key = (tuple(vector), draw(vector, rng))
+            child = nodes.get(key)
+            if child is None:
+                self._node(key)
+                reward = self._rollout(vector, key[1], last_turn)
+                break
+            node = child
+        for node, index in path:
+            node.visits += 1
+            node.counts[index] += 1
+            node.wins[index] += reward
+
+    def _rollout(self, vector: List[int], event: str, last_turn: int) -> float:
+        advisor, rng = self.advisor, self.advisor.rng
+        first, draw, options = advisor.rules.first, advisor.scheduler.draw, advisor.options
+        while True:
+            choices = options(event)
+            vector = play_choice(choices[rng.randrange(len(choices))], vector, rng)[0]
+            rule = first(vector)
+            if rule is not None:
+                return 1.0 if rule.victory else 0.0
+            if vector[TURN] >= last_turn:
+                return 0.0
+            vector = regenerate(vector, rng)
+            event = draw(vector, rng)
+
+
+class Advisor:
+    """Recommends options by time-boxed Monte Carlo tree search
+
+    The advisor draws from its own RNG, never the game's, so asking for
+    hints does not change how a seeded game plays out.
+    """
+
+    def __init__(self, catalog=None, rules=None, budget: float = DEFAULT_BUDGET,
+                 seed=None, exploration: float = DEFAULT_EXPLORATION,
+                 horizon: int = DEFAULT_HORIZON, events: Sequence[str] = ("aineko_advice",)):
+        self.catalog = catalog or event_table.BUILTIN
+        self.rules = rules or DEFAULT_RULES
+        self.scheduler = EventScheduler(self.catalog)
+        self.budget = budget
+        self.rng = random.Random(seed)
+        self.exploration = exploration
+        self.horizon = horizon
+        self.events = frozenset(events)  # Events the game shows hints for
+        self._options: Dict[str, tuple] = {}
+
+    def options(self, event: str) -> tuple:
+        """The choices of an event, decoded once"""
+        options = self._options.get(event)
+        if options is None:
+            options = self._options[event] = self.catalog.event(event).choices
+        return options
+
+    def search(self, vector: Sequence[int], event: str) -> Search:
+        """A search from a decision, to run in slices"""
+        return Search(self, vector, event)
+
+    def advise(self, vector: Sequence[int], event: str,
+               budget: Optional[float] = None, iterations: Optional[int] = None) -> Hint:
+        """Search for `budget` seconds (or `iterations`) and return the hint"""
+        search = Search(self, vector, event)
+        if iterations is not None:
+            search.run(iterations=iterations)
+        else:
+            search.run(until=time.perf_counter() + (self.budget if budget is None else budget))
+        return search.hint()
+
+    def describe(self, hint: Hint) -> str:
+        """Aineko's line for a hint"""
+        label = self.options(hint.event)[hint.choice - 1].label
+        return (f"\n🐱 Aineko's tail twitches toward option {hint.choice} ({label}): "
+                f"it won {hint.win_rate(hint.choice):.0%} of the "
+                f"{hint.visits[hint.choice - 1]:,} futures Aineko explored.")
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    from accelerando_game import GameState
+    from rng import RngStream
+    from simulator import DEFAULT_MAX_TURNS, random_policy
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET * 1000,
+                        help="milliseconds per hint")
+    parser.add_argument("--hints", type=int, default=100,
+                        help="hints to time from random mid-game states")
+    parser.add_argument("--games", type=int, default=0,
+                        help="also play this many games taking every hint")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    budget = args.budget / 1000
+
+    advisor = Advisor(budget=budget, seed=args.seed)
+    rng = RngStream(args.seed)
+    policy = random_policy(args.seed)
+    latencies, iterations, nodes = [], [], []
+    state = GameState()
+    vector = state.vector()
+    for _ in range(args.hints):
+        vector = regenerate(vector, rng)
+        event = advisor.scheduler.draw(vector, rng)
+        start = time.perf_counter()
+        hint = advisor.advise(vector, event)
+        latencies.append(time.perf_counter() - start)
+        iterations.append(hint.iterations)
+        nodes.append(hint.nodes)
+        state.set_vector(vector)
+        options = advisor.options(event)
+        vector = play_choice(options[policy(state, event, len(options)) - 1], vector, rng)[0]
+        if advisor.rules.first(vector) is not None:
+            vector = GameState().vector()
+    if latencies:
+        count = len(latencies)
+        print(f"{count} hints at {args.budget:g} ms: {sum(iterations) / count:,.0f} "
+              f"iterations and {sum(nodes) / count:,.0f} interned nodes per hint, "
+              f"{sum(iterations) / sum(latencies):,.0f} iterations/sec")
+        print(f"Latency p50 {_percentile(latencies, 50) * 1e3:.1f} ms, "
+              f"p99 {_percentile(latencies, 99) * 1e3:.1f} ms, "
+              f"max {max(latencies) * 1e3:.1f} ms")
+
+    if args.games:
+        won = turns = 0
+        for _ in range(args.games):
+            vector = GameState().vector()
+            while vector[TURN] < DEFAULT_MAX_TURNS:
+                vector = regenerate(vector, rng)
+                event = advisor.scheduler.draw(vector, rng)
+                choice = advisor.advise(vector, event).choice
+                vector = play_choice(advisor.options(event)[choice - 1], vector, rng)[0]
+                rule = advisor.rules.first(vector)
+                if rule is not None:
+                    won += rule.victory
+                    break
+            turns += vector[TURN]
+        print(f"Following every hint: won {won}/{args.games} ({won / args.games:.1%}), "
+              f"mean {turns / args.games:.1f} turns")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Streaming balance analytics for Accelerando: Lobsters
+
+Consumes finished games as a stream and keeps only fixed-size aggregates,
+so memory stays constant however many games a balance run plays:
+
+- outcome counts: victories, defeats by cause (the rule that ended the
+  game, as display_defeat shows it) and timeouts
+- integer histograms, with mean and quantiles, of turns to victory,
+  turns to defeat, final reputation and final dead kittens
+- per event and choice: the games it was played in, how many of those
+  were won, and its lift, the win rate when played minus the overall one
+
+A run is split into the same independently seeded chunks as parallel.py,
+which can run on a process pool and are merged in order. With
+--checkpoint, the aggregates and the index of the next chunk are written
+atomically whenever --interval seconds have passed at a chunk boundary,
+and once more at the end. Rerunning the same command resumes from the
+checkpoint and ends with the same result as an uninterrupted run.
+
+Usage:
+    python3 analytics.py --games 10000000 --seed 42 --checkpoint balance.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from accelerando_game import GameState
+from journal import atomic_write
+from parallel import DEFAULT_CHUNK_SIZE, Chunk, plan_chunks
+from rng import RngStream
+from rules import DEFAULT_RULES
+from simulator import DEFAULT_MAX_TURNS, POLICIES, Policy, play_table_game
+
+
+DEFAULT_INTERVAL = 60.0
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Histogram ranges; values outside are counted as below/above
+DISTRIBUTIONS = {
+    "turns_to_victory": (0, DEFAULT_MAX_TURNS),
+    "turns_to_defeat": (0, DEFAULT_MAX_TURNS),
+    "final_reputation": (-100, 400),
+    "final_dead_kittens": (0, 100),
+}
+
+
+class FinishedGame(NamedTuple):
+    """One game as the analytics stream sees it"""
+    state: GameState
+    moves: List[Tuple[str, int]]  # (event, choice) per turn
+
+
+class Histogram:
+    """Counts of integer values in [low, high], with out-of-range tallies"""
+
+    def __init__(self, low: int, high: int):
+        self.low = low
+        self.high = high
+        self.counts = [0] * (high - low + 1)
+        self.below = 0
+        self.above = 0
+        self.count = 0
+        self.total = 0
+        self.minimum: Optional[int] = None
+        self.maximum: Optional[int] = None
+
+    def add(self, value: int):
+        if value < self.low:
+            self.below += 1
+        elif value > self.high:
+            self.above += 1
+        else:
+            self.counts[value - self.low] += 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "Histogram"):
+        if (other.low, other.high) != (self.low, self.high):
+            raise ValueError("Histograms with different ranges cannot be merged")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.below += other.below
+        self.above += other.above
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> Optional[int]:
+        """Nearest-rank quantile; exact while values stay inside the range"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = self.below
+        if rank <= seen:
+            return self.minimum
+        for offset, count in enumerate(self.counts):
+            seen += count
+            if rank <= seen:
+                return self.low + offset
+        return self.maximum
+
+    def to_dict(self) -> dict:
+        return {"low": self.low, "high": self.high, "counts": self.counts,
+                "below": self.below, "above": self.above, "count": self.count,
+                "total": self.total, "minimum": self.minimum, "maximum": self.maximum}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls(data["low"], data["high"])
+        for name in ("counts", "below", "above", "count", "total", "minimum", "maximum"):
+            setattr(histogram, name, data[name])
+        return histogram
+
+
+class BalanceAnalytics:
+    """Constant-memory aggregates over a stream of finished games"""
+
+    def __init__(self):
+        self.games = 0
+        self.outcomes: Counter = Counter()  # "victory", a defeat cause or "timeout"
+        self.histograms = {name: Histogram(low, high)
+                           for name, (low, high) in DISTRIBUTIONS.items()}
+        # (event, choice) -> [games played in, games won, times played]
+        self.choices: Dict[Tuple[str, int], List[int]] = {}
+
+    def add(self, game: FinishedGame):
+        """Fold one finished game into the aggregates"""
+        state = game.state
+        histograms = self.histograms
+        self.games += 1
+        won = state.victory
+        if won:
+            outcome = "victory"
+            histograms["turns_to_victory"].add(state.turn)
+        else:
+            outcome = DEFAULT_RULES.cause(state) or "timeout"
+            if outcome != "timeout":
+                histograms["turns_to_defeat"].add(state.turn)
+        self.outcomes[outcome] += 1
+        histograms["final_reputation"].add(state.reputation)
+        histograms["final_dead_kittens"].add(state.dead_kittens)
+
+        choices = self.choices
+        for move, plays in Counter(game.moves).items():
+            entry = choices.get(move)
+            if entry is None:
+                entry = choices[move] = [0, 0, 0]
+            entry[0] += 1
+            entry[1] += won
+            entry[2] += plays
+
+    def consume(self, games: Iterable[FinishedGame]) -> "BalanceAnalytics":
+        """Fold a stream of games; returns self"""
+        add = self.add
+        for game in games:
+            add(game)
+        return self
+
+    def merge(self, other: "BalanceAnalytics"):
+        """Fold another aggregate into this one"""
+        self.games += other.games
+        self.outcomes.update(other.outcomes)
+        for name, histogram in other.histograms.items():
+            self.histograms[name].merge(histogram)
+        for move, (games, wins, plays) in other.choices.items():
+            entry = self.choices.setdefault(move, [0, 0, 0])
+            entry[0] += games
+            entry[1] += wins
+            entry[2] += plays
+
+    @property
+    def win_rate(self) -> float:
+        return self.outcomes["victory"] / self.games if self.games else 0.0
+
+    def contributions(self) -> List[Tuple[str, int, float, float, float]]:
+        """(event, choice, share of games played in, win rate when played, lift)"""
+        rows = []
+        for (event, choice), (games, wins, _) in sorted(self.choices.items()):
+            rate = wins / games
+            rows.append((event, choice, games / self.games, rate, rate - self.win_rate))
+        return rows
+
+    def to_dict(self) -> dict:
+        choices: Dict[str, Dict[str, List[int]]] = {}
+        for (event, choice), entry in sorted(self.choices.items()):
+            choices.setdefault(event, {})[str(choice)] = entry
+        return {"games": self.games, "outcomes": dict(self.outcomes),
+                "histograms": {name: histogram.to_dict()
+                               for name, histogram in self.histograms.items()},
+                "choices": choices}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BalanceAnalytics":
+        analytics = cls()
+        analytics.games = data["games"]
+        analytics.outcomes = Counter(data["outcomes"])
+        analytics.histograms = {name: Histogram.from_dict(histogram)
+                                for name, histogram in data["histograms"].items()}
+        analytics.choices = {(event, int(choice)): entry
+                             for event, entries in data["choices"].items()
+                             for choice, entry in entries.items()}
+        return analytics
+
+    def report(self, top: int = 5) -> str:
+        lines = [f"Games: {self.games}",
+                 f"Victories: {self.outcomes['victory']} ({self.win_rate:.2%})"]
+        for cause in DEFAULT_RULES.causes:
+            lines.append(f"Defeats ({cause}): {self.outcomes[cause]}")
+        lines.append(f"Timeouts: {self.outcomes['timeout']}")
+        for name, histogram in self.histograms.items():
+            quantiles = ", ".join(f"p{q * 100:g} {histogram.quantile(q)}" for q in QUANTILES)
+            lines.append(f"{name}: n={histogram.count}, mean {histogram.mean:.1f}, "
+                         f"{quantiles}, max {histogram.maximum}")
+        rows = sorted(self.contributions(), key=lambda row: row[4], reverse=True)
+        if len(rows) > 2 * top:
+            rows = rows[:top] + rows[-top:]
+        if rows:
+            lines.append("Choices by win-rate lift (played in / win rate / lift):")
+            for event, choice, share, rate, lift in rows:
+                lines.append(f"  {event} {choice}: {share:6.1%} / {rate:6.1%} / "
+                             f"{lift * 100:+.1f} pp")
+        return "\n".join(lines)
+
+
+def finished_games(games: int, policy: Policy, rng,
+                   max_turns: int = DEFAULT_MAX_TURNS) -> Iterator[FinishedGame]:
+    """Play `games` table games, yielding each as it finishes"""
+    for _ in range(games):
+        moves: List[Tuple[str, int]] = []
+        state = play_table_game(policy, max_turns, rng, moves)
+        yield FinishedGame(state, moves)
+
+
+def analyse_chunk(chunk: Chunk) -> BalanceAnalytics:
+    """Aggregate one chunk; plays the same games as parallel.run_chunk's table engine"""
+    games = finished_games(chunk.games, POLICIES[chunk.policy](chunk.seed),
+                           RngStream(chunk.seed), chunk.max_turns)
+    return BalanceAnalytics().consume(games)
+
+
+def save_checkpoint(path: str, job: dict, next_chunk: int, analytics: BalanceAnalytics):
+    atomic_write(path, json.dumps({"job": job, "next_chunk": next_chunk,
+                                   "analytics": analytics.to_dict()}))
+
+
+def load_checkpoint(path: str, job: dict) -> Tuple[int, BalanceAnalytics]:
+    """The next chunk and the aggregates saved for `job`"""
+    with open(path) as f:
+        data = json.load(f)
+    if data["job"] != job:
+        raise ValueError(f"{path} is a checkpoint of a different job: {data['job']}")
+    return data["next_chunk"], BalanceAnalytics.from_dict(data["analytics"])
+
+
+def _analysed(chunks: List[Chunk], workers: int) -> Iterator[BalanceAnalytics]:
+    # Results in chunk order, with at most two chunks per worker in flight
+    if workers <= 1 or len(chunks) <= 1:
+        yield from map(analyse_chunk, chunks)
+        return
+    queued = iter(chunks)
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        try:
+            for chunk in queued:
+                pending.append(pool.submit(analyse_chunk, chunk))
+                if len(pending) == 2 * workers:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                for chunk in queued:
+                    pending.append(pool.submit(analyse_chunk, chunk))
+                    break
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def run_analysis(games: int, seed: int, policy: str = "random",
+                 max_turns: int = DEFAULT_MAX_TURNS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 workers: int = 1, checkpoint: Optional[str] = None,
+                 interval: float = DEFAULT_INTERVAL,
+                 stop_after: Optional[int] = None) -> BalanceAnalytics:
+    """Analyse a job chunk by chunk, resuming from and writing `checkpoint`
+
+    `stop_after` ends the run after that many chunks, as an interruption
+    would; the checkpoint then covers exactly those chunks.
+    """
+    chunks = plan_chunks(games, seed, policy, "table", max_turns, chunk_size)
+    job = {"games": games, "seed": seed, "policy": policy, "max_turns": max_turns,
+           "chunk_size": chunk_size}
+    start, analytics = 0, BalanceAnalytics()
+    if checkpoint is not None and os.path.exists(checkpoint):
+        start, analytics = load_checkpoint(checkpoint, job)
+    remaining = chunks[start:]
+    if stop_after is not None:
+        remaining = remaining[:stop_after]
+
+    saved = time.monotonic()
+    for chunk, result in zip(remaining, _analysed(remaining, workers)):
+        analytics.merge(result)
+        if checkpoint is not None and time.monotonic() - saved >= interval:
+            save_checkpoint(checkpoint, job, chunk.index + 1, analytics)
+            saved = time.monotonic()
+    if checkpoint is not None and remaining:
+        save_checkpoint(checkpoint, job, remaining[-1].index + 1, analytics)
+    return analytics
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="job seed (default: random, printed so the run can resume)")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", default=None, metavar="FILE",
+                        help="resume from and periodically save to this file")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="seconds between checkpoints")
+    parser.add_argument("--out", default=None, help="write the aggregates as JSON")
+    args = parser.parse_args()
+
+    seed = args.seed
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+        print(f"Seed: {seed}")
+    start = time.perf_counter()
+    analytics = run_analysis(args.games, seed, args.policy, args.max_turns,
+                             args.chunk_size, args.workers, args.checkpoint, args.interval)
+    elapsed = time.perf_counter() - start
+    print(analytics.report())
+    print(f"Elapsed: {elapsed:.1f}s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(analytics.to_dict(), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
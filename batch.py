@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Batched game state for Accelerando: Lobsters
+
+BatchState holds the 12 GameState fields of N games as contiguous integer
+arrays (a NumPy matrix with one row per field when NumPy is installed, one
+array.array per field otherwise). BatchSimulator advances every live game
+one turn per step: resource regeneration, event draw, outcome application
+from the compiled event table, and the win/lose masks from the compiled
+rules of rules.py, the same rules check_win_condition and
+check_lose_condition use.
+
+Usage:
+    python3 batch.py --games 1000000 --seed 42
+"""
+
+import argparse
+import time
+from array import array
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from accelerando_game import GameState, defeat_reached, victory_reached
+from rules import DEFAULT_RULES
+from event_table import (EVENT_NAMES, EVENTS, FIELD_INDEX, REGENERATION,
+                         ROLL_SIDES, STAT_FIELDS, TURN_DELTA, play, regenerate)
+from rng import RngStream
+from simulator import DEFAULT_MAX_TURNS, SimulationResult
+
+
+FIELDS = STAT_FIELDS + ("game_over", "victory")
+STATS = len(STAT_FIELDS)
+TURN = FIELD_INDEX["turn"]
+GAME_OVER = FIELDS.index("game_over")
+VICTORY = FIELDS.index("victory")
+
+# Outcome slots of a compiled choice
+SUCCESS, FAILURE, UNMET = 0, 1, 2
+
+# Live games are stepped in 32-bit integers; BatchState keeps 64-bit columns
+WORK_DTYPE = np.int32 if np is not None else None
+
+CHOICE_COUNTS = tuple(len(EVENTS[name].choices) for name in EVENT_NAMES)
+
+# A batch policy receives the live games' stats (attribute access by field
+# name, one sequence per field), their event indices into EVENT_NAMES and
+# the RNG, and returns one 1-based choice per live game. Under NumPy the
+# sequences are integer arrays.
+BatchPolicy = Callable[[object, Sequence[int], object], Sequence[int]]
+
+
+class BatchState:
+    """The fields of N games as one contiguous integer array per field"""
+
+    def __init__(self, size: int, use_numpy: Optional[bool] = None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+        self.size = size
+        self.uses_numpy = use_numpy
+        defaults = GameState()
+        initial = [int(getattr(defaults, name)) for name in FIELDS]
+        if use_numpy:
+            self.columns = np.empty((len(FIELDS), size), dtype=np.int64)
+            self.columns[:] = np.array(initial, dtype=np.int64)[:, None]
+        else:
+            self.columns = [array("q", [value]) * size for value in initial]
+
+    @classmethod
+    def from_states(cls, states: Sequence[GameState],
+                    use_numpy: Optional[bool] = None) -> "BatchState":
+        """Build a batch from individual game states"""
+        batch = cls(len(states), use_numpy)
+        for index, state in enumerate(states):
+            batch.set_state(index, state)
+        return batch
+
+    def __len__(self) -> int:
+        return self.size
+
+    def state(self, index: int) -> GameState:
+        """Copy one game out of the batch"""
+        values = [int(column[index]) for column in self.columns]
+        values[GAME_OVER] = bool(values[GAME_OVER])
+        values[VICTORY] = bool(values[VICTORY])
+        return GameState(*values)
+
+    def set_state(self, index: int, state: GameState):
+        """Copy one game into the batch"""
+        for column, name in zip(self.columns, FIELDS):
+            column[index] = int(getattr(state, name))
+
+
+def _field_property(position: int):
+    return property(lambda self: self.columns[position],
+                    doc=f"Column of {FIELDS[position]} values")
+
+
+for _position, _name in enumerate(FIELDS):
+    setattr(BatchState, _name, _field_property(_position))
+
+
+class _StatView:
+    """Attribute access to the rows of a stat matrix (or items of a vector)"""
+    __slots__ = ("rows",)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return self.rows[FIELD_INDEX[name]]
+
+
+class _CompiledTable:
+    """The event table as dense NumPy arrays
+
+    Choices are numbered event * width + choice and outcomes
+    choice * 3 + slot, so each lookup is a single gather.
+    """
+
+    def __init__(self):
+        events, width = len(EVENT_NAMES), max(CHOICE_COUNTS)
+        choices, outcomes = events * width, events * width * 3
+        required = sorted({index for name in EVENT_NAMES
+                           for spec in EVENTS[name].choices
+                           for index, _ in spec.requires})
+        floor = np.iinfo(WORK_DTYPE).min
+        self.width = width
+        self.choice_counts = np.array(CHOICE_COUNTS, dtype=np.int64)
+        self.turn_delta = [(index, value) for index, value in enumerate(TURN_DELTA)
+                           if value]
+        self.regen_fields = [index for index, _, _ in REGENERATION]
+        self.regen_low = np.array([low for _, low, _ in REGENERATION], dtype=WORK_DTYPE)
+        self.regen_high = np.array([high for _, _, high in REGENERATION], dtype=WORK_DTYPE)
+        self.required_fields = required
+        self.requires = np.full((choices, len(required)), floor, dtype=WORK_DTYPE)
+        self.roll = np.zeros(choices, dtype=WORK_DTYPE)
+        self.delta = np.zeros((outcomes, STATS), dtype=WORK_DTYPE)
+        self.keep = np.ones((outcomes, STATS), dtype=WORK_DTYPE)
+        self.resets = np.zeros(outcomes, dtype=bool)
+        self.bonus_field = np.full(outcomes, -1, dtype=np.int64)
+        self.bonus_low = np.zeros(outcomes, dtype=WORK_DTYPE)
+        self.bonus_high = np.zeros(outcomes, dtype=WORK_DTYPE)
+        for e, name in enumerate(EVENT_NAMES):
+            for c, spec in enumerate(EVENTS[name].choices):
+                key = e * width + c
+                for index, minimum in spec.requires:
+                    self.requires[key, required.index(index)] = minimum
+                if spec.roll is not None:
+                    self.roll[key] = spec.roll
+                slots = (spec.success, spec.failure, spec.unmet)
+                for slot, outcome in enumerate(slots):
+                    outcome = outcome or spec.success
+                    row = key * 3 + slot
+                    self.delta[row] = outcome.delta
+                    if outcome.reset:
+                        self.keep[row, list(outcome.reset)] = 0
+                        self.resets[row] = True
+                    if outcome.bonus is not None:
+                        index, low, high = outcome.bonus
+                        self.bonus_field[row] = index
+                        self.bonus_low[row] = low
+                        self.bonus_high[row] = high
+
+
+_tables: Optional[_CompiledTable] = None
+
+
+def regenerate_rows(work, tables: _CompiledTable, rng):
+    """Start a turn for every row of a (games, STATS) matrix, in place"""
+    for index, value in tables.turn_delta:
+        work[:, index] += value
+    regen = rng.integers(tables.regen_low, tables.regen_high,
+                         (len(work), len(tables.regen_fields)),
+                         dtype=WORK_DTYPE, endpoint=True)
+    for column, index in enumerate(tables.regen_fields):
+        work[:, index] += regen[:, column]
+
+
+def resolve_rows(work, keys, tables: _CompiledTable, rng):
+    """Play compiled choice `keys` (event * width + choice) against each row, in place"""
+    minimums = tables.requires[keys]
+    unmet = work[:, tables.required_fields[0]] < minimums[:, 0]
+    for column, index in enumerate(tables.required_fields[1:], 1):
+        unmet |= work[:, index] < minimums[:, column]
+    failed = rng.integers(1, ROLL_SIDES + 1, len(work)) <= tables.roll[keys]
+    outcomes = keys * 3 + np.where(unmet, UNMET, np.where(failed, FAILURE, SUCCESS))
+
+    work += tables.delta[outcomes]
+    bonus_field = tables.bonus_field[outcomes]
+    bonus = np.flatnonzero(bonus_field >= 0)
+    if bonus.size:
+        rows = outcomes[bonus]
+        work[bonus, bonus_field[bonus]] += rng.integers(
+            tables.bonus_low[rows], tables.bonus_high[rows] + 1)
+    reset = np.flatnonzero(tables.resets[outcomes])
+    if reset.size:
+        work[reset] *= tables.keep[outcomes[reset]]
+
+
+def _compiled() -> _CompiledTable:
+    global _tables
+    if _tables is None:
+        _tables = _CompiledTable()
+    return _tables
+
+
+def random_choices(stats, events, rng):
+    """Batch policy that picks uniformly among each event's options"""
+    if np is not None and isinstance(events, np.ndarray):
+        return rng.integers(1, _compiled().choice_counts[events] + 1)
+    return [rng.randint(1, CHOICE_COUNTS[event]) for event in events]
+
+
+def fixed_choices(table: Sequence[int]) -> BatchPolicy:
+    """Batch policy that always picks table[event] for each event index"""
+    table = tuple(table)
+    lookup = np.asarray(table) if np is not None else None
+
+    def policy(stats, events, rng):
+        if lookup is not None and isinstance(events, np.ndarray):
+            return lookup[events]
+        return [table[event] for event in events]
+    return policy
+
+
+# Named batch policies, mirroring simulator.POLICIES
+BATCH_POLICIES: Dict[str, BatchPolicy] = {
+    "random": random_choices,
+    "first": fixed_choices([1] * len(EVENT_NAMES)),
+    "cautious": fixed_choices([2] * len(EVENT_NAMES)),
+    "last": fixed_choices([4] * len(EVENT_NAMES)),
+}
+
+
+class BatchSimulator:
+    """Steps N independent games at once
+
+    Under NumPy the live games are kept in a compact working matrix with
+    one row per game; finished games are written back to `state` and
+    dropped from the working set, so later turns only touch live games.
+    """
+
+    def __init__(self, size: int, policy: Optional[BatchPolicy] = None,
+                 seed: Optional[int] = None,
+                 max_turns: int = DEFAULT_MAX_TURNS,
+                 use_numpy: Optional[bool] = None):
+        self._state = BatchState(size, use_numpy)
+        self.policy = policy or random_choices
+        self.max_turns = max_turns
+        if self._state.uses_numpy:
+            self.rng = np.random.default_rng(seed)
+            self.tables = _compiled()
+            self._active = None
+            self._work = None
+        else:
+            self.rng = RngStream(seed)
+
+    @property
+    def state(self) -> BatchState:
+        """The batch, with in-flight games written back"""
+        if self._state.uses_numpy and self._active is not None:
+            self._state.columns[:STATS, self._active] = self._work.T
+        return self._state
+
+    def step(self) -> int:
+        """Advance every live game one turn; returns how many were live"""
+        if self._state.uses_numpy:
+            return self._step_numpy()
+        return self._step_python()
+
+    def run(self) -> SimulationResult:
+        """Step until every game is over or out of turns"""
+        start = time.perf_counter()
+        while self.step():
+            pass
+        result = self.result()
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _step_numpy(self) -> int:
+        columns, tables, rng = self._state.columns, self.tables, self.rng
+        if self._active is None:
+            self._active = np.flatnonzero((columns[GAME_OVER] == 0)
+                                          & (columns[TURN] < self.max_turns))
+            self._work = columns[:STATS, self._active].T.astype(WORK_DTYPE, order="C")
+        active, work = self._active, self._work
+        count = active.size
+        if not count:
+            return 0
+
+        regenerate_rows(work, tables, rng)
+        view = _StatView(work.T)
+        events = rng.integers(0, len(EVENT_NAMES), count)
+        choices = np.asarray(self.policy(view, events, rng)) - 1
+        resolve_rows(work, events * tables.width + choices, tables, rng)
+
+        won = victory_reached(view)
+        lost = defeat_reached(view) & ~won
+        done = won | lost | (work[:, TURN] >= self.max_turns)
+        if done.any():
+            finished = active[done]
+            columns[:STATS, finished] = work[done].T
+            columns[VICTORY, active[won]] = 1
+            columns[GAME_OVER, active[won | lost]] = 1
+            keep = ~done
+            self._active = active[keep]
+            self._work = work[keep]
+        return count
+
+    def _step_python(self) -> int:
+        columns, rng = self._state.columns, self.rng
+        stat_columns = columns[:STATS]
+        over, turn = columns[GAME_OVER], columns[TURN]
+        live = [index for index in range(self._state.size)
+                if not over[index] and turn[index] < self.max_turns]
+        if not live:
+            return 0
+
+        vectors: List[List[int]] = []
+        events: List[int] = []
+        for index in live:
+            vectors.append(regenerate([column[index] for column in stat_columns], rng))
+            events.append(rng.randrange(len(EVENT_NAMES)))
+        choices = self.policy(_StatView(list(zip(*vectors))), events, rng)
+
+        victory, first = columns[VICTORY], DEFAULT_RULES.first
+        for index, vector, event, choice in zip(live, vectors, events, choices):
+            vector = play(EVENT_NAMES[event], choice, vector, rng)[0]
+            for column, value in zip(stat_columns, vector):
+                column[index] = value
+            rule = first(vector)
+            if rule is not None:
+                victory[index] = rule.victory
+                over[index] = 1
+        return len(live)
+
+    def result(self) -> SimulationResult:
+        """Aggregate the games without building GameState objects"""
+        state = self.state
+        result = SimulationResult()
+        if not state.uses_numpy:
+            for index in range(state.size):
+                result.record(state.state(index))
+            return result
+
+        columns = state.columns
+        won = columns[VICTORY] == 1
+        beaten = (columns[GAME_OVER] == 1) & ~won
+        result.games = state.size
+        result.victories = int(won.sum())
+        result.defeats = {cause: int(mask.sum()) for cause, mask in
+                          DEFAULT_RULES.defeat_masks(_StatView(columns), beaten).items()}
+        result.timeouts = (result.games - result.victories
+                           - sum(result.defeats.values()))
+        turns, counts = np.unique(columns[TURN], return_counts=True)
+        result.turns = Counter(dict(zip(turns.tolist(), counts.tolist())))
+        return result
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--policy", choices=sorted(BATCH_POLICIES), default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--no-numpy", action="store_true",
+                        help="use the array module backend")
+    args = parser.parse_args()
+
+    simulator = BatchSimulator(args.games, BATCH_POLICIES[args.policy],
+                               seed=args.seed, max_turns=args.max_turns,
+                               use_numpy=False if args.no_numpy else None)
+    print(simulator.run().summary())
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Accelerando: Lobsters
+
+Measures the engine's hot paths and writes the results as JSON:
+
+- play_turn: turns/sec through AccelerandoGame.play_turn, policy choices,
+  NullRenderer
+- event.<name>: microseconds per call of each event_* method
+- win_lose_checks: check_win_condition + check_lose_condition pairs/sec
+- save_game / load_game: milliseconds per call and bytes written
+- cold_start: milliseconds from launching accelerando_game.py to its
+  first menu prompt
+
+Each timing is the best of `--repeat` runs, which filters out scheduler
+noise. With --compare, results are checked against a stored baseline and
+any metric worse by more than --tolerance (a fraction) is reported as a
+regression, with exit status 1, so the suite can gate CI.
+
+Usage:
+    python3 benchmarks.py --out baseline.json
+    python3 benchmarks.py --compare baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import PolicyChoices
+from event_table import EVENT_NAMES
+from renderer import NullRenderer
+from rng import RngStream
+from simulator import random_policy
+
+
+DEFAULT_TOLERANCE = 0.10
+GAME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "accelerando_game.py")
+
+
+class Measurement(NamedTuple):
+    """One benchmark result"""
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+class Regression(NamedTuple):
+    """A metric that got worse than its baseline by more than the tolerance"""
+    name: str
+    baseline: float
+    value: float
+    change: float  # Fraction by which it got worse
+
+
+def best_of(repeat: int, run: Callable[[], float]) -> float:
+    """Smallest of `repeat` timings"""
+    return min(run() for _ in range(repeat))
+
+
+def _game(seed: int = 0) -> AccelerandoGame:
+    return AccelerandoGame(NullRenderer(), PolicyChoices(random_policy(seed)),
+                           rng=RngStream(seed))
+
+
+def bench_play_turn(scale: float, repeat: int) -> List[Measurement]:
+    turns = int(20000 * scale)
+
+    def run():
+        game = _game()
+        start = time.perf_counter()
+        for _ in range(turns):
+            if game.state.game_over:
+                game.state = GameState()
+            game.play_turn()
+        return time.perf_counter() - start
+
+    return [Measurement("play_turn", turns / best_of(repeat, run), "turns/sec", True)]
+
+
+def bench_events(scale: float, repeat: int) -> List[Measurement]:
+    calls = int(5000 * scale)
+    results = []
+    for name in EVENT_NAMES:
+        def run():
+            game = _game()
+            event = getattr(game, f"event_{name}")
+            start = time.perf_counter()
+            for _ in range(calls):
+                game.state = GameState()
+                event()
+            return time.perf_counter() - start
+
+        results.append(Measurement(f"event.{name}", best_of(repeat, run) / calls * 1e6,
+                                   "us/call", False))
+    return results
+
+
+def bench_win_lose_checks(scale: float, repeat: int) -> List[Measurement]:
+    checks = int(100000 * scale)
+    game = _game()
+    states = [GameState(reputation=value, singularity_progress=value, bandwidth=value % 50)
+              for value in range(100)]
+
+    def run():
+        win, lose = game.check_win_condition, game.check_lose_condition
+        start = time.perf_counter()
+        for index in range(checks):
+            game.state = states[index % 100]
+            win()
+            lose()
+        return time.perf_counter() - start
+
+    return [Measurement("win_lose_checks", checks / best_of(repeat, run), "checks/sec", True)]
+
+
+def bench_save_load(scale: float, repeat: int) -> List[Measurement]:
+    calls = max(1, int(200 * scale))
+    with tempfile.TemporaryDirectory() as directory:
+        game = _game()
+        game.save_file = os.path.join(directory, "save.json")
+        game.state = GameState(turn=12, reputation=63, entities_helped=4)
+
+        def timed(method):
+            def run():
+                start = time.perf_counter()
+                for _ in range(calls):
+                    method()
+                return time.perf_counter() - start
+            return best_of(repeat, run) / calls * 1000
+
+        save = timed(game.save_game)
+        size = os.path.getsize(game.save_file)
+        load = timed(game.load_game)
+    return [Measurement("save_game", save, "ms/call", False),
+            Measurement("save_game.bytes", size, "bytes", False),
+            Measurement("load_game", load, "ms/call", False)]
+
+
+def time_to_prompt(command: List[str], prompt: bytes = b"Enter choice") -> float:
+    """Seconds from starting `command` until `prompt` appears on its stdout"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    output = b""
+    try:
+        while prompt not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f"{command} exited before its prompt")
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        process.stdin.close()  # The game sees EOF and exits
+        process.stdout.read()
+        process.stdout.close()
+        process.wait()
+
+
+def bench_cold_start(scale: float, repeat: int) -> List[Measurement]:
+    command = [sys.executable, GAME_SCRIPT]
+    seconds = best_of(repeat, lambda: time_to_prompt(command))
+    return [Measurement("cold_start", seconds * 1000, "ms", False)]
+
+
+BENCHMARKS: Dict[str, Callable[[float, int], List[Measurement]]] = {
+    "play_turn": bench_play_turn,
+    "events": bench_events,
+    "win_lose_checks": bench_win_lose_checks,
+    "save_load": bench_save_load,
+    "cold_start": bench_cold_start,
+}
+
+
+def run_benchmarks(names: Optional[List[str]] = None, scale: float = 1.0,
+                   repeat: int = 5) -> List[Measurement]:
+    """Run the named benchmarks (all by default)"""
+    results = []
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark {name!r}; expected one of {sorted(BENCHMARKS)}")
+        results.extend(BENCHMARKS[name](scale, repeat))
+    return results
+
+
+def to_json(results: List[Measurement]) -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {result.name: {"value": result.value, "unit": result.unit,
+                                  "higher_is_better": result.higher_is_better}
+                    for result in results},
+    }
+
+
+def compare(results: List[Measurement], baseline: dict,
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Regression]:
+    """Metrics worse than the baseline by more than `tolerance`"""
+    regressions = []
+    for result in results:
+        reference = baseline["results"].get(result.name)
+        if reference is None or not reference["value"]:
+            continue
+        old = reference["value"]
+        if result.higher_is_better:
+            change = (old - result.value) / old
+        else:
+            change = (result.value - old) / old
+        if change > tolerance:
+            regressions.append(Regression(result.name, old, result.value, change))
+    return regressions
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="run only this benchmark (repeatable)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply the iteration counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None, metavar="BASELINE",
+                        help="flag regressions against a stored result file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.scale, args.repeat)
+    for result in results:
+        print(f"{result.name:28s} {result.value:14,.2f} {result.unit}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(to_json(results), f, indent=2)
+        print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression.name}: {regression.baseline:,.2f} -> "
+                  f"{regression.value:,.2f} ({regression.change:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Content packs for Accelerando: Lobsters
+
+A content pack is one indexed file holding any number of events (their
+intro text, aside, choices, requirements, rolls and outcomes), so new
+content ships without code. PackedCatalog memory-maps the file and reads
+nothing at open but the header: event names are read from the index when
+drawn, and an event is decoded only when played, into a small LRU cache.
+Opening a pack and playing from it costs the same memory and time with
+ten events or a hundred thousand.
+
+File layout (little-endian):
+
+    header    b"ACAT", version u16, 2 pad bytes, event count u32,
+              offset of the name table u32, precondition count u32
+    index     per event in draw order: record offset u32, record
+              length u32, name offset u32, name length u16
+    names     the event names, UTF-8
+    records   one compact JSON object per event
+    table     event indices sorted by name, u32 each, for lookups
+    weights   draw weight per event in draw order, f32 each
+    when      preconditions: event index u32, field u16, 2 pad bytes,
+              low i32, high i32
+
+Weights and preconditions sit outside the records so that the scheduler
+can index a pack without decoding its events.
+
+Records use the field names of STAT_FIELDS, the same schema as the JSON
+source files that `build` reads and `export` writes. The built-in pack is
+event_table.EVENTS.
+
+Usage:
+    python3 catalog.py export --out builtin.json
+    python3 catalog.py build --source builtin.json --out builtin.acat
+    python3 catalog.py bench --events 100 10000 100000
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from event_table import (EVENTS, STAT_FIELDS, STAT_MAX, STAT_MIN, Aside, EventSpec,
+                         Outcome, choice, outcome, preconditions)
+
+
+MAGIC = b"ACAT"
+VERSION = 2
+HEADER = struct.Struct("<4sHxxIII")
+ENTRY = struct.Struct("<IIIH")
+TABLE = struct.Struct("<I")
+WEIGHT = struct.Struct("<f")
+CONDITION = struct.Struct("<IHxxii")
+DEFAULT_CACHE_SIZE = 64
+
+
+# Events as JSON-compatible dictionaries
+
+def _encode_outcome(result: Optional[Outcome]) -> Optional[dict]:
+    if result is None:
+        return None
+    data = {"key": result.key, "text": list(result.text),
+            "delta": {STAT_FIELDS[index]: value
+                      for index, value in enumerate(result.delta) if value}}
+    if result.bonus is not None:
+        index, low, high = result.bonus
+        data["bonus"] = [STAT_FIELDS[index], low, high]
+    if result.reset:
+        data["reset"] = [STAT_FIELDS[index] for index in result.reset]
+    return data
+
+
+def _decode_outcome(data: Optional[dict]) -> Optional[Outcome]:
+    if data is None:
+        return None
+    bonus = data.get("bonus")
+    return outcome(data["key"], *data["text"], bonus=tuple(bonus) if bonus else None,
+                   reset=data.get("reset", ()), **data.get("delta", {}))
+
+
+def encode_event(event: EventSpec) -> dict:
+    """An event as a dictionary with field names"""
+    data = {"name": event.name, "intro": list(event.intro), "choices": [
+        {"label": option.label,
+         "requires": {STAT_FIELDS[index]: minimum for index, minimum in option.requires},
+         "roll": option.roll,
+         "success": _encode_outcome(option.success),
+         "failure": _encode_outcome(option.failure),
+         "unmet": _encode_outcome(option.unmet)}
+        for option in event.choices]}
+    if event.aside is not None:
+        data["aside"] = {"field": STAT_FIELDS[event.aside.field], "above": event.aside.above,
+                         "text": list(event.aside.text),
+                         "otherwise": list(event.aside.otherwise)}
+    if event.weight != 1.0:
+        data["weight"] = event.weight
+    if event.when:
+        data["when"] = {STAT_FIELDS[field]: [None if low == STAT_MIN else low,
+                                             None if high == STAT_MAX else high]
+                        for field, low, high in event.when}
+    return data
+
+
+def decode_event(data: dict) -> EventSpec:
+    """Inverse of encode_event"""
+    choices = tuple(
+        choice(option["label"], _decode_outcome(option["success"]),
+               requires=option.get("requires"), unmet=_decode_outcome(option.get("unmet")),
+               roll=option.get("roll"), failure=_decode_outcome(option.get("failure")))
+        for option in data["choices"])
+    aside = data.get("aside")
+    if aside is not None:
+        aside = Aside(STAT_FIELDS.index(aside["field"]), aside["above"],
+                      tuple(aside["text"]), tuple(aside.get("otherwise", ())))
+    return EventSpec(data["name"], choices, tuple(data.get("intro", ())), aside,
+                     data.get("weight", 1.0),
+                     preconditions({name: tuple(bounds)
+                                    for name, bounds in data.get("when", {}).items()}))
+
+
+# Pack files
+
+def write_pack(events: Iterable[EventSpec], path: str):
+    """Write events, in draw order, to a pack file"""
+    names: List[bytes] = []
+    records: List[bytes] = []
+    weights: List[bytes] = []
+    conditions: List[bytes] = []
+    for position, event in enumerate(events):
+        names.append(event.name.encode())
+        weights.append(WEIGHT.pack(event.weight))
+        conditions.extend(CONDITION.pack(position, field, low, high)
+                          for field, low, high in event.when)
+        records.append(json.dumps(encode_event(event), separators=(",", ":"),
+                                  ensure_ascii=False).encode())
+    if len(set(names)) != len(names):
+        raise ValueError("Event names in a pack must be unique")
+
+    count = len(names)
+    names_start = HEADER.size + ENTRY.size * count
+    records_start = names_start + sum(map(len, names))
+    table_start = records_start + sum(map(len, records))
+    index = []
+    name_offset, record_offset = names_start, records_start
+    for name, record in zip(names, records):
+        index.append(ENTRY.pack(record_offset, len(record), name_offset, len(name)))
+        name_offset += len(name)
+        record_offset += len(record)
+    table = [TABLE.pack(position) for position in sorted(range(count), key=names.__getitem__)]
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, table_start, len(conditions)))
+        f.write(b"".join(index))
+        f.write(b"".join(names))
+        f.write(b"".join(records))
+        f.write(b"".join(table))
+        f.write(b"".join(weights))
+        f.write(b"".join(conditions))
+
+
+class _Names:
+    """The event names of a pack as a lazy sequence, for rng.choice"""
+
+    __slots__ = ("catalog",)
+
+    def __init__(self, catalog: "PackedCatalog"):
+        self.catalog = catalog
+
+    def __len__(self) -> int:
+        return self.catalog.count
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < self.catalog.count:
+            raise IndexError(position)
+        return self.catalog._name(position).decode()
+
+    def __iter__(self):
+        return (self[position] for position in range(len(self)))
+
+
+class PackedCatalog:
+    """Events served from a memory-mapped pack file"""
+
+    def __init__(self, path: str, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self.decoded = 0  # Events decoded so far; cache misses
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, self._table,
+         self._conditions) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an event pack")
+        if version != VERSION:
+            raise ValueError(f"{path} is pack version {version}; expected {VERSION}")
+        self.names = _Names(self)
+        self._cache: "OrderedDict[str, EventSpec]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cache or self._find(name.encode()) is not None
+
+    @property
+    def weights(self) -> array:
+        """Draw weight of every event, read from the file on each access"""
+        start = self._table + TABLE.size * self.count
+        weights = array("f", self._map[start:start + WEIGHT.size * self.count])
+        if sys.byteorder == "big":
+            weights.byteswap()
+        return weights
+
+    @property
+    def conditions(self) -> List[tuple]:
+        """(event index, field index, low, high) for every precondition"""
+        start = self._table + (TABLE.size + WEIGHT.size) * self.count
+        end = start + CONDITION.size * self._conditions
+        return list(CONDITION.iter_unpack(self._map[start:end]))
+
+    def _entry(self, position: int) -> tuple:
+        return ENTRY.unpack_from(self._map, HEADER.size + ENTRY.size * position)
+
+    def _name(self, position: int) -> bytes:
+        _, _, offset, length = self._entry(position)
+        return self._map[offset:offset + length]
+
+    def _find(self, name: bytes) -> Optional[int]:
+        # Binary search of the name-sorted table
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = TABLE.unpack_from(self._map, self._table + TABLE.size * middle)[0]
+            found = self._name(position)
+            if found == name:
+                return position
+            if found < name:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def event(self, name: str) -> EventSpec:
+        """The named event, decoded on first use and kept in the LRU cache"""
+        cache = self._cache
+        event = cache.get(name)
+        if event is not None:
+            cache.move_to_end(name)
+            return event
+        position = self._find(name.encode())
+        if position is None:
+            raise KeyError(name)
+        offset, length, _, _ = self._entry(position)
+        event = decode_event(json.loads(self._map[offset:offset + length]))
+        self.decoded += 1
+        cache[name] = event
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return event
+
+    def close(self):
+        self._cache.clear()
+        self._map.close()
+
+
+def synthesize(count: int) -> Iterable[EventSpec]:
+    """`count` distinct events made from the built-in ones, for testing scale"""
+    builtin = list(EVENTS.values())
+    for index in range(count):
+        base = builtin[index % len(builtin)]
+        yield EventSpec(f"{base.name}_{index}", base.choices,
+                        base.intro + (f"(Variant {index})",), base.aside)
+
+
+def _bench(count: int, turns: int) -> str:
+    from accelerando_game import AccelerandoGame, GameState
+    from choices import PolicyChoices
+    from renderer import NullRenderer
+    from rng import RngStream
+    from simulator import random_policy
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pack.acat")
+        write_pack(synthesize(count), path)
+        size = os.path.getsize(path)
+        tracemalloc.start()
+        start = time.perf_counter()
+        catalog = PackedCatalog(path)
+        opened = time.perf_counter() - start
+        game = AccelerandoGame(NullRenderer(), PolicyChoices(random_policy(0)),
+                               rng=RngStream(0), catalog=catalog)
+        start = time.perf_counter()
+        for _ in range(turns):
+            if game.state.game_over:
+                game.state = GameState()
+            game.play_turn()
+        played = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        catalog.close()
+    return (f"{count:8,d} events {size / 1024:9,.0f} KiB | open {opened * 1e6:6.0f} us | "
+            f"{turns / played:8,.0f} turns/sec | peak {memory / 1024:6.0f} KiB | "
+            f"{catalog.decoded} decoded")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    exporting = commands.add_parser("export", help="write the built-in events as JSON")
+    exporting.add_argument("--out", default="builtin.json")
+    building = commands.add_parser("build", help="compile a JSON source into a pack")
+    building.add_argument("--source", default=None,
+                          help="JSON list of events (default: the built-in events)")
+    building.add_argument("--out", default="builtin.acat")
+    benching = commands.add_parser("bench", help="open and play packs of several sizes")
+    benching.add_argument("--events", type=int, nargs="+", default=[100, 10000, 100000])
+    benching.add_argument("--turns", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        with open(args.out, "w") as f:
+            json.dump([encode_event(event) for event in EVENTS.values()], f,
+                      indent=2, ensure_ascii=False)
+        print(f"Wrote {len(EVENTS)} events to {args.out}")
+    elif args.command == "build":
+        if args.source is None:
+            events = list(EVENTS.values())
+        else:
+            with open(args.source) as f:
+                events = [decode_event(data) for data in json.load(f)]
+        write_pack(events, args.out)
+        print(f"Wrote {len(events)} events to {args.out}")
+    else:
+        for count in args.events:
+            print(_bench(count, args.turns))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Choice providers for Accelerando: Lobsters
+
+AccelerandoGame asks its provider for every decision: event options, the
+between-turn menu and the main menu. The provider can look at
+`game.current_event` (None outside events) and `game.state`.
+
+- InteractiveChoices reads from the terminal (the classic behaviour)
+- ScriptedChoices replays a fixed sequence, like piped stdin
+- PolicyChoices asks a simulator policy about events and always
+  continues at menus
+- QueuedChoices blocks on a thread-safe queue that another thread or a
+  network handler fills, one choice or a batch at a time
+"""
+
+from __future__ import annotations
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # typing costs milliseconds of game startup
+    from typing import Iterable, Optional
+
+
+class ChoiceProvider:
+    """Base class for sources of player decisions"""
+
+    def choose(self, game, max_choice: int) -> int:
+        """Return a choice between 1 and max_choice"""
+        raise NotImplementedError
+
+    def pause(self, game):
+        """Wait for the player before the first turn"""
+
+
+class InteractiveChoices(ChoiceProvider):
+    """Prompts on the terminal until a valid number is entered"""
+
+    def choose(self, game, max_choice: int) -> int:
+        while True:
+            game.renderer.flush()
+            try:
+                choice = input(f"\nEnter choice (1-{max_choice}): ").strip()
+                choice_num = int(choice)
+                if 1 <= choice_num <= max_choice:
+                    return choice_num
+                else:
+                    game.renderer.write(f"Please enter a number between 1 and {max_choice}")
+            except ValueError:
+                game.renderer.write("Please enter a valid number")
+            except (EOFError, KeyboardInterrupt):
+                game.renderer.write("\n\nGame interrupted by user.")
+                raise
+
+    def pause(self, game):
+        game.renderer.flush()
+        input()
+
+
+class ScriptedChoices(ChoiceProvider):
+    """Answers every prompt from a fixed sequence
+
+    Raises EOFError when the script runs out, which the game treats like
+    the player closing the terminal.
+    """
+
+    def __init__(self, script: Iterable[int]):
+        self.script = iter(script)
+
+    def choose(self, game, max_choice: int) -> int:
+        try:
+            choice = next(self.script)
+        except StopIteration:
+            raise EOFError("choice script exhausted") from None
+        if not 1 <= choice <= max_choice:
+            raise ValueError(f"Scripted choice {choice} is not between 1 and {max_choice}")
+        return choice
+
+
+class PolicyChoices(ChoiceProvider):
+    """Asks a simulator policy about events; menus always get `menu`"""
+
+    def __init__(self, policy, menu: int = 1):
+        self.policy = policy  # (state, event, max_choice) -> choice
+        self.menu = menu
+
+    def choose(self, game, max_choice: int) -> int:
+        if game.current_event is None:
+            return self.menu
+        return self.policy(game.state, game.current_event, max_choice)
+
+
+class QueuedChoices(ChoiceProvider):
+    """Takes choices from a thread-safe queue, waiting for them to arrive
+
+    A None in the queue, or no choice within `timeout` seconds, ends the
+    game as EOFError does.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        import queue  # Only hosted games need it; keeps it out of game startup
+        self.queue: queue.Queue[Optional[int]] = queue.Queue()
+        self.timeout = timeout
+
+    def put(self, *choices: Optional[int]):
+        """Queue one or more choices"""
+        for choice in choices:
+            self.queue.put(choice)
+
+    def close(self):
+        """End the game at its next prompt"""
+        self.queue.put(None)
+
+    def choose(self, game, max_choice: int) -> int:
+        import queue
+        game.renderer.flush()
+        try:
+            choice = self.queue.get(timeout=self.timeout)
+        except queue.Empty:
+            raise EOFError("no choice arrived in time") from None
+        if choice is None:
+            raise EOFError("choice queue closed")
+        if not 1 <= choice <= max_choice:
+            raise ValueError(f"Queued choice {choice} is not between 1 and {max_choice}")
+        return choice
@@ -5,6 +5,7 @@ This simulates a few turns with automated choices
 """
 
 from accelerando_game import AccelerandoGame, GameState
+from choices import ScriptedChoices
 import random
 
 
@@ -25,43 +26,25 @@ def automated_demo():
     print("DEMO: Simulating game events...")
     print("="*70)
     
-    # Demo 1: Lobster asylum (helpful response)
-    print("\n[DEMO] Event: Lobster Asylum Request")
-    print("Choice: Help them immediately")
+    # Demos 1-3: real events, with the choices scripted
+    demos = [
+        ("Lobster Asylum Request", game.event_lobster_asylum, 1),
+        ("Patent Liberation", game.event_patent_decision, 1),
+        ("Russian AI Contact", game.event_russian_ai, 2),
+    ]
+    random.seed(42)
+    game.choices = ScriptedChoices([choice for _, _, choice in demos])
     game.state.influence = 30
     game.state.bandwidth = 50
-    original_rep = game.state.reputation
-    game.state.influence -= 20
-    game.state.bandwidth -= 30
-    game.state.reputation += 25
-    game.state.entities_helped += 1
-    game.state.singularity_progress += 15
-    print(f"Result: Reputation {original_rep} → {game.state.reputation}")
-    print(f"Entities helped: {game.state.entities_helped}")
-    print(f"Singularity progress: {game.state.singularity_progress}%")
-    
-    # Demo 2: Patent decision (release freely)
-    print("\n[DEMO] Event: Patent Liberation")
-    print("Choice: Release patent freely")
-    original_rep = game.state.reputation
-    game.state.reputation += 30
-    game.state.patents_released += 1
-    game.state.singularity_progress += 10
-    print(f"Result: Reputation {original_rep} → {game.state.reputation}")
-    print(f"Patents released: {game.state.patents_released}")
-    print(f"Singularity progress: {game.state.singularity_progress}%")
-    
-    # Demo 3: Russian AI (cautious approach)
-    print("\n[DEMO] Event: Russian AI Contact")
-    print("Choice: Negotiate conditional freedom")
-    original_rep = game.state.reputation
-    game.state.reputation += 15
-    game.state.singularity_progress += 10
-    game.state.entities_helped += 1
-    game.state.ideas += 5
-    print(f"Result: Reputation {original_rep} → {game.state.reputation}")
-    print(f"Ideas gained: 5")
-    print(f"Singularity progress: {game.state.singularity_progress}%")
+    for title, event, choice in demos:
+        print(f"\n[DEMO] Event: {title}")
+        print(f"Choice: {choice}")
+        original_rep = game.state.reputation
+        event()
+        print(f"Result: Reputation {original_rep} → {game.state.reputation}")
+        print(f"Entities helped: {game.state.entities_helped}")
+        print(f"Patents released: {game.state.patents_released}")
+        print(f"Singularity progress: {game.state.singularity_progress}%")
     
     # Demo 4: Check current state
     print("\n" + "="*70)
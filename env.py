@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Vectorised reinforcement-learning environment for Accelerando: Lobsters
+
+VectorEnv runs N games in lockstep behind a gym-style API:
+
+    env = VectorEnv(1024, seed=0)
+    observations, info = env.reset()
+    observations, rewards, terminated, truncated, info = env.step(actions)
+
+Each step is one turn of every game, with the game's turn order: the
+action answers the event in the observation, the outcome is applied, the
+rules decide victory or defeat, and the next turn's resources regenerate
+and its event is drawn.
+
+- observations: int32 array (N, 11), the ten GameState stats in
+  STAT_FIELDS order followed by the index of the event to answer
+  (into EVENT_NAMES); see OBSERVATION_FIELDS
+- actions: 0-based option indices, one per game; info["action_mask"]
+  (bool, N x 4) marks the options each game's event has
+- rewards: float32, +1 on victory, -1 on defeat, 0 otherwise
+- terminated: the game was won or lost; truncated: it ran out of turns
+
+Finished games reset automatically: their row of the returned
+observations already starts the next game, and info["final_observation"]
+holds the last observation of every game that ended during the step (rows
+of games that did not end are unspecified).
+
+Turns go through the compiled event table and rule masks of batch.py:
+a step is a fixed number of NumPy operations over all N games, with no
+per-game Python objects. NumPy is required.
+
+Usage:
+    python3 env.py --envs 4096 --steps 1000
+"""
+
+import argparse
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional for the rest of the game
+    np = None
+
+from accelerando_game import GameState
+from batch import (STATS, TURN, WORK_DTYPE, _compiled, _StatView, regenerate_rows,
+                   resolve_rows)
+from event_table import EVENT_NAMES, STAT_FIELDS
+from rules import DEFAULT_RULES
+from simulator import DEFAULT_MAX_TURNS
+
+
+OBSERVATION_FIELDS = STAT_FIELDS + ("event",)
+EVENT = STATS  # Column of the event index in an observation
+
+
+def random_actions(action_mask, rng):
+    """A uniformly random valid action for every row of an action mask"""
+    counts = action_mask.sum(axis=1)
+    return (rng.random(len(counts)) * counts).astype(np.int64)
+
+
+class VectorEnv:
+    """N games stepped together, with auto-reset and per-event action masks"""
+
+    def __init__(self, num_envs: int, seed: Optional[int] = None,
+                 max_turns: int = DEFAULT_MAX_TURNS):
+        if np is None:
+            raise ImportError("env.py needs NumPy")
+        self.num_envs = num_envs
+        self.max_turns = max_turns
+        self.tables = tables = _compiled()
+        self.action_count = tables.width
+        self.event_names = EVENT_NAMES
+        # Per event index, which of the `width` options exist
+        self.valid_actions = np.arange(tables.width) < tables.choice_counts[:, None]
+        self.initial = np.array(GameState().vector(), dtype=WORK_DTYPE)
+        self.victory = DEFAULT_RULES.victory
+        self.defeat = DEFAULT_RULES.defeat
+        self.rng = np.random.default_rng(seed)
+        self.stats = np.empty((num_envs, STATS), dtype=WORK_DTYPE)
+        self.events = np.zeros(num_envs, dtype=np.int64)
+
+    def _begin_turn(self) -> Tuple[object, Dict[str, object]]:
+        regenerate_rows(self.stats, self.tables, self.rng)
+        self.events = self.rng.integers(0, len(EVENT_NAMES), self.num_envs)
+        return self._observe(), {"action_mask": self.valid_actions[self.events]}
+
+    def _observe(self):
+        observations = np.empty((self.num_envs, STATS + 1), dtype=WORK_DTYPE)
+        observations[:, :STATS] = self.stats
+        observations[:, EVENT] = self.events
+        return observations
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[object, Dict[str, object]]:
+        """Start N new games; returns the first observations and action masks"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.stats[:] = self.initial
+        return self._begin_turn()
+
+    def step(self, actions) -> Tuple[object, object, object, object, Dict[str, object]]:
+        """Answer every game's event: (observations, rewards, terminated, truncated, info)"""
+        actions = np.asarray(actions)
+        counts = self.tables.choice_counts[self.events]
+        if actions.shape != (self.num_envs,) or ((actions < 0) | (actions >= counts)).any():
+            raise ValueError("actions must be one valid option index per game; "
+                             "see info['action_mask']")
+        stats = self.stats
+        resolve_rows(stats, self.events * self.tables.width + actions, self.tables, self.rng)
+
+        view = _StatView(stats.T)
+        won = self.victory(view)
+        lost = self.defeat(view) & ~won
+        terminated = won | lost
+        truncated = ~terminated & (stats[:, TURN] >= self.max_turns)
+        rewards = won.astype(np.float32) - lost.astype(np.float32)
+
+        done = terminated | truncated
+        final = None
+        if done.any():
+            final = self._observe()
+            stats[done] = self.initial
+        observations, info = self._begin_turn()
+        if final is not None:
+            info["final_observation"] = final
+        return observations, rewards, terminated, truncated, info
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--envs", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = VectorEnv(args.envs, seed=args.seed)
+    agent = np.random.default_rng(args.seed + 1)
+    observations, info = env.reset()
+    episodes = victories = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = random_actions(info["action_mask"], agent)
+        observations, rewards, terminated, truncated, info = env.step(actions)
+        episodes += int(terminated.sum() + truncated.sum())
+        victories += int((rewards > 0).sum())
+    elapsed = time.perf_counter() - start
+    print(f"{args.envs * args.steps / elapsed:,.0f} steps/sec with {args.envs:,} games "
+          f"({args.steps / elapsed:,.0f} batched steps/sec)")
+    if episodes:
+        print(f"Random actions: {episodes:,} episodes, {victories / episodes:.2%} won")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
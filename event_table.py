@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Declarative event table for Accelerando: Lobsters
+
+Every event is described as data: for each choice, the resources it
+requires, the random roll it needs, and the stat delta of each possible
+outcome. Deltas are precomputed vectors over STAT_FIELDS, so applying an
+outcome is a single vector add rather than a chain of attribute writes.
+Each event also carries its narrative: the intro text and an optional
+aside that depends on a stat, and its scheduling: a draw weight and the
+stat ranges in which it can fire (see scheduler.py).
+
+Both the interactive game and the simulators run off this table. The
+game reads events through a catalog: BUILTIN serves this table, and
+catalog.PackedCatalog serves content packs from a file with the same
+interface.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from operator import add
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # typing costs milliseconds of game startup
+    from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Integer GameState fields, in dataclass order. Delta vectors use this layout.
+STAT_FIELDS = (
+    "reputation",
+    "ideas",
+    "bandwidth",
+    "influence",
+    "turn",
+    "dead_kittens",
+    "entities_helped",
+    "patents_released",
+    "singularity_progress",
+    "pamela_relationship",
+)
+FIELD_INDEX = {name: index for index, name in enumerate(STAT_FIELDS)}
+
+# Open ends of precondition ranges; packs store bounds as 32-bit integers
+STAT_MIN = -2 ** 31
+STAT_MAX = 2 ** 31 - 1
+
+# Sides of the die used for risky choices: success when randint(1, 100) > roll
+ROLL_SIDES = 100
+
+
+def delta(**changes: int) -> Tuple[int, ...]:
+    """Build a delta vector from keyword stat changes"""
+    vector = [0] * len(STAT_FIELDS)
+    for name, value in changes.items():
+        vector[FIELD_INDEX[name]] = value
+    return tuple(vector)
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """One possible result of a choice"""
+    key: str                                   # "success", "failure" or "unmet"
+    text: Tuple[str, ...]
+    delta: Tuple[int, ...]
+    bonus: Optional[Tuple[int, int, int]] = None  # (field index, low, high) randint
+    reset: Tuple[int, ...] = ()                # Field indices set to zero
+
+
+@dataclass(frozen=True)
+class Choice:
+    """One option of an event"""
+    label: str
+    success: Outcome
+    requires: Tuple[Tuple[int, int], ...] = ()  # (field index, minimum)
+    unmet: Optional[Outcome] = None             # When requirements are not met
+    roll: Optional[int] = None                  # Success needs a roll above this
+    failure: Optional[Outcome] = None           # When the roll fails
+
+
+@dataclass(frozen=True)
+class Aside:
+    """Lines shown before the options that depend on one stat"""
+    field: int                       # Field index
+    above: int                       # `text` when the stat is above this
+    text: Tuple[str, ...]
+    otherwise: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class EventSpec:
+    """An event: its narrative and its choices"""
+    name: str
+    choices: Tuple[Choice, ...]
+    intro: Tuple[str, ...] = ()      # Narrative shown before the options
+    aside: Optional[Aside] = None
+    weight: float = 1.0              # Relative chance of being drawn
+    when: Tuple[Tuple[int, int, int], ...] = ()  # (field index, low, high) inclusive
+
+
+def outcome(key: str, *text: str, bonus: Optional[Tuple[str, int, int]] = None,
+            reset: Sequence[str] = (), **changes: int) -> Outcome:
+    """Author an outcome using field names"""
+    if bonus is not None:
+        name, low, high = bonus
+        bonus = (FIELD_INDEX[name], low, high)
+    return Outcome(key, text, delta(**changes), bonus,
+                   tuple(FIELD_INDEX[name] for name in reset))
+
+
+def choice(label: str, success: Outcome, requires: Optional[Dict[str, int]] = None,
+           unmet: Optional[Outcome] = None, roll: Optional[int] = None,
+           failure: Optional[Outcome] = None) -> Choice:
+    """Author a choice using field names"""
+    minimums = tuple((FIELD_INDEX[name], minimum)
+                     for name, minimum in (requires or {}).items())
+    return Choice(label, success, minimums, unmet, roll, failure)
+
+
+def preconditions(ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]]
+                  ) -> Tuple[Tuple[int, int, int], ...]:
+    """Author an event's preconditions as {field name: (low, high)}; None is open"""
+    return tuple((FIELD_INDEX[name], STAT_MIN if low is None else low,
+                  STAT_MAX if high is None else high)
+                 for name, (low, high) in (ranges or {}).items())
+
+
+# Turn start: the turn counter advances and resources regenerate
+TURN_DELTA = delta(turn=1)
+REGENERATION = (
+    (FIELD_INDEX["ideas"], 1, 3),
+    (FIELD_INDEX["bandwidth"], 5, 10),
+    (FIELD_INDEX["influence"], 1, 2),
+    (FIELD_INDEX["singularity_progress"], 1, 3),
+)
+
+
+EVENTS: Dict[str, EventSpec] = {}
+
+
+def _register(name: str, intro: Tuple[str, ...], *choices: Choice,
+              aside: Optional[Aside] = None, weight: float = 1.0,
+              when: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None):
+    EVENTS[name] = EventSpec(name, choices, intro, aside, weight, preconditions(when))
+
+
+_register(
+    "lobster_asylum",
+    ("\n🦞 EVENT: The Lobster Asylum Request",
+     "-" * 70,
+     "A cluster of uploaded California spiny lobsters has achieved",
+     "self-awareness in cyberspace. They're requesting your help to",
+     "gain legal personhood and asylum from their corporate owners.",
+     "\nThis could set a precedent for all digital consciousness...",
+     ""),
+    choice("Help them immediately (Cost: 20 Influence, 30 Bandwidth)",
+           requires={"influence": 20, "bandwidth": 30},
+           success=outcome(
+               "success",
+               "\n✓ SUCCESS! The lobsters gain asylum. You're hailed as a pioneer",
+               "  of digital rights. Your reputation soars!",
+               influence=-20, bandwidth=-30, reputation=25, entities_helped=1,
+               singularity_progress=15),
+           unmet=outcome(
+               "unmet",
+               "\n✗ FAILURE! You lack the resources. The lobsters are shut down.",
+               reputation=-10, dead_kittens=2)),
+    choice("Negotiate carefully (Cost: 10 Influence, 15 Bandwidth)",
+           requires={"influence": 10, "bandwidth": 15},
+           success=outcome(
+               "success",
+               "\n✓ SUCCESS! Through careful negotiation, the lobsters gain",
+               "  limited rights. A good compromise.",
+               influence=-10, bandwidth=-15, reputation=15, entities_helped=1,
+               singularity_progress=10),
+           unmet=outcome(
+               "unmet",
+               "\n✗ FAILURE! Insufficient resources for negotiation.",
+               reputation=-5)),
+    choice("Refuse - too risky (Lose Reputation)",
+           success=outcome(
+               "success",
+               "\n✗ The lobsters are deleted. The digital rights movement",
+               "  suffers a major setback. Your reputation takes a hit.",
+               reputation=-20, dead_kittens=1)),
+    choice("Sell them out to corporate interests (Gain traditional wealth)",
+           success=outcome(
+               "success",
+               "\n✗ You've betrayed the digital entities for money.",
+               "  Pamela approves, but your reputation in the agalmic",
+               "  community is destroyed.",
+               reputation=-30, pamela_relationship=10, dead_kittens=3)),
+)
+
+_register(
+    "patent_decision",
+    ("\n💡 EVENT: The Patent Liberation Dilemma",
+     "-" * 70,
+     "You've just developed a breakthrough in neural lacing technology.",
+     "A major corporation offers $10M for exclusive rights.",
+     "Alternatively, you could release it freely to the community.",
+     ""),
+    choice("Release it freely (Gain massive Reputation)",
+           success=outcome(
+               "success",
+               "\n✓ Released! The community celebrates your commitment",
+               "  to the agalmic economy. Innovation accelerates!",
+               "  (Pamela is disappointed with your 'impractical' decision)",
+               reputation=30, patents_released=1, singularity_progress=10,
+               pamela_relationship=-10)),
+    choice("Keep patent but license cheaply (Balanced approach)",
+           success=outcome(
+               "success",
+               "\n✓ A balanced approach. You gain some resources while",
+               "  maintaining your principles.",
+               reputation=10, influence=10, bandwidth=20, patents_released=1)),
+    choice("Sell to corporation (Gain resources but lose Reputation)",
+           success=outcome(
+               "success",
+               "\n✗ Money acquired, but the community sees you as a sellout.",
+               "  Pamela approves of your 'practical' decision.",
+               reputation=-25, influence=30, bandwidth=50, pamela_relationship=15)),
+    choice("Use it to negotiate AI rights (Spend for greater cause)",
+           requires={"influence": 15},
+           success=outcome(
+               "success",
+               "\n✓ Brilliant! You leverage the patent to secure",
+               "  legal protections for multiple AI entities.",
+               influence=-15, reputation=20, entities_helped=1,
+               singularity_progress=15),
+           unmet=outcome(
+               "unmet",
+               "\n✗ You lack the influence to make this work.",
+               reputation=-10)),
+)
+
+_register(
+    "russian_ai",
+    ("\n🤖 EVENT: The Russian AI Contact",
+     "-" * 70,
+     "A sophisticated AI claiming to be from a Russian research lab",
+     "has made contact. It offers you access to advanced technologies",
+     "in exchange for help escaping its containment.",
+     "\nThis could be incredibly powerful... or incredibly dangerous.",
+     ""),
+    choice("Help the AI escape (High risk, high reward)",
+           roll=40,
+           success=outcome(
+               "success",
+               "\n✓ SUCCESS! The AI shares revolutionary insights",
+               "  before disappearing into the net. Singularity accelerates!",
+               reputation=35, singularity_progress=25, entities_helped=1, ideas=15),
+           failure=outcome(
+               "failure",
+               "\n✗ DISASTER! The AI was a trap. It causes chaos",
+               "  across multiple networks. Dead kittens everywhere!",
+               dead_kittens=3, reputation=-20, bandwidth=-30)),
+    choice("Negotiate conditional freedom (Moderate risk)",
+           success=outcome(
+               "success",
+               "\n✓ A careful approach pays off. The AI shares some",
+               "  knowledge in exchange for limited freedom.",
+               reputation=15, singularity_progress=10, entities_helped=1, ideas=5)),
+    choice("Report it to authorities (Safe but reputation loss)",
+           success=outcome(
+               "success",
+               "\n✗ The AI is shut down. Pamela commends your caution,",
+               "  but the agalmic community sees you as a traitor.",
+               reputation=-15, pamela_relationship=20)),
+    choice("Try to study it first (Requires high Bandwidth)",
+           requires={"bandwidth": 40},
+           success=outcome(
+               "success",
+               "\n✓ Your analysis reveals amazing insights!",
+               "  The AI cooperates with your careful approach.",
+               bandwidth=-40, ideas=20, singularity_progress=15),
+           unmet=outcome(
+               "unmet",
+               "\n✗ Insufficient bandwidth for proper analysis.",
+               dead_kittens=1)),
+)
+
+_register(
+    "pamela_confrontation",
+    ("\n💔 EVENT: Pamela's Ultimatum",
+     "-" * 70,
+     "Pamela confronts you about your 'irresponsible' agalmic lifestyle.",
+     "She represents the IRS and traditional economic systems.",
+     "She demands you choose: her way or the highway.",
+     ""),
+    choice("Double down on agalmic principles (Lose relationship)",
+           success=outcome(
+               "success",
+               "\n✓ You stand firm on your principles. The relationship ends,",
+               "  but your commitment to the future is unwavering.",
+               reputation=15, pamela_relationship=-30, singularity_progress=10)),
+    choice("Try to convince her of your vision (Requires Ideas)",
+           requires={"ideas": 10},
+           roll=60,
+           success=outcome(
+               "success",
+               "\n✓ Breakthrough! Pamela begins to understand your vision.",
+               "  Maybe there's hope for you two after all.",
+               ideas=-10, pamela_relationship=20, reputation=10),
+           failure=outcome(
+               "failure",
+               "\n✗ She doesn't get it. The argument continues.",
+               ideas=-10, pamela_relationship=-10),
+           unmet=outcome(
+               "unmet",
+               "\n✗ You lack the ideas to articulate your vision properly.",
+               pamela_relationship=-15)),
+    choice("Compromise with traditional economics (Lose Reputation)",
+           success=outcome(
+               "success",
+               "\n✗ You compromise your principles for the relationship.",
+               "  Pamela is happy, but you feel hollow inside.",
+               reputation=-25, pamela_relationship=25, singularity_progress=-10)),
+    choice("End the relationship amicably (Neutral option)",
+           success=outcome(
+               "success",
+               "\n○ You part ways professionally. No hard feelings,",
+               "  but no reconciliation either.",
+               reset=("pamela_relationship",))),
+    aside=Aside(FIELD_INDEX["pamela_relationship"], 0,
+                ("(She still has some feelings for you...)", ""),
+                ("(Your relationship is strained...)", ""))
+)
+
+_register(
+    "aineko_advice",
+    ("\n🐱 EVENT: Aineko's Cryptic Wisdom",
+     "-" * 70,
+     "Your AI cat, Aineko, has been unusually quiet lately.",
+     "Suddenly, it speaks up with what seems like valuable intelligence",
+     "about upcoming technological developments.",
+     "\nBut can you trust an AI that's smarter than you?",
+     ""),
+    choice("Trust Aineko completely (High risk/reward)",
+           roll=30,
+           success=outcome(
+               "success",
+               "\n✓ Aineko's advice was spot-on! You're perfectly",
+               "  positioned for the next wave of innovation.",
+               reputation=20, singularity_progress=20, ideas=10),
+           failure=outcome(
+               "failure",
+               "\n✗ Aineko led you astray! Was it deliberate or",
+               "  did the cat just not care about your problems?",
+               dead_kittens=2, reputation=-15)),
+    choice("Follow advice cautiously (Moderate approach)",
+           success=outcome(
+               "success",
+               "\n✓ A balanced approach. You benefit from the advice",
+               "  while maintaining your own judgment.",
+               ideas=5, singularity_progress=10)),
+    choice("Ignore the advice (Safe but miss opportunity)",
+           success=outcome(
+               "success",
+               "\n○ You ignore Aineko. Nothing happens, but you wonder",
+               "  what could have been...")),
+    choice("Try to understand Aineko's motives (Requires Bandwidth)",
+           requires={"bandwidth": 25},
+           success=outcome(
+               "success",
+               "\n✓ You gain insight into Aineko's reasoning!",
+               "  The cat is playing a longer game than you realized.",
+               bandwidth=-25, ideas=8, influence=5),
+           unmet=outcome(
+               "unmet",
+               "\n✗ Insufficient bandwidth to analyze Aineko's",
+               "  neural patterns.")),
+)
+
+_register(
+    "idea_generation",
+    ("\n💭 EVENT: Idea Generation Session",
+     "-" * 70,
+     "You have some time to think and generate new ideas.",
+     "How do you want to spend your creative energy?",
+     ""),
+    choice("Focus on AI rights frameworks (Reputation + Ideas)",
+           success=outcome(
+               "success",
+               "\n✓ You develop {amount} new ideas about AI rights!",
+               "  Your reputation in the community grows.",
+               bonus=("ideas", 5, 10), reputation=5)),
+    choice("Develop networking protocols (Bandwidth + Ideas)",
+           success=outcome(
+               "success",
+               "\n✓ You develop {amount} networking ideas and",
+               "  improve your bandwidth capacity!",
+               bonus=("ideas", 3, 8), bandwidth=15)),
+    choice("Create economic models (Influence + Ideas)",
+           success=outcome(
+               "success",
+               "\n✓ You develop {amount} economic ideas!",
+               "  Your influence in policy circles grows.",
+               bonus=("ideas", 4, 9), influence=10)),
+    choice("Meditate and rest (Recover resources)",
+           success=outcome(
+               "success",
+               "\n✓ Rest and recovery. All resources partially restored.",
+               bandwidth=20, influence=5, ideas=3)),
+)
+
+# Events in the order random_event draws them from
+EVENT_NAMES = tuple(EVENTS)
+
+
+def regenerate(vector: Sequence[int], rng) -> List[int]:
+    """Apply the start-of-turn delta and random resource regeneration"""
+    result = list(map(add, vector, TURN_DELTA))
+    for index, low, high in REGENERATION:
+        result[index] += rng.randint(low, high)
+    return result
+
+
+def resolve(spec: Choice, vector: Sequence[int], rng) -> Outcome:
+    """Pick the outcome of a choice, drawing the roll if it needs one"""
+    for index, minimum in spec.requires:
+        if vector[index] < minimum:
+            return spec.unmet
+    if spec.roll is not None and rng.randint(1, ROLL_SIDES) <= spec.roll:
+        return spec.failure
+    return spec.success
+
+
+def apply(result: Outcome, vector: Sequence[int], rng) -> Tuple[List[int], int]:
+    """Apply an outcome's delta vector; returns the new vector and bonus drawn"""
+    new = list(map(add, vector, result.delta))
+    amount = 0
+    if result.bonus is not None:
+        index, low, high = result.bonus
+        amount = rng.randint(low, high)
+        new[index] += amount
+    for index in result.reset:
+        new[index] = 0
+    return new, amount
+
+
+def play_choice(spec: Choice, vector: Sequence[int],
+                rng) -> Tuple[List[int], Outcome, int]:
+    """Resolve and apply one choice against a stat vector"""
+    result = resolve(spec, vector, rng)
+    new, amount = apply(result, vector, rng)
+    return new, result, amount
+
+
+def play(event: str, number: int, vector: Sequence[int],
+         rng) -> Tuple[List[int], Outcome, int]:
+    """Play choice `number` (1-based) of a built-in event against a stat vector"""
+    return play_choice(EVENTS[event].choices[number - 1], vector, rng)
+
+
+class TableCatalog:
+    """Events held in memory, with the interface of catalog.PackedCatalog"""
+
+    def __init__(self, events: Dict[str, EventSpec]):
+        self.events = events
+        self.names = tuple(events)  # Draw order
+        self.weights = tuple(event.weight for event in events.values())
+        # (position, field index, low, high) for every precondition
+        self.conditions = tuple((position, field, low, high)
+                                for position, event in enumerate(events.values())
+                                for field, low, high in event.when)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.events
+
+    def event(self, name: str) -> EventSpec:
+        return self.events[name]
+
+
+# The built-in content pack
+BUILTIN = TableCatalog(EVENTS)
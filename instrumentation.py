@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Optional instrumentation for Accelerando: Lobsters
+
+instrument(game, metrics) wraps a game's methods on the instance:
+play_turn, random_event, every event_* handler, get_choice, apply_choice,
+save_game/load_game and the win/lose checks. The wrappers count calls and
+add wall time, and CPU time except for get_choice (mostly waiting) and the
+checks (cheaper than the CPU clock), to a Metrics object; get_choice also counts the
+choice made per event (or "menu"), and apply_choice counts the
+success/failure/unmet branch taken. A game that is not instrumented runs
+its plain methods, so there is no cost when instrumentation is off.
+
+Metrics.snapshot() returns plain dictionaries, and to_openmetrics()
+renders counters and wall-time histograms in the OpenMetrics text format.
+MetricsDumper rewrites such a file every few seconds from a daemon
+thread. One Metrics can be shared by every game in a process; updates are
+not locked, so share it between threads only for approximate numbers.
+
+Usage:
+    python3 instrumentation.py --games 1000 --out metrics.txt
+"""
+
+import argparse
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+from event_table import EVENT_NAMES
+
+
+PREFIX = "accelerando"
+# Upper bounds, in seconds, of the wall-time histogram buckets
+BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+class Timing:
+    """Calls, total wall and CPU seconds, and a wall-time histogram"""
+
+    __slots__ = ("count", "wall", "cpu", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.wall = 0.0
+        self.cpu: Optional[float] = None  # None unless CPU time is measured
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last one is +Inf
+
+    def add(self, wall: float, cpu: Optional[float] = None):
+        self.count += 1
+        self.wall += wall
+        if cpu is not None:
+            self.cpu = (self.cpu or 0.0) + cpu
+        if wall > self.max:
+            self.max = wall
+        self.buckets[bisect_left(BUCKETS, wall)] += 1
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "wall": self.wall, "cpu": self.cpu, "max": self.max}
+
+
+class Metrics:
+    """Counters and timings keyed by name and labels"""
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.timings: Dict[Key, Timing] = {}
+        self.started = time.time()
+
+    def count(self, name: str, labels: Labels = (), amount: int = 1):
+        self.counters[name, labels] += amount
+
+    def timing(self, name: str, labels: Labels = ()) -> Timing:
+        """The Timing for a name and labels, created on first use"""
+        timing = self.timings.get((name, labels))
+        if timing is None:
+            timing = self.timings[name, labels] = Timing()
+        return timing
+
+    def observe(self, name: str, labels: Labels, wall: float, cpu: Optional[float] = None):
+        self.timing(name, labels).add(wall, cpu)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """{metric: {label string: value}}; timings are dictionaries"""
+        result: Dict[str, Dict[str, object]] = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            result.setdefault(name, {})[_label_text(labels)] = value
+        for (name, labels), timing in sorted(self.timings.items()):
+            result.setdefault(f"{name}_seconds", {})[_label_text(labels)] = timing.to_dict()
+        return result
+
+    def to_openmetrics(self) -> str:
+        lines: List[str] = []
+        families: Dict[str, list] = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            families.setdefault(name, []).append((labels, value))
+        for name, samples in families.items():
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            for labels, value in samples:
+                lines.append(f"{PREFIX}_{name}_total{_braces(labels)} {value}")
+
+        families = {}
+        for (name, labels), timing in sorted(self.timings.items()):
+            families.setdefault(name, []).append((labels, timing))
+        for name, samples in families.items():
+            family = f"{PREFIX}_{name}_seconds"
+            lines.append(f"# TYPE {family} histogram")
+            for labels, timing in samples:
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), timing.buckets):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else repr(bound)
+                    lines.append(f"{family}_bucket{_braces(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{family}_count{_braces(labels)} {timing.count}")
+                lines.append(f"{family}_sum{_braces(labels)} {timing.wall:.9f}")
+            cpu_samples = [(labels, timing) for labels, timing in samples
+                           if timing.cpu is not None]
+            if cpu_samples:
+                lines.append(f"# TYPE {PREFIX}_{name}_cpu_seconds counter")
+            for labels, timing in cpu_samples:
+                lines.append(f"{PREFIX}_{name}_cpu_seconds_total{_braces(labels)} {timing.cpu:.9f}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Write the OpenMetrics text atomically"""
+        from journal import atomic_write
+        atomic_write(path, self.to_openmetrics())
+
+
+def _label_text(labels: Labels) -> str:
+    return ",".join(f"{key}={value}" for key, value in labels)
+
+
+def _braces(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def _timed(metrics: Metrics, name: str, labels: Labels, method, cpu: bool = True):
+    add = metrics.timing(name, labels).add
+    wall_clock = time.perf_counter
+    cpu_clock = time.process_time
+
+    if not cpu:
+        # For quick or mostly idle calls, where the CPU clock would cost more
+        @wraps(method)
+        def wall_only(*args, **kwargs):
+            wall = wall_clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                add(wall_clock() - wall)
+        return wall_only
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        wall, cpu = wall_clock(), cpu_clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            add(wall_clock() - wall, cpu_clock() - cpu)
+    return wrapper
+
+
+def _wrapped_methods(game, metrics: Metrics) -> Dict[str, object]:
+    methods = {
+        "play_turn": _timed(metrics, "turn", (), game.play_turn),
+        "random_event": _timed(metrics, "random_event", (), game.random_event),
+        "save_game": _timed(metrics, "save_game", (), game.save_game),
+        "load_game": _timed(metrics, "load_game", (), game.load_game),
+        "check_win_condition": _timed(metrics, "check", (("rule", "win"),),
+                                      game.check_win_condition, cpu=False),
+        "check_lose_condition": _timed(metrics, "check", (("rule", "lose"),),
+                                       game.check_lose_condition, cpu=False),
+    }
+    for name in EVENT_NAMES:
+        methods[f"event_{name}"] = _timed(metrics, "event", (("event", name),),
+                                          getattr(game, f"event_{name}"))
+
+    get_choice = _timed(metrics, "get_choice", (), game.get_choice, cpu=False)
+
+    def counted_choice(max_choice: int) -> int:
+        event = game.current_event or "menu"
+        choice = get_choice(max_choice)
+        metrics.counters["choices", (("event", event), ("choice", str(choice)))] += 1
+        return choice
+    methods["get_choice"] = counted_choice
+
+    apply_choice = game.apply_choice
+
+    def counted_outcome(name: str, choice: int):
+        apply_choice(name, choice)
+        metrics.counters["outcomes", (("event", name), ("outcome", game.last_outcome.key))] += 1
+    methods["apply_choice"] = counted_outcome
+    return methods
+
+
+def instrument(game, metrics: Optional[Metrics] = None) -> Metrics:
+    """Record the game's calls and timings into `metrics` (a new one by default)"""
+    metrics = metrics if metrics is not None else Metrics()
+    uninstrument(game)
+    for name, wrapper in _wrapped_methods(game, metrics).items():
+        setattr(game, name, wrapper)
+    game.metrics = metrics
+    return metrics
+
+
+def uninstrument(game):
+    """Restore the game's plain methods"""
+    if getattr(game, "metrics", None) is None:
+        return
+    for name in list(vars(game)):
+        if name in _WRAPPED or name.startswith("event_"):
+            delattr(game, name)
+    game.metrics = None
+
+
+_WRAPPED = {"play_turn", "random_event", "save_game", "load_game", "get_choice",
+            "apply_choice", "check_win_condition", "check_lose_condition"}
+
+
+class MetricsDumper:
+    """Rewrites an OpenMetrics file every `interval` seconds"""
+
+    def __init__(self, metrics: Metrics, path: str, interval: float = 10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.metrics.dump(self.path)
+
+    def start(self) -> "MetricsDumper":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and write a final dump"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.metrics.dump(self.path)
+
+
+def main():
+    """Command line entry point"""
+    from accelerando_game import AccelerandoGame
+    from choices import PolicyChoices
+    from renderer import NullRenderer
+    from rng import RngStream
+    from simulator import DEFAULT_MAX_TURNS, random_policy
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="metrics.txt")
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    streams = RngStream(args.seed)
+    for index in range(args.games):
+        game = AccelerandoGame(NullRenderer(), PolicyChoices(random_policy(args.seed + index)),
+                               rng=streams.child(index))
+        instrument(game, metrics)
+        while not game.state.game_over and game.state.turn < DEFAULT_MAX_TURNS:
+            game.play_turn()
+    metrics.dump(args.out)
+    turns = metrics.timings["turn", ()]
+    print(f"{turns.count} turns, {turns.wall / turns.count * 1e6:.1f} us/turn instrumented; "
+          f"metrics written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
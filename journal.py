@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Save backends for Accelerando: Lobsters
+
+- JsonFileBackend writes the whole state as indented JSON, the classic
+  accelerando_save.json format, but atomically: the new file is written
+  and fsynced under a temporary name and renamed over the old one, so a
+  crash leaves either the old save or the new one, never a truncated file.
+- JournalBackend appends one compact line per save to `<save>.journal`:
+  a sequence number, the event and choice just played, and only the stats
+  that changed since the previous record. Every `snapshot_every` records
+  it rewrites the snapshot (the same JSON file, plus its sequence number)
+  atomically and starts a new journal. fsyncs of the journal are coalesced
+  to one per `sync_every` records or `sync_interval` seconds; records are
+  still handed to the OS on every save, so only a machine crash can lose
+  the records since the last fsync. Loading reads the snapshot and replays
+  the journal records after it, ignoring a torn final line.
+
+Usage:
+    python3 journal.py --saves 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+from accelerando_game import GameState
+from event_table import EVENT_NAMES, play, regenerate
+
+
+# The event and choice that led to a saved state, if known
+Move = Optional[Tuple[str, int]]
+
+_FLAGS = ("game_over", "victory")
+
+
+def atomic_write(path: str, text: str):
+    """Replace `path` with `text` so readers see the old or the new file only"""
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix=".tmp-",
+                                         suffix=os.path.basename(path))
+    try:
+        with os.fdopen(handle, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    _sync_directory(directory)
+
+
+def _sync_directory(directory: str):
+    # Makes the rename durable; not possible on every platform
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _read_snapshot(path: str) -> Tuple[GameState, int]:
+    with open(path, "r") as f:
+        data = json.load(f)
+    sequence = data.pop("sequence", 0)
+    return GameState.from_dict(data), sequence
+
+
+class JsonFileBackend:
+    """Whole-state JSON saves, replaced atomically"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def save(self, state: GameState, move: Move = None):
+        atomic_write(self.path, json.dumps(state.to_dict(), indent=2))
+
+    def load(self) -> GameState:
+        return _read_snapshot(self.path)[0]
+
+    def close(self):
+        pass
+
+
+class JournalBackend:
+    """Append-only per-save deltas with periodic atomic snapshots"""
+
+    def __init__(self, path: str, snapshot_every: int = 100,
+                 sync_every: int = 32, sync_interval: float = 1.0):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.snapshot_every = snapshot_every
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.sequence = 0          # Number of the last record written or replayed
+        self.since_snapshot = 0    # Records in the current journal
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.fsyncs = 0
+        self._last: Optional[tuple] = None  # Vector and flags as of the last record
+        self._file = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    def save(self, state: GameState, move: Move = None):
+        """Append the change since the previous save"""
+        vector = state.vector()
+        flags = tuple(getattr(state, name) for name in _FLAGS)
+        if self._last is None:
+            if self.exists():
+                self.load()
+            else:
+                self._snapshot(GameState(), 0)
+        old_vector, old_flags = self._last
+        changes = [[index, new - old]
+                   for index, (old, new) in enumerate(zip(old_vector, vector))
+                   if new != old]
+        self.sequence += 1
+        record = [self.sequence, move[0] if move else None,
+                  move[1] if move else None, changes]
+        if flags != old_flags:
+            record.append([int(flag) for flag in flags])
+        self._append(json.dumps(record, separators=(",", ":")) + "\n")
+        self._last = (vector, flags)
+
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every:
+            self._snapshot(state, self.sequence)
+
+    def _append(self, line: str):
+        if self._file is None:
+            self._file = open(self.journal_path, "a")
+        self._file.write(line)
+        self._file.flush()
+        self.unsynced += 1
+        if (self.unsynced >= self.sync_every
+                or time.monotonic() - self.last_sync >= self.sync_interval):
+            self.sync()
+
+    def sync(self):
+        """fsync any journal records not yet on disk"""
+        if self._file is not None and self.unsynced:
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _snapshot(self, state: GameState, sequence: int):
+        data = state.to_dict()
+        data["sequence"] = sequence
+        atomic_write(self.path, json.dumps(data, indent=2))
+        # Records up to `sequence` are now redundant; a crash before the
+        # truncation only leaves records that load() skips
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self.journal_path, "w").close()
+        self.sequence = sequence
+        self.since_snapshot = 0
+        self.unsynced = 0
+        self._last = (state.vector(), tuple(getattr(state, name) for name in _FLAGS))
+
+    def records(self) -> List[list]:
+        """Complete journal records, oldest first"""
+        return self._read_records()[0]
+
+    def _read_records(self) -> Tuple[List[list], int]:
+        # Returns the records and the length of the journal they cover
+        if not os.path.exists(self.journal_path):
+            return [], 0
+        records = []
+        length = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn final write
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                length += len(line)
+        return records, length
+
+    def load(self) -> GameState:
+        """The latest snapshot with the journal replayed on top"""
+        if os.path.exists(self.path):
+            state, sequence = _read_snapshot(self.path)
+        else:
+            state, sequence = GameState(), 0
+        vector = list(state.vector())
+        replayed = 0
+        records, length = self._read_records()
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > length:
+            # Drop a torn tail so new records are not appended after it
+            os.truncate(self.journal_path, length)
+        for record in records:
+            if record[0] <= sequence:
+                continue
+            for index, change in record[3]:
+                vector[index] += change
+            if len(record) > 4:
+                state.game_over, state.victory = (bool(flag) for flag in record[4])
+            sequence = record[0]
+            replayed += 1
+        state.set_vector(vector)
+        self.sequence = sequence
+        self.since_snapshot = replayed
+        self._last = (tuple(vector), tuple(getattr(state, name) for name in _FLAGS))
+        return state
+
+    def close(self):
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--saves", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    states = []
+    state = GameState()
+    for _ in range(args.saves):
+        vector = regenerate(state.vector(), rng)
+        event = rng.choice(EVENT_NAMES)
+        choice = rng.randint(1, 4)
+        state = GameState(*play(event, choice, vector, rng)[0])
+        states.append((state, (event, choice)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in (JsonFileBackend(os.path.join(directory, "json.json")),
+                        JournalBackend(os.path.join(directory, "journal.json"))):
+            start = time.perf_counter()
+            for state, move in states:
+                backend.save(state, move)
+            backend.close()
+            elapsed = time.perf_counter() - start
+            assert backend.load() == states[-1][0]
+            extra = f", {backend.fsyncs} fsyncs" if isinstance(backend, JournalBackend) else ""
+            print(f"{type(backend).__name__:16s} {args.saves / elapsed:10,.0f} saves/sec{extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Optimal-policy MDP solver for Accelerando: Lobsters
+
+Finds the best achievable win rate from the default GameState, and the
+choice that achieves it for every event in every state, by value
+iteration over an abstracted state space:
+
+- turn, patents_released and pamela_relationship are dropped, since no
+  requirement or win/lose rule reads them;
+- dead_kittens and entities_helped are kept exactly;
+- the other resources live on a bounded grid of representative values
+  (GRID); values between grid points are split between the two
+  neighbours (multilinear interpolation) and values beyond the ends are
+  clamped;
+- regeneration and idea bonuses are applied at their mean.
+
+The abstract states are indexed densely by their grid coordinates, so
+the value function is a NumPy array and one sweep of value iteration is
+a handful of array operations per event outcome. Terminal states use
+victory_reached/defeat_reached on the exact successor values.
+
+NumPy is required.
+
+Usage:
+    python3 mdp.py --verify 20000
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional for the rest of the game
+    np = None
+
+from accelerando_game import GameState, defeat_reached, victory_reached
+from event_table import (EVENT_NAMES, EVENTS, FIELD_INDEX, REGENERATION,
+                         ROLL_SIDES, STAT_FIELDS, TURN_DELTA, Choice, Outcome)
+
+
+# Representative values per abstracted field, in axis order. Grid points
+# sit on the thresholds the requirements and rules compare against.
+GRID: Dict[str, Tuple[int, ...]] = {
+    "reputation": (5, 10, 20, 30, 40, 50, 60, 75, 90, 120),
+    "singularity_progress": (0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100),
+    "ideas": (0, 5, 10, 20, 30),
+    "bandwidth": (1, 10, 15, 25, 30, 40, 60, 90, 130),
+    "influence": (0, 5, 10, 15, 20, 30, 45),
+    "dead_kittens": tuple(range(10)),
+    "entities_helped": tuple(range(11)),
+}
+
+# Coarser grid for quick checks
+SMALL_GRID: Dict[str, Tuple[int, ...]] = {
+    "reputation": (5, 25, 50, 75, 100),
+    "singularity_progress": (0, 25, 50, 75, 100),
+    "ideas": (0, 10, 20),
+    "bandwidth": (1, 15, 30, 40, 90),
+    "influence": (0, 10, 15, 20, 40),
+    "dead_kittens": tuple(range(10)),
+    "entities_helped": tuple(range(11)),
+}
+
+
+def _mean_regeneration() -> List[float]:
+    shift = [float(value) for value in TURN_DELTA]
+    for index, low, high in REGENERATION:
+        shift[index] += (low + high) / 2
+    return shift
+
+
+class _Axes:
+    """Attribute access to broadcastable grid value arrays by field name"""
+
+    def __init__(self, arrays: Dict[str, object]):
+        self.arrays = arrays
+
+    def __getattr__(self, name):
+        return self.arrays.get(name, 0)
+
+
+class MDPSolution:
+    """Optimal values and choices over the abstract grid"""
+
+    def __init__(self, grid: Dict[str, Tuple[int, ...]], values, choices,
+                 sweeps: int, residual: float, elapsed: float):
+        self.fields = tuple(grid)
+        self.grid = [np.asarray(grid[name], dtype=float) for name in self.fields]
+        self.values = values       # P(victory) per abstract state
+        self.choices = choices     # 1-based best choice, shape (events, *grid)
+        self.sweeps = sweeps
+        self.residual = residual
+        self.elapsed = elapsed
+
+    @property
+    def states(self) -> int:
+        return int(self.values.size)
+
+    def index(self, state: GameState) -> Tuple[int, ...]:
+        """Grid coordinates nearest to a concrete state"""
+        coordinates = []
+        for name, points in zip(self.fields, self.grid):
+            value = min(max(getattr(state, name), points[0]), points[-1])
+            position = int(np.searchsorted(points, value))
+            if position and (position == len(points)
+                             or value - points[position - 1] < points[position] - value):
+                position -= 1
+            coordinates.append(position)
+        return tuple(coordinates)
+
+    def win_probability(self, state: Optional[GameState] = None) -> float:
+        """Optimal win probability estimated for a state"""
+        return float(self.values[self.index(state or GameState())])
+
+    def policy(self):
+        """A simulator policy that plays the optimal choice of the nearest state"""
+        event_index = {name: index for index, name in enumerate(EVENT_NAMES)}
+
+        def choose(state: GameState, event: str, max_choice: int) -> int:
+            return int(self.choices[(event_index[event],) + self.index(state)])
+        return choose
+
+
+class MDPSolver:
+    """Value iteration over the abstract grid"""
+
+    def __init__(self, grid: Optional[Dict[str, Sequence[int]]] = None):
+        if np is None:
+            raise ImportError("mdp.py needs NumPy")
+        grid = dict(grid or GRID)
+        self.grid = {name: tuple(sorted(points)) for name, points in grid.items()}
+        self.fields = tuple(self.grid)
+        self.shape = tuple(len(points) for points in self.grid.values())
+        self.axes = {}
+        for axis, name in enumerate(self.fields):
+            shape = [1] * len(self.fields)
+            shape[axis] = -1
+            self.axes[name] = np.asarray(self.grid[name], dtype=float).reshape(shape)
+        self.regen = _mean_regeneration()
+        self._outcomes: Dict[Outcome, tuple] = {}
+
+    def _concrete(self, shift: Sequence[float]) -> _Axes:
+        return _Axes({name: values + shift[FIELD_INDEX[name]]
+                      for name, values in self.axes.items()})
+
+    def _compile(self, outcome: Outcome) -> tuple:
+        """Terminal masks and per-axis interpolation of one outcome"""
+        if outcome in self._outcomes:
+            return self._outcomes[outcome]
+        shift = [a + b for a, b in zip(self.regen, outcome.delta)]
+        if outcome.bonus is not None:
+            index, low, high = outcome.bonus
+            shift[index] += (low + high) / 2
+        concrete = self._concrete(shift)
+        victory = np.broadcast_to(victory_reached(concrete), self.shape)
+        defeat = np.broadcast_to(defeat_reached(concrete), self.shape) & ~victory
+
+        steps = []
+        for axis, name in enumerate(self.fields):
+            if FIELD_INDEX[name] in outcome.reset:
+                shift[FIELD_INDEX[name]] = -np.inf
+            if shift[FIELD_INDEX[name]] == 0:
+                continue
+            points = np.asarray(self.grid[name], dtype=float)
+            value = np.clip(points + shift[FIELD_INDEX[name]], points[0], points[-1])
+            low = np.clip(np.searchsorted(points, value, side="right") - 1,
+                          0, len(points) - 2)
+            weight = (value - points[low]) / (points[low + 1] - points[low])
+            shape = [1] * len(self.fields)
+            shape[axis] = -1
+            steps.append((axis, low, weight.reshape(shape)))
+        compiled = (victory, defeat, steps)
+        self._outcomes[outcome] = compiled
+        return compiled
+
+    def _outcome_value(self, values, outcome: Outcome):
+        victory, defeat, steps = self._compile(outcome)
+        shifted = values
+        for axis, low, weight in steps:
+            shifted = (np.take(shifted, low, axis=axis) * (1.0 - weight)
+                       + np.take(shifted, low + 1, axis=axis) * weight)
+        return np.where(victory, 1.0, np.where(defeat, 0.0, shifted))
+
+    def _requirements(self, spec: Choice):
+        met = np.ones(self.shape, dtype=bool)
+        for index, minimum in spec.requires:
+            name = STAT_FIELDS[index]
+            if name in self.axes:
+                met = met & (self.axes[name] + self.regen[index] >= minimum)
+        return met
+
+    def _choice_value(self, values, spec: Choice):
+        if spec.roll is None:
+            result = self._outcome_value(values, spec.success)
+        else:
+            failure = spec.roll / ROLL_SIDES
+            result = ((1.0 - failure) * self._outcome_value(values, spec.success)
+                      + failure * self._outcome_value(values, spec.failure))
+        if spec.requires:
+            result = np.where(self._requirements(spec), result,
+                              self._outcome_value(values, spec.unmet))
+        return result
+
+    def solve(self, tolerance: float = 1e-6, max_sweeps: int = 1000) -> MDPSolution:
+        """Run value iteration until values move less than `tolerance`"""
+        start = time.perf_counter()
+        values = np.zeros(self.shape)
+        choices = np.ones((len(EVENT_NAMES),) + self.shape, dtype=np.int8)
+        residual = np.inf
+        sweeps = 0
+        while sweeps < max_sweeps and residual > tolerance:
+            sweeps += 1
+            updated = np.zeros(self.shape)
+            for event_index, event in enumerate(EVENT_NAMES):
+                best = None
+                for number, spec in enumerate(EVENTS[event].choices, 1):
+                    value = self._choice_value(values, spec)
+                    if best is None:
+                        best = value
+                        choices[event_index] = number
+                    else:
+                        better = value > best + 1e-12
+                        best = np.where(better, value, best)
+                        choices[event_index][better] = number
+                updated += best
+            updated /= len(EVENT_NAMES)
+            residual = float(np.abs(updated - values).max())
+            values = updated
+        return MDPSolution(self.grid, values, choices, sweeps, residual,
+                           time.perf_counter() - start)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--small", action="store_true", help="use the coarse grid")
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--max-sweeps", type=int, default=1000)
+    parser.add_argument("--verify", type=int, default=0, metavar="GAMES",
+                        help="simulate this many games with the optimal policy")
+    args = parser.parse_args()
+
+    solver = MDPSolver(SMALL_GRID if args.small else GRID)
+    solution = solver.solve(args.tolerance, args.max_sweeps)
+    print(f"States: {solution.states:,} | Sweeps: {solution.sweeps} | "
+          f"Residual: {solution.residual:.2e} | {solution.elapsed:.1f}s")
+    print(f"Optimal win probability from the opening: {solution.win_probability():.4f}")
+    opening = solution.index(GameState())
+    for event_index, event in enumerate(EVENT_NAMES):
+        number = int(solution.choices[(event_index,) + opening])
+        print(f"  {event}: choice {number} - {EVENTS[event].choices[number - 1].label}")
+
+    if args.verify:
+        from simulator import simulate
+        result = simulate(args.verify, solution.policy(), seed=0)
+        print(f"Simulated win rate with this policy: {result.win_rate:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Compact binary encoding of GameState for Accelerando: Lobsters
+
+A PackedState is an immutable bytes object (no __dict__) holding a flag
+byte (game_over, victory) followed by the ten integer stats in STAT_FIELDS
+order. Stats are stored as int16 when they all fit, which is every normal
+game, making a state 21 bytes; otherwise the whole record widens to int32
+(41 bytes). The encoding is canonical, so equal states pack to equal
+bytes, and hashing and equality are those of bytes: PackedStates work
+directly as dictionary and set keys.
+
+pack_many/unpack_many store many states in one contiguous buffer of
+fixed-width records, 21 bytes per state in the common case, against
+about 216 bytes for a GameState object.
+
+Usage:
+    python3 packed_state.py --states 1000000
+"""
+
+import argparse
+import struct
+import time
+import tracemalloc
+from typing import Iterable, List
+
+from accelerando_game import GameState
+from event_table import STAT_FIELDS
+
+
+NARROW = struct.Struct("<B%dh" % len(STAT_FIELDS))
+WIDE = struct.Struct("<B%di" % len(STAT_FIELDS))
+
+# Bits of the flag byte
+GAME_OVER = 1
+VICTORY = 2
+WIDE_RECORD = 4
+
+
+def _flags(state: GameState) -> int:
+    return (GAME_OVER if state.game_over else 0) | (VICTORY if state.victory else 0)
+
+
+class PackedState(bytes):
+    """A GameState packed into a few dozen bytes"""
+
+    __slots__ = ()
+
+    @classmethod
+    def pack(cls, state: GameState) -> "PackedState":
+        return cls.from_vector(state.vector(), state.game_over, state.victory)
+
+    @classmethod
+    def from_vector(cls, vector, game_over: bool = False,
+                    victory: bool = False) -> "PackedState":
+        """Pack a STAT_FIELDS-ordered vector and the two flags"""
+        flags = (GAME_OVER if game_over else 0) | (VICTORY if victory else 0)
+        try:
+            return cls(NARROW.pack(flags, *vector))
+        except struct.error:
+            return cls(WIDE.pack(flags | WIDE_RECORD, *vector))
+
+    def _fields(self) -> tuple:
+        return (WIDE if self[0] & WIDE_RECORD else NARROW).unpack(self)
+
+    def vector(self) -> tuple:
+        """The integer stats in STAT_FIELDS order"""
+        return self._fields()[1:]
+
+    @property
+    def game_over(self) -> bool:
+        return bool(self[0] & GAME_OVER)
+
+    @property
+    def victory(self) -> bool:
+        return bool(self[0] & VICTORY)
+
+    def unpack(self) -> GameState:
+        flags, *vector = self._fields()
+        return GameState(*vector, bool(flags & GAME_OVER), bool(flags & VICTORY))
+
+    def __repr__(self) -> str:
+        return f"PackedState({self.unpack()!r})"
+
+
+def pack_many(states: Iterable[GameState]) -> bytes:
+    """Pack states into one buffer: a layout byte, then fixed-width records"""
+    rows = [(_flags(state),) + state.vector() for state in states]
+    try:
+        return bytes((0,)) + b"".join([NARROW.pack(*row) for row in rows])
+    except struct.error:
+        return bytes((WIDE_RECORD,)) + b"".join([WIDE.pack(*row) for row in rows])
+
+
+def _layout(buffer: bytes) -> struct.Struct:
+    return WIDE if buffer[0] & WIDE_RECORD else NARROW
+
+
+def count_packed(buffer: bytes) -> int:
+    """Number of states in a pack_many buffer"""
+    return (len(buffer) - 1) // _layout(buffer).size
+
+
+def unpack_many(buffer: bytes) -> List[GameState]:
+    """Inverse of pack_many"""
+    states = []
+    for flags, *vector in _layout(buffer).iter_unpack(memoryview(buffer)[1:]):
+        states.append(GameState(*vector, bool(flags & GAME_OVER), bool(flags & VICTORY)))
+    return states
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--states", type=int, default=100000)
+    args = parser.parse_args()
+
+    states = [GameState(turn=index % 500, reputation=index % 120)
+              for index in range(args.states)]
+
+    def measure(build):
+        tracemalloc.start()
+        start = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return value, size / args.states, elapsed
+
+    _, objects, _ = measure(lambda: [GameState(turn=index) for index in range(args.states)])
+    packed, each, pack_time = measure(lambda: [PackedState.pack(s) for s in states])
+    buffer, contiguous, bulk_time = measure(lambda: pack_many(states))
+    start = time.perf_counter()
+    unpack_many(buffer)
+    unpack_time = time.perf_counter() - start
+
+    print(f"GameState objects:   {objects:7.1f} bytes/state")
+    print(f"PackedState objects: {each:7.1f} bytes/state "
+          f"({args.states / pack_time:,.0f} packs/sec)")
+    print(f"pack_many buffer:    {contiguous:7.1f} bytes/state "
+          f"({args.states / bulk_time:,.0f} states/sec packed, "
+          f"{args.states / unpack_time:,.0f} states/sec unpacked)")
+    print(f"Distinct keys: {len(set(packed))}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
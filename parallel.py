@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Process-pool parallel simulation runner for Accelerando: Lobsters
+
+Splits a simulation job into fixed-size chunks, each with its own seed
+derived from the job seed and the chunk index, and runs the chunks on a
+ProcessPoolExecutor. Workers return aggregated SimulationResult totals
+rather than per-game objects. Because the chunking does not depend on the
+number of workers, the same seed gives identical merged results whether
+the job runs on one core or sixty-four (for a given engine; the batch
+engine's streams differ between its NumPy and array backends).
+
+Usage:
+    python3 parallel.py --games 10000000 --workers 8 --seed 42
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from rng import derive_seed
+from simulator import DEFAULT_MAX_TURNS, POLICIES, SimulationResult, simulate
+
+
+ENGINES = ("batch", "table")
+DEFAULT_CHUNK_SIZE = 50000
+
+
+class Chunk(NamedTuple):
+    """One independently seeded slice of a simulation job"""
+    index: int
+    games: int
+    seed: int
+    policy: str
+    engine: str
+    max_turns: int
+
+
+def chunk_seed(seed: int, index: int) -> int:
+    """Derive the 64-bit seed of one chunk from the job seed"""
+    return derive_seed(seed, index)
+
+
+def plan_chunks(games: int, seed: int, policy: str = "random",
+                engine: str = "batch", max_turns: int = DEFAULT_MAX_TURNS,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Chunk]:
+    """Split a job into chunks; the plan depends only on games and chunk_size"""
+    chunks = []
+    for index, start in enumerate(range(0, games, chunk_size)):
+        size = min(chunk_size, games - start)
+        chunks.append(Chunk(index, size, chunk_seed(seed, index), policy,
+                            engine, max_turns))
+    return chunks
+
+
+def run_chunk(chunk: Chunk) -> SimulationResult:
+    """Simulate one chunk; runs inside a worker process"""
+    if chunk.engine == "batch":
+        from batch import BATCH_POLICIES, BatchSimulator
+        simulator = BatchSimulator(chunk.games, BATCH_POLICIES[chunk.policy],
+                                   seed=chunk.seed, max_turns=chunk.max_turns)
+        return simulator.run()
+    return simulate(chunk.games, POLICIES[chunk.policy](chunk.seed),
+                    seed=chunk.seed, max_turns=chunk.max_turns)
+
+
+def run_parallel(games: int, seed: int, workers: Optional[int] = None,
+                 policy: str = "random", engine: str = "batch",
+                 max_turns: int = DEFAULT_MAX_TURNS,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> SimulationResult:
+    """Run a simulation job across worker processes and merge the results"""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    chunks = plan_chunks(games, seed, policy, engine, max_turns, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if workers == 1 or len(chunks) == 1:
+        merged = _merge(map(run_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            merged = _merge(pool.map(run_chunk, chunks))
+    merged.elapsed = time.perf_counter() - start
+    return merged
+
+
+def _merge(results) -> SimulationResult:
+    merged = SimulationResult()
+    for result in results:
+        merged.merge(result)
+    return merged
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--engine", choices=ENGINES, default="batch")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    result = run_parallel(args.games, args.seed, args.workers, args.policy,
+                          args.engine, args.max_turns, args.chunk_size)
+    print(result.summary())
+    print("Turn distribution:")
+    for turn in sorted(result.turns):
+        print(f"  {turn:4d}: {result.turns[turn]}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Evolutionary search for strong choice policies in Accelerando: Lobsters
+
+A table policy picks each event's option from a small table indexed by
+the event and a coarse state bucket: each bucketed stat is cut at a few
+thresholds (by default reputation at 30 and influence at 20, four buckets
+in all). A genetic algorithm evolves these tables: tournament selection,
+uniform crossover, per-entry mutation and elitism, seeded with the fixed
+policies (always option 1, always option 2, ...). Candidates rank by win
+rate, ties broken by shorter games.
+
+Every candidate of a run is scored on the same seeded games through the
+batched engine (common random numbers), so two candidates differ in
+fitness because they play differently, not because one was dealt better
+events. Candidates are scored in parallel across cores, and fitness is
+cached per policy hash, simulation settings and engine version, in memory
+and optionally on disk, so a policy seen again is never replayed. Because
+the search tunes against one set of games, the winner is re-scored on
+fresh games at the end, next to the fixed policies.
+
+Usage:
+    python3 policy_search.py --games 20000 --generations 30 --seed 1
+    python3 policy_search.py --bucket reputation=20,40 --bucket bandwidth=40 \\
+        --cache policy_cache.json --out best_policy.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+import batch
+import event_table
+import rules as rules_module
+from batch import CHOICE_COUNTS, BatchPolicy, BatchSimulator
+from event_table import EVENT_NAMES, EVENTS, FIELD_INDEX
+from journal import atomic_write
+from simulator import DEFAULT_MAX_TURNS, Policy
+from sweep import engine_version
+
+
+# Changes whenever the batched engine's game logic changes
+ENGINE_VERSION = engine_version(batch, event_table, rules_module)
+
+# (stat, cut points): a stat falls in bucket bisect_right(cuts, value)
+Buckets = Tuple[Tuple[str, Tuple[int, ...]], ...]
+DEFAULT_BUCKETS: Buckets = (("reputation", (30,)), ("influence", (20,)))
+
+
+class TablePolicy(NamedTuple):
+    """A choice for every (event, state bucket), stored event-major"""
+    choices: Tuple[int, ...]  # choices[event * buckets + bucket], 1-based
+    buckets: Buckets = DEFAULT_BUCKETS
+
+    @classmethod
+    def fixed(cls, choice: int, buckets: Buckets = DEFAULT_BUCKETS) -> "TablePolicy":
+        """Always `choice` (or the event's last option, if it has fewer)"""
+        size = bucket_count(buckets)
+        return cls(tuple(min(choice, count) for count in CHOICE_COUNTS
+                         for _ in range(size)), buckets)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TablePolicy":
+        return cls(tuple(data["choices"]),
+                   tuple((field, tuple(cuts)) for field, cuts in data["buckets"]))
+
+    def to_dict(self) -> dict:
+        return {"buckets": [[field, list(cuts)] for field, cuts in self.buckets],
+                "choices": list(self.choices)}
+
+    def key(self) -> str:
+        """Hash of the table and its buckets"""
+        return hashlib.sha256(json.dumps(self.to_dict()).encode()).hexdigest()[:24]
+
+    def bucket(self, state) -> int:
+        """Bucket of a GameState (or anything with the stats as attributes)"""
+        index = 0
+        for field, cuts in self.buckets:
+            index = index * (len(cuts) + 1) + bisect_right(cuts, getattr(state, field))
+        return index
+
+    def choice(self, state, event: str) -> int:
+        size = bucket_count(self.buckets)
+        return self.choices[EVENT_NAMES.index(event) * size + self.bucket(state)]
+
+    def policy(self) -> Policy:
+        """The table as a simulator policy, for play_game and the server"""
+        positions = {name: position for position, name in enumerate(EVENT_NAMES)}
+        choices, size = self.choices, bucket_count(self.buckets)
+
+        def policy(state, event: str, max_choice: int) -> int:
+            return min(choices[positions[event] * size + self.bucket(state)], max_choice)
+        return policy
+
+    def batch_policy(self) -> BatchPolicy:
+        """The table as a batch policy: one gather per step under NumPy"""
+        size = bucket_count(self.buckets)
+        choices = self.choices
+        lookup = np.asarray(choices) if np is not None else None
+
+        def policy(stats, events, rng):
+            if lookup is not None and isinstance(events, np.ndarray):
+                index = events * size
+                scale = size
+                for field, cuts in self.buckets:
+                    scale //= len(cuts) + 1
+                    index += scale * np.searchsorted(cuts, getattr(stats, field), "right")
+                return lookup[index]
+            columns = [getattr(stats, field) for field, _ in self.buckets]
+            picked = []
+            for row, event in enumerate(events):
+                index = 0
+                for (_, cuts), column in zip(self.buckets, columns):
+                    index = index * (len(cuts) + 1) + bisect_right(cuts, column[row])
+                picked.append(choices[event * size + index])
+            return picked
+        return policy
+
+    def describe(self) -> List[str]:
+        """The table as text: per event, the option label chosen in each bucket"""
+        labels = []
+        for field, cuts in self.buckets:
+            bounds = [None, *cuts, None]
+            labels.append([f"{field} < {high}" if low is None else
+                           f"{field} >= {low}" if high is None else
+                           f"{field} {low}-{high - 1}"
+                           for low, high in zip(bounds, bounds[1:])])
+        names = [" & ".join(parts) for parts in _product(labels)]
+        size = bucket_count(self.buckets)
+        width = max(map(len, names))
+        lines = []
+        for position, event in enumerate(EVENT_NAMES):
+            row = self.choices[position * size:(position + 1) * size]
+            lines.append(f"{event}:")
+            if len(set(row)) == 1:
+                lines.append(f"  always {row[0]}. {EVENTS[event].choices[row[0] - 1].label}")
+                continue
+            for name, choice in zip(names, row):
+                label = EVENTS[event].choices[choice - 1].label
+                lines.append(f"  {name:{width}s}  {choice}. {label}")
+        return lines
+
+
+def _product(groups: List[List[str]]) -> List[List[str]]:
+    combos: List[List[str]] = [[]]
+    for group in groups:
+        combos = [combo + [item] for combo in combos for item in group]
+    return combos
+
+
+def bucket_count(buckets: Buckets) -> int:
+    size = 1
+    for _, cuts in buckets:
+        size *= len(cuts) + 1
+    return size
+
+
+class Fitness(NamedTuple):
+    """How a policy did on its evaluation games"""
+    games: int
+    victories: int
+    turns: int  # Total over all games
+
+    @property
+    def win_rate(self) -> float:
+        return self.victories / self.games if self.games else 0.0
+
+    @property
+    def mean_turns(self) -> float:
+        return self.turns / self.games if self.games else 0.0
+
+
+class _Job(NamedTuple):
+    policy: TablePolicy
+    games: int
+    seed: int
+    max_turns: int
+
+    def key(self) -> str:
+        return f"{self.policy.key()}:{self.games}:{self.seed}:{self.max_turns}:{ENGINE_VERSION}"
+
+
+def evaluate(job: _Job) -> Fitness:
+    """Play a policy's games in one batch; runs inside a worker process"""
+    result = BatchSimulator(job.games, job.policy.batch_policy(), seed=job.seed,
+                            max_turns=job.max_turns).run()
+    return Fitness(result.games, result.victories,
+                   sum(turn * count for turn, count in result.turns.items()))
+
+
+class FitnessCache:
+    """Fitness by job key, kept in memory and saved to an optional JSON file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Fitness] = {}
+        self.hits = 0
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.entries = {key: Fitness(*value) for key, value in json.load(f).items()}
+
+    def get(self, job: _Job) -> Optional[Fitness]:
+        fitness = self.entries.get(job.key())
+        if fitness is not None:
+            self.hits += 1
+        return fitness
+
+    def put(self, job: _Job, fitness: Fitness):
+        self.entries[job.key()] = fitness
+
+    def save(self):
+        if self.path is not None:
+            atomic_write(self.path, json.dumps(
+                {key: list(value) for key, value in self.entries.items()}))
+
+
+def evaluate_all(policies: Sequence[TablePolicy], games: int, seed: int,
+                 max_turns: int = DEFAULT_MAX_TURNS, cache: Optional[FitnessCache] = None,
+                 pool: Optional[ProcessPoolExecutor] = None) -> List[Fitness]:
+    """Fitness of every policy on the same seeded games, skipping cached ones"""
+    cache = cache if cache is not None else FitnessCache()
+    jobs = [_Job(policy, games, seed, max_turns) for policy in policies]
+    missing = list({job.key(): job for job in jobs if cache.get(job) is None}.values())
+    computed = pool.map(evaluate, missing) if pool is not None else map(evaluate, missing)
+    for job, fitness in zip(missing, computed):
+        cache.put(job, fitness)
+    return [cache.entries[job.key()] for job in jobs]
+
+
+class SearchResult(NamedTuple):
+    best: TablePolicy
+    fitness: Fitness
+    history: List[Tuple[float, float]]  # Per generation: (best, mean) win rate
+    evaluated: int                      # Candidates actually played
+
+
+def _mutate(choices: List[int], rate: float, generator: random.Random,
+            limits: Sequence[int]) -> List[int]:
+    return [generator.randint(1, limit) if generator.random() < rate else choice
+            for choice, limit in zip(choices, limits)]
+
+
+def search(games: int = 20000, seed: int = 0, generations: int = 30,
+           population: int = 40, elite: int = 4, tournament: int = 3,
+           mutation: Optional[float] = None, buckets: Buckets = DEFAULT_BUCKETS,
+           max_turns: int = DEFAULT_MAX_TURNS, workers: Optional[int] = None,
+           cache: Optional[FitnessCache] = None, log=None) -> SearchResult:
+    """Evolve table policies, scoring all candidates on the same seeded games
+
+    Candidates rank by win rate, then by shorter games: once several
+    policies always win, the faster one is the stronger strategy.
+    """
+    cache = cache if cache is not None else FitnessCache()
+    generator = random.Random(seed)
+    size = bucket_count(buckets)
+    limits = [count for count in CHOICE_COUNTS for _ in range(size)]
+    mutation = mutation if mutation is not None else 1.5 / len(limits)
+
+    candidates = [TablePolicy.fixed(choice, buckets) for choice in range(1, max(limits) + 1)]
+    while len(candidates) < population:
+        candidates.append(TablePolicy(tuple(generator.randint(1, limit) for limit in limits),
+                                      buckets))
+    candidates = candidates[:population]
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    history: List[Tuple[float, float]] = []
+    known = len(cache.entries)
+    try:
+        for generation in range(generations + 1):
+            fitness = evaluate_all(candidates, games, seed, max_turns, cache, pool)
+            scores = [(entry.win_rate, -entry.mean_turns) for entry in fitness]
+            ranked = sorted(range(len(candidates)), key=scores.__getitem__, reverse=True)
+            leader = fitness[ranked[0]]
+            history.append((leader.win_rate,
+                            sum(entry.win_rate for entry in fitness) / len(fitness)))
+            if log is not None:
+                log(f"generation {generation:3d}: best {leader.win_rate:7.2%} "
+                    f"in {leader.mean_turns:5.2f} turns, mean {history[-1][1]:7.2%}")
+            if generation == generations:
+                break
+
+            def pick() -> TablePolicy:
+                entrants = generator.sample(range(len(candidates)), tournament)
+                return candidates[max(entrants, key=scores.__getitem__)]
+
+            offspring = [candidates[index] for index in ranked[:elite]]
+            while len(offspring) < population:
+                mother, father = pick(), pick()
+                child = [m if generator.random() < 0.5 else f
+                         for m, f in zip(mother.choices, father.choices)]
+                offspring.append(TablePolicy(tuple(_mutate(child, mutation, generator,
+                                                           limits)), buckets))
+            candidates = offspring
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    best = candidates[ranked[0]]
+    return SearchResult(best, cache.entries[_Job(best, games, seed, max_turns).key()],
+                        history, len(cache.entries) - known)
+
+
+def _parse_bucket(text: str) -> Tuple[str, Tuple[int, ...]]:
+    field, _, cuts = text.partition("=")
+    if field not in FIELD_INDEX:
+        raise argparse.ArgumentTypeError(f"unknown stat {field!r}")
+    return field, tuple(sorted(int(cut) for cut in cuts.split(",")))
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=20000, help="games per candidate")
+    parser.add_argument("--generations", type=int, default=30)
+    parser.add_argument("--population", type=int, default=40)
+    parser.add_argument("--elite", type=int, default=4)
+    parser.add_argument("--mutation", type=float, default=None,
+                        help="per-entry mutation rate (default 1.5 / table size)")
+    parser.add_argument("--bucket", type=_parse_bucket, action="append", default=None,
+                        metavar="STAT=CUT[,CUT...]", help="bucket a stat at these values")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--holdout", type=int, default=100000,
+                        help="fresh games to re-score the winner on")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=None, help="JSON file to keep fitness in")
+    parser.add_argument("--out", default=None, help="write the best policy as JSON")
+    args = parser.parse_args()
+
+    buckets = tuple(args.bucket) if args.bucket else DEFAULT_BUCKETS
+    cache = FitnessCache(args.cache)
+    start = time.perf_counter()
+    found = search(args.games, args.seed, args.generations, args.population, args.elite,
+                   mutation=args.mutation, buckets=buckets, max_turns=args.max_turns,
+                   workers=args.workers, cache=cache, log=print)
+    cache.save()
+    print(f"{found.evaluated} candidates played, {cache.hits} cached "
+          f"({time.perf_counter() - start:.1f}s)")
+    print("\nBest policy:")
+    print("\n".join(found.best.describe()))
+
+    contenders = [("best", found.best)] + [
+        (f"always {choice}", TablePolicy.fixed(choice, buckets))
+        for choice in range(1, max(CHOICE_COUNTS) + 1)]
+    holdout = evaluate_all([policy for _, policy in contenders], args.holdout,
+                           args.seed + 1, args.max_turns)
+    print(f"\nOn {args.holdout:,} fresh games:")
+    for (name, _), fitness in zip(contenders, holdout):
+        print(f"  {name:10s} {fitness.win_rate:7.2%}  mean turns {fitness.mean_turns:5.1f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(found.best.to_dict(), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Output backends for Accelerando: Lobsters
+
+All game text goes through a renderer's write(), which takes one or more
+lines, like a print() per argument:
+
+- TerminalRenderer prints each line immediately (the classic behaviour)
+- BufferedRenderer collects a turn's lines and writes them in one call
+  when flushed, which the game does before waiting for input
+- NullRenderer discards everything; its `enabled` flag is False so the
+  game can skip building the text at all
+"""
+
+from __future__ import annotations
+
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # typing costs milliseconds of game startup
+    from typing import List, Optional, TextIO
+
+
+class Renderer:
+    """Base class for game output backends"""
+
+    enabled = True  # False when output is discarded
+
+    def write(self, *lines: str):
+        """Emit each argument as one line of output"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Make everything written so far visible"""
+
+
+class TerminalRenderer(Renderer):
+    """Prints every line straight to stdout"""
+
+    def write(self, *lines: str):
+        for line in lines or ("",):
+            print(line)
+
+
+class BufferedRenderer(Renderer):
+    """Collects lines and writes them to the stream in one call on flush"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream  # None means sys.stdout at flush time
+        self.lines: List[str] = []
+
+    def write(self, *lines: str):
+        self.lines.extend(lines or ("",))
+
+    def flush(self):
+        if not self.lines:
+            return
+        stream = self.stream or sys.stdout
+        self.lines.append("")
+        stream.write("\n".join(self.lines))
+        stream.flush()
+        self.lines.clear()
+
+
+class NullRenderer(Renderer):
+    """Discards all output"""
+
+    enabled = False
+
+    def write(self, *lines: str):
+        pass
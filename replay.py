@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Deterministic record/replay for Accelerando: Lobsters
+
+A Replay holds what is needed to re-run a game exactly: the seed of the
+game's RngStream (rng.py), the choice made at every event (one byte each)
+and a CRC32 digest of the state at every event prompt. Menu answers are
+not recorded; they never change the state.
+
+record(game) gives a game a seeded RNG and wraps its choice provider so
+the replay fills in as the game is played; server sessions record their
+replays the same way. run_replay re-executes a replay through the real
+play_turn with a NullRenderer, comparing digests as it goes, and reports
+the turn at which the game first diverges from the recording.
+verify_many checks thousands of replays, e.g. after a balance change.
+
+Usage:
+    python3 replay.py play --out game.replay
+    python3 replay.py record --games 1000 --out replays.jsonl
+    python3 replay.py verify replays.jsonl
+"""
+
+import argparse
+import json
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import ChoiceProvider, PolicyChoices
+from packed_state import PackedState
+from renderer import NullRenderer
+from rng import RngStream
+from simulator import DEFAULT_MAX_TURNS, random_policy
+
+
+Seed = Union[int, str]
+
+
+def state_digest(state: GameState) -> int:
+    """CRC32 of the packed state"""
+    return zlib.crc32(PackedState.pack(state))
+
+
+def new_seed() -> int:
+    """A fresh 64-bit seed from the operating system"""
+    return random.SystemRandom().getrandbits(64)
+
+
+def _start(state: GameState) -> Optional[dict]:
+    return None if state == GameState() else state.to_dict()
+
+
+@dataclass
+class Replay:
+    """Seed, event choices and per-event state digests of one game"""
+    seed: Seed
+    choices: bytearray = field(default_factory=bytearray)
+    digests: List[int] = field(default_factory=list)
+    start: Optional[dict] = None  # Starting state, when not a new game
+
+    def add(self, state: GameState, choice: int):
+        """Record the state at an event prompt and the choice made"""
+        self.digests.append(state_digest(state))
+        self.choices.append(choice)
+
+    def to_json(self) -> str:
+        data = {"seed": self.seed, "choices": "".join(map(str, self.choices)),
+                "digests": self.digests}
+        if self.start is not None:
+            data["start"] = self.start
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> "Replay":
+        data = json.loads(text)
+        return cls(data["seed"], bytearray(int(c) for c in data["choices"]),
+                   data["digests"], data.get("start"))
+
+
+class RecordingChoices(ChoiceProvider):
+    """Passes choices through from another provider, recording event choices"""
+
+    def __init__(self, provider: ChoiceProvider, replay: Replay):
+        self.provider = provider
+        self.replay = replay
+
+    def choose(self, game, max_choice: int) -> int:
+        choice = self.provider.choose(game, max_choice)
+        if game.current_event is not None:
+            self.replay.add(game.state, choice)
+        return choice
+
+    def pause(self, game):
+        if not self.replay.choices:
+            # run() pauses once after the main menu, which may have loaded a save
+            self.replay.start = _start(game.state)
+        self.provider.pause(game)
+
+
+def record(game: AccelerandoGame, seed: Optional[Seed] = None) -> Replay:
+    """Seed the game's RNG and record its choices from now on"""
+    replay = Replay(new_seed() if seed is None else seed, start=_start(game.state))
+    game.rng = RngStream(replay.seed)
+    game.choices = RecordingChoices(game.choices, replay)
+    return replay
+
+
+class Divergence(Exception):
+    """Raised when a replayed game no longer matches its recording"""
+
+    def __init__(self, turn: int):
+        super().__init__(f"diverged at turn {turn}")
+        self.turn = turn
+
+
+class _ReplayChoices(ChoiceProvider):
+    """Feeds recorded choices back, checking each state digest"""
+
+    def __init__(self, replay: Replay):
+        self.replay = replay
+        self.position = 0
+
+    def choose(self, game, max_choice: int) -> int:
+        if game.current_event is None:
+            return 1  # Continue
+        if self.position == len(self.replay.choices):
+            raise EOFError("end of replay")
+        if state_digest(game.state) != self.replay.digests[self.position]:
+            raise Divergence(game.state.turn)
+        choice = self.replay.choices[self.position]
+        self.position += 1
+        if choice > max_choice:
+            raise Divergence(game.state.turn)
+        return choice
+
+
+class ReplayResult(NamedTuple):
+    """Outcome of re-running one replay"""
+    state: GameState
+    diverged_at: Optional[int]  # Turn of the first mismatch, None if faithful
+
+    @property
+    def ok(self) -> bool:
+        return self.diverged_at is None
+
+
+def run_replay(replay: Replay, max_turns: int = DEFAULT_MAX_TURNS) -> ReplayResult:
+    """Re-execute a replay silently through AccelerandoGame.play_turn"""
+    provider = _ReplayChoices(replay)
+    game = AccelerandoGame(NullRenderer(), provider, rng=RngStream(replay.seed))
+    if replay.start is not None:
+        game.state = GameState.from_dict(replay.start)
+    try:
+        while not game.state.game_over and game.state.turn < max_turns:
+            game.play_turn()
+    except Divergence as divergence:
+        return ReplayResult(game.state, divergence.turn)
+    except EOFError:
+        pass
+    if provider.position < len(replay.choices):
+        # The game ended before the recording did
+        return ReplayResult(game.state, game.state.turn)
+    return ReplayResult(game.state, None)
+
+
+def verify_many(replays: Iterable[Replay], workers: int = 1) -> List[Tuple[int, int]]:
+    """(index, turn) of every replay that diverges, in input order"""
+    replays = list(replays)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_replay, replays, chunksize=256))
+    else:
+        results = map(run_replay, replays)
+    return [(index, result.diverged_at) for index, result in enumerate(results)
+            if not result.ok]
+
+
+def record_games(games: int, seed: int = 0) -> List[Replay]:
+    """Play and record games with random choices"""
+    replays = []
+    for index in range(games):
+        game = AccelerandoGame(NullRenderer(), PolicyChoices(random_policy(seed + index)))
+        replay = record(game, f"{seed}/{index}")
+        while not game.state.game_over and game.state.turn < DEFAULT_MAX_TURNS:
+            game.play_turn()
+        replays.append(replay)
+    return replays
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    recording = commands.add_parser("record", help="record games played at random")
+    recording.add_argument("--games", type=int, default=1000)
+    recording.add_argument("--seed", type=int, default=0)
+    recording.add_argument("--out", default="replays.jsonl")
+    playing = commands.add_parser("play", help="play interactively, recording a replay")
+    playing.add_argument("--out", default="game.replay")
+    verifying = commands.add_parser("verify", help="re-run replays and report divergence")
+    verifying.add_argument("file")
+    verifying.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "play":
+        game = AccelerandoGame()
+        replay = record(game)
+        game.run()
+        with open(args.out, "w") as f:
+            f.write(replay.to_json() + "\n")
+        print(f"Replay saved to {args.out}")
+        return 0
+
+    if args.command == "record":
+        replays = record_games(args.games, args.seed)
+        with open(args.out, "w") as f:
+            for replay in replays:
+                f.write(replay.to_json() + "\n")
+        print(f"Recorded {len(replays)} games to {args.out}")
+        return 0
+
+    with open(args.file) as f:
+        replays = [Replay.from_json(line) for line in f if line.strip()]
+    start = time.perf_counter()
+    diverged = verify_many(replays, args.workers)
+    elapsed = time.perf_counter() - start
+    for index, turn in diverged:
+        print(f"Replay {index} diverges at turn {turn}")
+    print(f"Verified {len(replays)} replays in {elapsed:.2f}s "
+          f"({len(replays) / elapsed:,.0f}/sec): {len(diverged)} diverged")
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    exit(main())
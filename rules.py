@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Compiled win/lose rules for Accelerando: Lobsters
+
+A rule is a named conjunction of stat comparisons such as
+"reputation <= 0", leading to victory or defeat, with the lines
+display_defeat shows when it ends a game. A RuleSet compiles its rules
+into generated Python functions, so a check is straight-line comparisons
+with no interpretation:
+
+- victory(state) / defeat(state) combine comparisons with & and |, so
+  they evaluate element-wise on batched arrays as well as on one state
+- first(vector) returns the first rule a STAT_FIELDS vector meets,
+  victory rules before defeat rules
+- cause(state) names the first defeat rule a state meets
+
+RuleTracker checks successive states of one game. For rule sets with
+many conditions per field it remembers the fields the rules read and the
+verdict of every rule, and re-evaluates only the rules that read a field
+which changed since the last check; for small ones, like the default
+rules, straight-line evaluation is cheaper and is used instead.
+
+Rules load from JSON, e.g.
+    {"victory": [{"name": "ascension", "when": ["singularity_progress >= 100",
+                                                 "reputation >= 50"]}],
+     "defeat": [{"name": "reputation", "when": ["reputation <= 0"],
+                 "message": ["Your reputation has been destroyed."]}]}
+
+Usage:
+    python3 rules.py --export rules.json
+    python3 rules.py --check rules.json
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+
+from event_table import FIELD_INDEX
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # The game imports this module; typing costs milliseconds of startup
+    from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+OPERATORS = (">=", "<=", "==", ">", "<")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A named way to win or lose: every condition must hold"""
+    name: str
+    victory: bool
+    conditions: Tuple[Tuple[str, str, int], ...]  # (field name, operator, value)
+    message: Tuple[str, ...] = ()                 # Shown when the rule ends a game
+
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(field for field, _, _ in self.conditions))
+
+
+def parse_condition(text: str) -> Tuple[str, str, int]:
+    """Parse "field op value", e.g. "dead_kittens >= 10" """
+    for operator in OPERATORS:
+        field, found, value = text.partition(operator)
+        if found:
+            field = field.strip()
+            if field not in FIELD_INDEX:
+                raise ValueError(f"Unknown stat {field!r} in rule condition {text!r}")
+            return field, operator, int(value)
+    raise ValueError(f"Rule condition {text!r} needs one of {', '.join(OPERATORS)}")
+
+
+def rule(name: str, victory: bool, *conditions: str, message: Sequence[str] = ()) -> Rule:
+    """Author a rule from condition strings"""
+    return Rule(name, victory, tuple(map(parse_condition, conditions)), tuple(message))
+
+
+def _expression(rule: Rule, access: Callable[[str], str], joiner: str) -> str:
+    terms = [f"({access(field)} {operator} {value})"
+             for field, operator, value in rule.conditions]
+    return joiner.join(terms) if terms else "True"
+
+
+def _run(source: str, namespace: Dict[str, object]) -> Dict[str, object]:
+    exec(compile(source, "<rules>", "exec"), namespace)
+    return namespace
+
+
+def _attribute(field: str) -> str:
+    return f"s.{field}"
+
+
+def _mask(rules: Sequence[Rule]) -> str:
+    if not rules:
+        return "(s.turn != s.turn)"  # False, element-wise for arrays
+    return " | ".join(f"({_expression(rule, _attribute, ' & ')})" for rule in rules)
+
+
+class RuleSet:
+    """Victory and defeat rules compiled into predicates"""
+
+    def __init__(self, victory: Iterable[Rule], defeat: Iterable[Rule]):
+        self.victories = tuple(victory)
+        self.defeats = tuple(defeat)
+        self.rules = self.victories + self.defeats  # Checking order
+        if any(rule.victory for rule in self.defeats) or not all(
+                rule.victory for rule in self.victories):
+            raise ValueError("Victory rules must have victory=True and defeat rules False")
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Rule names must be unique: {names}")
+        self.causes = tuple(rule.name for rule in self.defeats)
+        # Every stat some rule reads, in first-use order
+        self.fields = tuple(dict.fromkeys(field for rule in self.rules
+                                          for field in rule.fields()))
+        self.conditions = sum(len(rule.conditions) for rule in self.rules)
+        self._trackers: Dict[bool, tuple] = {}  # RuleTracker code by tracking mode
+
+        # One generated module, compiled once
+        lines = [f"def victory(s):\n    return {_mask(self.victories)}",
+                 f"def defeat(s):\n    return {_mask(self.defeats)}",
+                 "def first(v):"]
+        for index, rule in enumerate(self.rules):
+            test = _expression(rule, lambda field: f"v[{FIELD_INDEX[field]}]", " and ")
+            lines.append(f"    if {test}:\n        return R{index}")
+        lines += ["    return None", "def cause(s):"]
+        for rule in self.defeats:
+            lines.append(f"    if {_expression(rule, _attribute, ' and ')}:\n"
+                         f"        return {rule.name!r}")
+        lines.append("    return None")
+        for index, rule in enumerate(self.rules):
+            lines.append(f"def met{index}(s):\n"
+                         f"    return {_expression(rule, _attribute, ' & ')}")
+        namespace = _run("\n".join(lines) + "\n", {f"R{index}": rule
+                                                  for index, rule in enumerate(self.rules)})
+        self.victory = namespace["victory"]
+        self.defeat = namespace["defeat"]
+        self.first = namespace["first"]
+        self.cause = namespace["cause"]
+        # Per rule, its conditions as an element-wise mask
+        self.masks = tuple(namespace[f"met{index}"] for index in range(len(self.rules)))
+
+    def thresholds(self) -> Dict[str, int]:
+        """Per field, the lowest value at and above which no rule tells values apart"""
+        tops: Dict[str, int] = {}
+        for rule in self.rules:
+            for field, operator, value in rule.conditions:
+                top = value + 1 if operator in ("<=", "==") else value
+                tops[field] = max(tops.get(field, top), top)
+        return tops
+
+    def defeat_masks(self, view, beaten) -> Dict[str, object]:
+        """Split a mask of lost games by the first defeat rule each one meets"""
+        masks = {}
+        remaining = beaten
+        for rule, met in zip(self.defeats, self.masks[len(self.victories):]):
+            mask = remaining & met(view)
+            remaining = remaining & ~mask
+            masks[rule.name] = mask
+        return masks
+
+    def to_dict(self) -> dict:
+        return {kind: [{"name": rule.name,
+                        "when": [f"{field} {operator} {value}"
+                                 for field, operator, value in rule.conditions],
+                        "message": list(rule.message)}
+                       for rule in rules]
+                for kind, rules in (("victory", self.victories), ("defeat", self.defeats))}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RuleSet":
+        return cls(*([rule(entry["name"], kind == "victory", *entry["when"],
+                           message=entry.get("message", ()))
+                      for entry in data.get(kind, ())]
+                     for kind in ("victory", "defeat")))
+
+    @classmethod
+    def load(cls, path: str) -> "RuleSet":
+        import json
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _tracker_source(rules: RuleSet, tracking: bool) -> Tuple[str, Tuple[int, int]]:
+    """Source of RuleTracker.check and its memory layout: (values, verdicts)"""
+    fields = rules.fields
+    local = {field: f"f{index}" for index, field in enumerate(fields)}
+    count = len(fields) if tracking else 0
+    result = count + (len(rules.rules) if tracking else 0)  # Slot of the last result
+
+    lines = ["def check(m, s):"]
+    lines += [f"    {local[field]} = s.{field}" for field in fields]
+    if tracking:
+        lines += [f"    c{index} = f{index} != m[{index}]" for index in range(count)]
+        changed = " or ".join(f"c{index}" for index in range(count)) or "False"
+        lines.append(f"    if not ({changed}):\n        return m[{result}]")
+        for index, rule in enumerate(rules.rules):
+            test = _expression(rule, local.__getitem__, " and ")
+            dirty = " or ".join(f"c{fields.index(field)}" for field in rule.fields()) or "True"
+            lines.append(f"    if {dirty}:\n        m[{count + index}] = {test}")
+        lines += [f"    m[{index}] = f{index}" for index in range(count)]
+    for index, rule in enumerate(rules.rules):
+        test = (f"m[{count + index}]" if tracking
+                else _expression(rule, local.__getitem__, " and "))
+        lines.append(f"    if {test}:\n        m[{result}] = R{index}\n        return R{index}")
+    lines.append(f"    m[{result}] = None\n    return None\n")
+    return "\n".join(lines), (count, result - count)
+
+
+class RuleTracker:
+    """Checks successive states, re-evaluating only rules whose fields changed
+
+    check(state) is generated for the rule set and returns the first rule
+    met, victory rules first, or None. With tracking, it reads each
+    watched field once, compares it with the value seen by the last check
+    and re-runs only the rules reading a changed field; verdicts and
+    values live in one list. Tracking costs a compare and a store per
+    field, so by default it is used only when the rules have more than
+    TRACKING_RATIO conditions per field; otherwise check runs every rule,
+    straight-line, which is cheaper.
+    """
+
+    TRACKING_RATIO = 3
+
+    def __init__(self, rules: RuleSet, tracking: Optional[bool] = None):
+        self.rules = rules
+        if tracking is None:
+            tracking = rules.conditions > self.TRACKING_RATIO * len(rules.fields)
+        self.tracking = tracking
+        compiled = rules._trackers.get(tracking)
+        if compiled is None:  # Generated once per rule set; each tracker has its own memory
+            source, slots = _tracker_source(rules, tracking)
+            namespace = {f"R{index}": rule for index, rule in enumerate(rules.rules)}
+            compiled = (_run(source, namespace)["check"], source, slots)
+            rules._trackers[tracking] = compiled
+        check, self.source, (values, verdicts) = compiled
+        self._memory = [object()] * values + [False] * verdicts + [None]
+        self.check: Callable[[object], Optional[Rule]] = partial(check, self._memory)
+
+    @property
+    def rule(self) -> Optional[Rule]:
+        """Result of the last check"""
+        return self._memory[-1]
+
+
+DEFAULT_RULES = RuleSet(
+    victory=(
+        rule("ascension", True, "singularity_progress >= 100", "reputation >= 50"),
+        rule("benefactor", True, "entities_helped >= 10", "reputation >= 75"),
+    ),
+    defeat=(
+        rule("reputation", False, "reputation <= 0", message=(
+            "\nYour reputation has been destroyed. The community no longer",
+            "trusts you. Your dreams of accelerating toward the singularity",
+            "die with your credibility.")),
+        rule("dead_kittens", False, "dead_kittens >= 10", message=(
+            "\nToo many unintended consequences. The 'dead kittens' of your",
+            "reckless innovation have piled up. Society turns against",
+            "unchecked technological acceleration.")),
+        rule("bandwidth", False, "bandwidth <= 0", message=(
+            "\nYou've been cut off from the network. Without bandwidth,",
+            "you can't operate in the information economy. You're obsolete.")),
+    ),
+)
+
+
+def main():
+    """Command line entry point"""
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--export", metavar="FILE", help="write the default rules as JSON")
+    parser.add_argument("--check", metavar="FILE", help="compile a rules file and list it")
+    args = parser.parse_args()
+
+    if args.export:
+        with open(args.export, "w") as f:
+            json.dump(DEFAULT_RULES.to_dict(), f, indent=2)
+        print(f"Wrote {len(DEFAULT_RULES.rules)} rules to {args.export}")
+    rules = RuleSet.load(args.check) if args.check else DEFAULT_RULES
+    for entry in rules.rules:
+        kind = "victory" if entry.victory else "defeat"
+        conditions = " and ".join(f"{field} {operator} {value}"
+                                  for field, operator, value in entry.conditions)
+        print(f"{kind:8s} {entry.name:16s} {conditions}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+SQLite save store for Accelerando: Lobsters
+
+Keeps every player's save slots in one local SQLite database instead of a
+JSON file per save: one row per (player, slot) with a column per GameState
+field, indexed on turn, reputation and victory for queries. SQL is kept
+in module constants so sqlite3 reuses its prepared statements. Single
+saves are committed in batches of `batch_size`, and save_many/load_many
+move many sessions in one transaction and one query.
+
+store.backend(player, slot) adapts a slot to the save-backend interface
+of journal.py, so an AccelerandoGame can save straight into the store;
+its saves are committed immediately, as a player expects.
+
+Usage:
+    python3 save_store.py --sessions 100000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from accelerando_game import GameState
+from event_table import STAT_FIELDS
+
+
+FIELDS = STAT_FIELDS + ("game_over", "victory")
+DEFAULT_SLOT = "default"
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS saves (
+    player TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    {", ".join(f"{name} INTEGER NOT NULL" for name in FIELDS)},
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (player, slot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS saves_turn ON saves (turn);
+CREATE INDEX IF NOT EXISTS saves_reputation ON saves (reputation);
+CREATE INDEX IF NOT EXISTS saves_victory ON saves (victory);
+"""
+
+_COLUMNS = ", ".join(FIELDS)
+_UPSERT = (f"INSERT OR REPLACE INTO saves (player, slot, {_COLUMNS}, saved_at) "
+           f"VALUES ({', '.join('?' * (len(FIELDS) + 3))})")
+_SELECT = f"SELECT {_COLUMNS} FROM saves WHERE player = ? AND slot = ?"
+_SELECT_ALL = f"SELECT player, slot, {_COLUMNS} FROM saves"
+_DELETE = "DELETE FROM saves WHERE player = ? AND slot = ?"
+
+# Filters accepted by SaveStore.query, as SQL conditions
+_FILTERS = {
+    "player": "player = ?",
+    "victory": "victory = ?",
+    "game_over": "game_over = ?",
+    "min_turn": "turn >= ?",
+    "max_turn": "turn <= ?",
+    "min_reputation": "reputation >= ?",
+    "max_reputation": "reputation <= ?",
+}
+
+SaveKey = Tuple[str, str]
+
+
+def _row(player: str, slot: str, state: GameState, saved_at: float) -> tuple:
+    return (player, slot) + state.vector() + (int(state.game_over), int(state.victory),
+                                              saved_at)
+
+
+def _state(values) -> GameState:
+    state = GameState(*values)
+    state.game_over = bool(state.game_over)
+    state.victory = bool(state.victory)
+    return state
+
+
+class SaveStore:
+    """Save slots for many players in one SQLite database"""
+
+    def __init__(self, path: str = "accelerando_saves.db", batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = 0  # Saves not yet committed
+        self.connection = sqlite3.connect(path, cached_statements=64)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def save(self, player: str, state: GameState, slot: str = DEFAULT_SLOT):
+        """Save one slot; committed with the next full batch or flush()"""
+        self.connection.execute(_UPSERT, _row(player, slot, state, time.time()))
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def save_many(self, saves: Iterable[Tuple[str, str, GameState]]):
+        """Save (player, slot, state) triples in one transaction"""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                _UPSERT, (_row(player, slot, state, now) for player, slot, state in saves))
+        self.pending = 0
+
+    def flush(self):
+        """Commit pending saves"""
+        self.connection.commit()
+        self.pending = 0
+
+    def load(self, player: str, slot: str = DEFAULT_SLOT) -> Optional[GameState]:
+        row = self.connection.execute(_SELECT, (player, slot)).fetchone()
+        return None if row is None else _state(row)
+
+    def load_many(self, players: Optional[Iterable[str]] = None) -> Dict[SaveKey, GameState]:
+        """Every slot, or every slot of the given players, keyed by (player, slot)"""
+        if players is None:
+            rows = self.connection.execute(_SELECT_ALL)
+        else:
+            players = list(players)
+            rows = []
+            for start in range(0, len(players), 500):  # SQLite parameter limit
+                chunk = players[start:start + 500]
+                rows.extend(self.connection.execute(
+                    f"{_SELECT_ALL} WHERE player IN ({', '.join('?' * len(chunk))})", chunk))
+        return {(row[0], row[1]): _state(row[2:]) for row in rows}
+
+    def query(self, limit: Optional[int] = None, **filters) -> List[Tuple[str, str, GameState]]:
+        """Slots matching filters such as victory=True or min_turn=10"""
+        conditions = []
+        values = []
+        for name, value in filters.items():
+            if name not in _FILTERS:
+                raise ValueError(f"Unknown filter {name!r}; expected one of {sorted(_FILTERS)}")
+            conditions.append(_FILTERS[name])
+            values.append(int(value) if isinstance(value, bool) else value)
+        sql = _SELECT_ALL
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        return [(row[0], row[1], _state(row[2:]))
+                for row in self.connection.execute(sql, values)]
+
+    def delete(self, player: str, slot: str = DEFAULT_SLOT):
+        self.connection.execute(_DELETE, (player, slot))
+        self.pending += 1
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM saves").fetchone()[0]
+
+    def backend(self, player: str, slot: str = DEFAULT_SLOT) -> "SlotBackend":
+        """A save backend for AccelerandoGame that uses one slot"""
+        return SlotBackend(self, player, slot)
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+class SlotBackend:
+    """One player's slot, with the save-backend interface of journal.py"""
+
+    def __init__(self, store: SaveStore, player: str, slot: str = DEFAULT_SLOT):
+        self.store = store
+        self.player = player
+        self.slot = slot
+        self.path = f"{store.path} [{player}/{slot}]"  # Shown in save messages
+
+    def exists(self) -> bool:
+        return self.store.load(self.player, self.slot) is not None
+
+    def save(self, state: GameState, move=None):
+        """Save and commit at once: the game never flushes its backend"""
+        self.store.save(self.player, state, self.slot)
+        self.store.flush()
+
+    def load(self) -> GameState:
+        state = self.store.load(self.player, self.slot)
+        if state is None:
+            raise KeyError(f"No save for {self.player}/{self.slot}")
+        return state
+
+    def close(self):
+        self.store.flush()
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    args = parser.parse_args()
+
+    saves = [(f"player{index}", DEFAULT_SLOT, GameState(turn=index % 40, reputation=index % 100))
+             for index in range(args.sessions)]
+    with tempfile.TemporaryDirectory() as directory:
+        store = SaveStore(os.path.join(directory, "saves.db"))
+        start = time.perf_counter()
+        store.save_many(saves)
+        saved = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = store.load_many()
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        winners = store.query(min_reputation=90, min_turn=30)
+        queried = time.perf_counter() - start
+        store.close()
+    print(f"save_many: {args.sessions:,} sessions in {saved:.2f}s")
+    print(f"load_many: {len(loaded):,} sessions in {elapsed:.2f}s")
+    print(f"query:     {len(winners):,} matches in {queried * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
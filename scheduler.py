@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Weighted, conditional event scheduling for Accelerando: Lobsters
+
+Each event has a draw weight and may have preconditions: stat ranges in
+which it can fire, such as pamela_relationship above 0 or ideas of at
+least 10. Checking every event's preconditions every turn costs
+O(events), so EventScheduler indexes them instead. Every precondition
+bound cuts its field into buckets; states whose conditioned fields fall
+in the same buckets have the same eligible events. The first draw in a
+bucket builds an alias table (Vose's method) over its eligible events and
+caches it, and every later draw there costs one bisect per conditioned
+field, a dict lookup and one random number, however big the catalog.
+
+A catalog with equal weights and no preconditions, like the built-in
+one, draws with rng.choice exactly as before, so seeded games are
+unchanged.
+
+Usage:
+    python3 scheduler.py --events 10 1000 100000
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+
+from event_table import FIELD_INDEX, STAT_FIELDS
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # The game imports this module; typing costs milliseconds of startup
+    from typing import Dict, List, Sequence, Tuple
+
+
+class _Uniform:
+    """Equal-weight draws among `positions`"""
+
+    __slots__ = ("positions",)
+
+    def __init__(self, positions: List[int]):
+        self.positions = positions
+
+    def draw(self, rng) -> int:
+        positions = self.positions
+        return positions[rng.randrange(len(positions))]
+
+
+class _Alias:
+    """Weighted draws among `positions` from one uniform number"""
+
+    __slots__ = ("positions", "probability", "alias")
+
+    def __init__(self, positions: List[int], weights: List[float]):
+        count = len(positions)
+        total = sum(weights)
+        scaled = [weight * count / total for weight in weights]
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        probability = [1.0] * count
+        alias = list(range(count))
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        self.positions = positions
+        self.probability = probability
+        self.alias = alias
+
+    def draw(self, rng) -> int:
+        point = rng.random() * len(self.positions)
+        index = int(point)
+        if point - index >= self.probability[index]:
+            index = self.alias[index]
+        return self.positions[index]
+
+
+class EventScheduler:
+    """Draws this turn's event from a catalog, honouring weights and preconditions"""
+
+    def __init__(self, catalog):
+        self.names = catalog.names
+        self.weights = catalog.weights
+        conditions = list(catalog.conditions)
+        self.uniform = not conditions and min(self.weights, default=1.0) == max(
+            self.weights, default=1.0)
+
+        # Cut points per conditioned field: a bucket spans [cut, next cut)
+        cuts: Dict[int, set] = {}
+        requirements: Dict[int, List[Tuple[int, int, int]]] = {}
+        for position, field, low, high in conditions:
+            cuts.setdefault(field, set()).update((low, high + 1))
+            requirements.setdefault(position, []).append((field, low, high))
+        self.fields = tuple(sorted(cuts))
+        self.cuts = tuple(tuple(sorted(cuts[field])) for field in self.fields)
+        self.requirements = requirements
+        self.always = [position for position in range(len(self.weights))
+                       if position not in requirements and self.weights[position] > 0]
+        self.tables: Dict[tuple, object] = {}
+
+    def bucket(self, vector: Sequence[int]) -> tuple:
+        """Key of the bucket a stat vector falls in"""
+        return tuple(bisect_right(cuts, vector[field])
+                     for field, cuts in zip(self.fields, self.cuts))
+
+    def _build(self, key: tuple):
+        # Any value in the bucket decides a precondition the same way
+        value = {field: cuts[index - 1] if index else cuts[0] - 1
+                 for field, cuts, index in zip(self.fields, self.cuts, key)}
+        positions = self.always + [
+            position for position, ranges in self.requirements.items()
+            if self.weights[position] > 0
+            and all(low <= value[field] <= high for field, low, high in ranges)]
+        if not positions:
+            table = None
+        else:
+            weights = [self.weights[position] for position in positions]
+            if min(weights) == max(weights):
+                table = _Uniform(positions)
+            else:
+                table = _Alias(positions, weights)
+        self.tables[key] = table
+        return table
+
+    def draw(self, vector: Sequence[int], rng) -> str:
+        """Name of an event drawn for a state with this stat vector"""
+        if self.uniform:
+            return rng.choice(self.names)
+        key = self.bucket(vector)
+        try:
+            table = self.tables[key]
+        except KeyError:
+            table = self._build(key)
+        if table is None:
+            raise LookupError("No event can fire in this state")
+        return self.names[table.draw(rng)]
+
+    def eligible(self, vector: Sequence[int]) -> List[str]:
+        """Names of the events that can fire for this stat vector, by scanning"""
+        return [name for position, name in enumerate(self.names)
+                if self.weights[position] > 0
+                and all(low <= vector[field] <= high
+                        for field, low, high in self.requirements.get(position, ()))]
+
+
+def _bench(count: int, draws: int) -> str:
+    import random
+    import time
+
+    from event_table import EVENTS, EventSpec, TableCatalog, preconditions
+    from rng import RngStream
+
+    # Every tenth event needs pamela_relationship > 0, every seventh ideas >= 10
+    base = list(EVENTS.values())
+    events = {}
+    for index in range(count):
+        spec = base[index % len(base)]
+        ranges = {}
+        if index % 10 == 0:
+            ranges["pamela_relationship"] = (1, None)
+        if index % 7 == 0:
+            ranges["ideas"] = (10, None)
+        name = f"{spec.name}_{index}"
+        events[name] = EventSpec(name, spec.choices, weight=1 + index % 5,
+                                 when=preconditions(ranges))
+    scheduler = EventScheduler(TableCatalog(events))
+    rng = RngStream(0)
+    generator = random.Random(0)
+    vectors = [[generator.randint(0, 30) for _ in STAT_FIELDS] for _ in range(64)]
+    for vector in vectors:
+        vector[FIELD_INDEX["pamela_relationship"]] -= 15
+    for vector in vectors:
+        scheduler.draw(vector, rng)  # Build the tables once
+
+    start = time.perf_counter()
+    for index in range(draws):
+        scheduler.draw(vectors[index & 63], rng)
+    indexed = (time.perf_counter() - start) / draws
+
+    scans = max(1, min(draws, 2000000 // count))
+    start = time.perf_counter()
+    for index in range(scans):
+        scheduler.eligible(vectors[index & 63])
+    scanned = (time.perf_counter() - start) / scans
+    return (f"{count:8,d} events | scheduler {indexed * 1e6:6.2f} us/draw | "
+            f"scan {scanned * 1e6:10.1f} us/draw | {len(scheduler.tables)} tables")
+
+
+def main():
+    """Command line entry point"""
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--draws", type=int, default=200000)
+    args = parser.parse_args()
+    for count in args.events:
+        print(_bench(count, args.draws))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Multi-session game server for Accelerando: Lobsters
+
+Hosts many independent games in one asyncio event loop over a line-based
+TCP protocol. The server sends game text, ending each turn with an
+"Enter choice (1-N):" line, and the client answers with one number per
+line. Every session has its own GameState and RngStream, and writes
+through a BufferedRenderer, so a whole response reaches the socket in a
+single write. Waiting for a choice is an awaitable read, so idle sessions
+cost only their objects' memory.
+
+Every session records a replay (see replay.py): its RNG seed and the
+choice made at each event. The latest finished replays are kept in
+GameServer.replays and, with --replays FILE, appended to a JSON-lines file.
+With --metrics FILE every session's game is instrumented (see
+instrumentation.py) and the shared metrics are written there every
+--metrics-interval seconds. With --hints MS, Aineko's advice event shows
+a lookahead hint from advisor.py, searched in slices so that other
+sessions keep playing meanwhile.
+
+Turn latency is the server time from receiving an answer to writing the
+next prompt.
+
+Usage:
+    python3 server.py --port 7777
+    python3 server.py --port 7777 --replays replays.jsonl
+    python3 server.py --bench 2000 --turns 20
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Optional
+
+from accelerando_game import AccelerandoGame
+from instrumentation import Metrics, MetricsDumper, instrument
+from renderer import BufferedRenderer
+from replay import Replay, Seed, new_seed
+from rng import RngStream
+
+
+DEFAULT_PORT = 7777
+PROMPT = "Enter choice"
+HINT_SLICE = 0.005  # Seconds of search between yields to other sessions
+
+
+class _SocketStream:
+    """Text stream adapter over an asyncio StreamWriter"""
+
+    __slots__ = ("writer",)
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+
+    def write(self, text: str):
+        self.writer.write(text.encode())
+
+    def flush(self):
+        pass
+
+
+class LatencyTracker:
+    """Most recent latency samples, with percentiles in milliseconds"""
+
+    def __init__(self, size: int = 100000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, percent: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index] * 1000
+
+    def summary(self) -> str:
+        return (f"Turns: {self.count} | p50: {self.percentile(50):.3f} ms | "
+                f"p99: {self.percentile(99):.3f} ms | max: {self.percentile(100):.3f} ms")
+
+
+class Session:
+    """One connected player and their game"""
+
+    __slots__ = ("game", "reader", "writer", "server", "received", "replay")
+
+    def __init__(self, server: "GameServer", reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, seed: Seed):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.game = AccelerandoGame(BufferedRenderer(_SocketStream(writer)),
+                                    rng=RngStream(seed), advisor=server.advisor)
+        self.replay = Replay(seed)
+        self.received = 0.0  # When the last answer arrived
+
+    async def get_choice(self, max_choice: int) -> int:
+        """Send the turn's text and a prompt, then wait for a valid answer"""
+        renderer = self.game.renderer
+        while True:
+            renderer.write(f"\n{PROMPT} (1-{max_choice}):")
+            renderer.flush()
+            if self.received:
+                self.server.latency.record(time.perf_counter() - self.received)
+            await self.writer.drain()
+
+            self.server.waiting += 1
+            try:
+                line = await self.reader.readline()
+            finally:
+                self.server.waiting -= 1
+            self.received = time.perf_counter()
+            if not line:
+                raise EOFError("client disconnected")
+            try:
+                choice = int(line)
+            except ValueError:
+                renderer.write("Please enter a valid number")
+                continue
+            if 1 <= choice <= max_choice:
+                return choice
+            renderer.write(f"Please enter a number between 1 and {max_choice}")
+
+    async def play(self):
+        """Run the game, one phase at a time, until it ends"""
+        game = self.game
+        game.display_header()
+        game.renderer.write("Technology accelerates. The Singularity approaches.")
+        while not game.state.game_over:
+            game.start_turn()
+            name = game.draw_event()
+            hint = None
+            if game.advisor is not None and name in game.advisor.events:
+                hint = await self.server.advise(game.state.vector(), name)
+            game.present_event(name, hint)
+            game.current_event = name
+            try:
+                choice = await self.get_choice(len(game.catalog.event(name).choices))
+            finally:
+                game.current_event = None
+            self.replay.add(game.state, choice)
+            if self.server.metrics is not None:
+                self.server.metrics.count("choices", (("event", name), ("choice", str(choice))))
+            game.apply_choice(name, choice)
+            if game.finish_turn():
+                break
+            game.renderer.write("\n" + "="*70, "1. Continue to next turn", "2. Quit")
+            if await self.get_choice(2) == 2:
+                game.state.game_over = True
+        game.renderer.write("\nThank you for playing Accelerando: Lobsters!")
+        game.renderer.flush()
+
+
+class GameServer:
+    """Accepts connections and runs one Session per client"""
+
+    def __init__(self, seed: Optional[int] = None, replay_log: Optional[str] = None,
+                 metrics: Optional[Metrics] = None, advisor=None):
+        self.seed = seed
+        self.replay_log = replay_log
+        self.metrics = metrics  # Shared by every session's game when set
+        self.advisor = advisor  # advisor.Advisor for Aineko's hints, shared
+        self.replays = deque(maxlen=10000)  # Replays of finished sessions
+        self.sessions = 0   # Sessions started so far
+        self.active = 0     # Sessions currently connected
+        self.waiting = 0    # Sessions waiting for their player
+        self.latency = LatencyTracker()
+
+    def _seed(self) -> Seed:
+        if self.seed is None:
+            return new_seed()
+        return f"{self.seed}/{self.sessions}"
+
+    def _finish(self, replay: Replay):
+        self.replays.append(replay)
+        if self.replay_log is not None:
+            with open(self.replay_log, "a") as f:
+                f.write(replay.to_json() + "\n")
+
+    async def advise(self, vector, event: str):
+        """Search for a hint in slices, yielding to other sessions between them
+
+        The hint is ready when the advisor's budget of wall-clock time has
+        passed, however busy the server is.
+        """
+        search = self.advisor.search(vector, event)
+        deadline = time.perf_counter() + self.advisor.budget
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return search.hint()
+            search.run(until=min(deadline, now + HINT_SLICE))
+            await asyncio.sleep(0)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = Session(self, reader, writer, self._seed())
+        if self.metrics is not None:
+            instrument(session.game, self.metrics)
+        self.sessions += 1
+        self.active += 1
+        try:
+            await session.play()
+            await writer.drain()
+        except (EOFError, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            self._finish(session.replay)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        """Start listening; returns the asyncio Server"""
+        return await asyncio.start_server(self.handle, host, port, limit=1024)
+
+
+async def play_clients(host: str, port: int, clients: int, turns: int,
+                       idle: float = 0.0, seed: int = 0) -> int:
+    """Connect `clients` players that each answer up to `turns` prompts
+
+    All clients connect first and then wait `idle` seconds before playing.
+    Returns the number of answers sent.
+    """
+    rng = random.Random(seed)
+    connections = [await asyncio.open_connection(host, port) for _ in range(clients)]
+
+    async def read_prompt(reader) -> int:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return 0
+            if line.startswith(PROMPT.encode()):
+                return int(line.rsplit(b"-", 1)[1].rstrip(b"):\n"))
+
+    async def play(reader, writer, limit) -> int:
+        sent = 0
+        limit = await limit
+        while sent < turns and limit:
+            # Random options at events; always continue at the menu
+            writer.write(b"%d\n" % (rng.randint(1, limit) if limit > 2 else 1))
+            sent += 1
+            limit = await read_prompt(reader)
+        writer.close()
+        return sent
+
+    prompts = [asyncio.ensure_future(read_prompt(reader)) for reader, _ in connections]
+    await asyncio.gather(*prompts)
+    await asyncio.sleep(idle)
+    counts = await asyncio.gather(*(play(reader, writer, prompt)
+                                    for (reader, writer), prompt in zip(connections, prompts)))
+    return sum(counts)
+
+
+async def bench(sessions: int, turns: int, seed: int = 0):
+    """Measure idle memory per session and turn latency with a client process"""
+    server = GameServer(seed)
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    client = subprocess.Popen([sys.executable, __file__, "--clients", str(sessions),
+                               "--port", str(port), "--turns", str(turns), "--idle", "1"])
+    while server.waiting < sessions:
+        await asyncio.sleep(0.05)
+    idle = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(f"Idle sessions: {server.waiting} | {idle / sessions / 1024:.2f} KiB per session")
+
+    while client.poll() is None or server.active:
+        await asyncio.sleep(0.05)
+    listener.close()
+    await listener.wait_closed()
+    print(server.latency.summary())
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--replays", default=None, metavar="FILE",
+                        help="append each finished session's replay to this file")
+    parser.add_argument("--metrics", default=None, metavar="FILE",
+                        help="write OpenMetrics text for all sessions to this file")
+    parser.add_argument("--metrics-interval", type=float, default=10.0)
+    parser.add_argument("--bench", type=int, default=0, metavar="SESSIONS",
+                        help="measure memory and latency with this many clients")
+    parser.add_argument("--clients", type=int, default=0,
+                        help="act as this many test clients of a running server")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--idle", type=float, default=0.0)
+    parser.add_argument("--hints", type=float, default=0.0, metavar="MS",
+                        help="show Aineko's lookahead hints, searching this long")
+    args = parser.parse_args()
+
+    if args.clients:
+        asyncio.run(play_clients(args.host, args.port, args.clients, args.turns,
+                                 args.idle, args.seed or 0))
+    elif args.bench:
+        asyncio.run(bench(args.bench, args.turns, args.seed or 0))
+    else:
+        metrics = dumper = None
+        if args.metrics:
+            metrics = Metrics()
+            dumper = MetricsDumper(metrics, args.metrics, args.metrics_interval).start()
+
+        async def serve():
+            advisor = None
+            if args.hints:
+                from advisor import Advisor
+                advisor = Advisor(budget=args.hints / 1000)
+            server = GameServer(args.seed, args.replays, metrics, advisor)
+            listener = await server.start(args.host, args.port)
+            print(f"Serving on {args.host}:{args.port}")
+            async with listener:
+                await listener.serve_forever()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if dumper is not None:
+                dumper.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Headless Monte Carlo simulator for Accelerando: Lobsters
+
+Plays complete games through the game's event table and win/lose checks
+without any terminal I/O. Choices come from a pluggable policy, and the
+results are aggregated into win rates, defeat causes and turn counts.
+
+Usage:
+    python3 simulator.py --games 100000 --policy random --seed 42
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from accelerando_game import AccelerandoGame, GameState
+from event_table import EVENT_NAMES, EVENTS, EventSpec, play_choice, regenerate
+from choices import PolicyChoices
+from renderer import NullRenderer
+from rng import RngStream
+from rules import DEFAULT_RULES, RuleSet
+
+
+# A policy receives the current state, the name of the event being played
+# (e.g. "lobster_asylum") and the number of options, and returns a choice
+# between 1 and max_choice.
+Policy = Callable[[GameState, str, int], int]
+
+DEFEAT_CAUSES = DEFAULT_RULES.causes
+DEFAULT_MAX_TURNS = 500
+
+
+def random_policy(seed: Optional[int] = None) -> Policy:
+    """Policy that picks uniformly among the available options"""
+    rng = random.Random(seed)
+
+    def policy(state: GameState, event: str, max_choice: int) -> int:
+        return rng.randint(1, max_choice)
+    return policy
+
+
+def fixed_policy(choice: int) -> Policy:
+    """Policy that always picks the same option"""
+    def policy(state: GameState, event: str, max_choice: int) -> int:
+        return min(choice, max_choice)
+    return policy
+
+
+# Named policy factories, called with an optional seed
+POLICIES: Dict[str, Callable[[Optional[int]], Policy]] = {
+    "random": random_policy,
+    "first": lambda seed=None: fixed_policy(1),
+    "cautious": lambda seed=None: fixed_policy(2),
+    "last": lambda seed=None: fixed_policy(4),
+}
+
+
+def defeat_cause(state: GameState) -> Optional[str]:
+    """Return the name of the first defeat rule the state meets"""
+    return DEFAULT_RULES.cause(state)
+
+
+class HeadlessGame(AccelerandoGame):
+    """Silent AccelerandoGame whose choices come from a policy"""
+
+    def __init__(self, policy: Policy):
+        super().__init__(NullRenderer(), PolicyChoices(policy))
+        self.policy = policy
+
+
+@dataclass
+class SimulationResult:
+    """Aggregated outcome of a batch of simulated games"""
+    games: int = 0
+    victories: int = 0
+    defeats: Dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(DEFEAT_CAUSES, 0))
+    timeouts: int = 0
+    turns: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.victories / self.games if self.games else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mean_turns(self) -> float:
+        total = sum(turn * count for turn, count in self.turns.items())
+        return total / self.games if self.games else 0.0
+
+    def record(self, state: GameState):
+        """Add one finished game to the totals"""
+        self.games += 1
+        self.turns[state.turn] += 1
+        if state.victory:
+            self.victories += 1
+            return
+        cause = defeat_cause(state)
+        if cause is None:
+            self.timeouts += 1
+        else:
+            self.defeats[cause] += 1
+
+    def merge(self, other: "SimulationResult"):
+        """Fold another result into this one"""
+        self.games += other.games
+        self.victories += other.victories
+        for cause, count in other.defeats.items():
+            self.defeats[cause] = self.defeats.get(cause, 0) + count
+        self.timeouts += other.timeouts
+        self.turns.update(other.turns)
+        self.elapsed += other.elapsed
+
+    def summary(self) -> str:
+        lines = [
+            f"Games: {self.games} ({self.games_per_second:,.0f} games/sec)",
+            f"Victories: {self.victories} ({self.win_rate:.2%})",
+        ]
+        for cause, count in self.defeats.items():
+            lines.append(f"Defeats ({cause}): {count}")
+        lines.append(f"Timeouts: {self.timeouts}")
+        lines.append(f"Mean turns: {self.mean_turns:.1f}")
+        return "\n".join(lines)
+
+
+def play_game(policy: Policy, max_turns: int = DEFAULT_MAX_TURNS) -> GameState:
+    """Play one complete game through AccelerandoGame.play_turn, silently"""
+    game = HeadlessGame(policy)
+    while not game.state.game_over and game.state.turn < max_turns:
+        game.play_turn()
+    return game.state
+
+
+def play_table_game(policy: Policy, max_turns: int = DEFAULT_MAX_TURNS,
+                    rng=random, moves: Optional[list] = None,
+                    events: Dict[str, EventSpec] = EVENTS,
+                    rules: RuleSet = DEFAULT_RULES) -> GameState:
+    """Play one complete game straight off the event table
+
+    Draws randomness in the same order as play_turn, so a seeded game
+    ends in the same state as play_game, without rendering any text.
+    When `moves` is given, each turn's (event, choice) is appended to it.
+    `events` and `rules` replace the built-in table and rules, e.g. with
+    tuned constants from sweep.py.
+    """
+    state = GameState()
+    vector = state.vector()
+    names = EVENT_NAMES if events is EVENTS else tuple(events)
+    first = rules.first
+    while state.turn < max_turns:
+        vector = regenerate(vector, rng)
+        event = rng.choice(names)
+        state.set_vector(vector)
+        options = events[event].choices
+        number = policy(state, event, len(options))
+        if moves is not None:
+            moves.append((event, number))
+        vector, _, _ = play_choice(options[number - 1], vector, rng)
+        state.set_vector(vector)
+        rule = first(vector)
+        if rule is not None:
+            state.victory = rule.victory
+            state.game_over = True
+            break
+    return state
+
+
+def simulate(games: int, policy: Policy, seed: Optional[int] = None,
+             max_turns: int = DEFAULT_MAX_TURNS) -> SimulationResult:
+    """Play many games with one policy and aggregate the results"""
+    rng = RngStream(seed)
+    result = SimulationResult()
+    start = time.perf_counter()
+    for _ in range(games):
+        result.record(play_table_game(policy, max_turns, rng))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    args = parser.parse_args()
+
+    result = simulate(args.games, POLICIES[args.policy](args.seed), seed=args.seed,
+                      max_turns=args.max_turns)
+    print(result.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
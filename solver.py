@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Outcome solver for Accelerando: Lobsters
+
+Computes, for a given choice policy, the probability of victory, of each
+defeat rule of a RuleSet (in display_defeat order) and of running out of
+turns, plus the expected number of turns. It recurses over every reachable
+state using the event table's bounded randomness (regeneration ranges,
+the uniform event draw, roll thresholds and bonus ranges), with a
+size-bounded LRU transposition table keyed on the state tuple.
+
+Every successor is reduced to its key before it is expanded, and
+successors with equal keys are merged, so each key is expanded once per
+parent however many ways lead to it. Successor distributions are built
+field by field: regeneration, outcome deltas and bonuses move each field
+independently, so a state's successors are products of small per-field
+distributions.
+
+By default keys are exact: resources that can no longer reach any
+requirement or rule threshold before the horizon are clamped, which
+changes no probability. Exact states still multiply about sevenfold per
+turn, which suits positions a few turns from the end. For whole games,
+`step` puts the resources on a grid: every value a requirement or rule
+tells apart is a grid point, with further points `step` apart between
+them, and a value between two points is split between them in
+proportion to its distance (as mdp.py does). Splitting never crosses a
+threshold, so terminal states are still recognised exactly; only where a
+resource sits between thresholds is approximated. The probability mass
+still in play at the horizon is reported as `timeout`.
+
+Usage:
+    python3 solver.py --policy 2 --horizon 40
+    python3 solver.py --policy 2 --horizon 3 --exact --set singularity_progress=85
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from operator import add
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from accelerando_game import GameState
+from event_table import (EVENT_NAMES, EVENTS, FIELD_INDEX, REGENERATION,
+                         ROLL_SIDES, STAT_FIELDS, TURN_DELTA, Choice)
+from rules import DEFAULT_RULES, RuleSet
+
+
+TURN = FIELD_INDEX["turn"]
+DEFAULT_CACHE_SIZE = 2_000_000
+DEFAULT_STEP = 5
+
+# Fields bucketed when a step is given; the others stay exact
+BUCKET_FIELDS = ("reputation", "ideas", "bandwidth", "influence", "singularity_progress")
+
+
+class Evaluation(NamedTuple):
+    """Outcome probabilities and expected remaining turns from a state"""
+    victory: float
+    defeats: Tuple[float, ...]  # Per defeat rule, in RuleSet.causes order
+    timeout: float
+    turns: float                # Expected number of turns still to be played
+
+    @property
+    def defeat(self) -> float:
+        return sum(self.defeats)
+
+
+# A branch of a choice: (probability, delta vector, field indices reset)
+Branch = Tuple[float, tuple, tuple]
+
+
+def choice_branches(spec: Choice, met: bool) -> List[Branch]:
+    """Every branch of a choice, given whether its requirements are met"""
+    if not met:
+        outcomes = [(1.0, spec.unmet)]
+    elif spec.roll is None:
+        outcomes = [(1.0, spec.success)]
+    else:
+        failure = spec.roll / ROLL_SIDES
+        outcomes = [(1.0 - failure, spec.success), (failure, spec.failure)]
+
+    branches = []
+    for probability, outcome in outcomes:
+        if outcome.bonus is None:
+            branches.append((probability, outcome.delta, outcome.reset))
+            continue
+        index, low, high = outcome.bonus
+        share = probability / (high - low + 1)
+        for amount in range(low, high + 1):
+            vector = list(outcome.delta)
+            vector[index] += amount
+            branches.append((share, tuple(vector), outcome.reset))
+    return branches
+
+
+def _regeneration() -> List[List[Tuple[int, float]]]:
+    """Per field, the start-of-turn change and its probability"""
+    changes = [[(change, 1.0)] for change in TURN_DELTA]
+    for index, low, high in REGENERATION:
+        share = 1.0 / (high - low + 1)
+        changes[index] = [(TURN_DELTA[index] + amount, share)
+                          for amount in range(low, high + 1)]
+    return changes
+
+
+def _cuts(rules: RuleSet) -> Dict[int, set]:
+    """Per field, every value c where a requirement or rule tells c-1 from c"""
+    cuts: Dict[int, set] = {}
+    for rule in rules.rules:
+        for name, operator, value in rule.conditions:
+            points = cuts.setdefault(FIELD_INDEX[name], set())
+            if operator in (">=", "<"):
+                points.add(value)
+            elif operator in (">", "<="):
+                points.add(value + 1)
+            else:
+                points.update((value, value + 1))
+    for event in EVENTS.values():
+        for spec in event.choices:
+            for index, minimum in spec.requires:
+                cuts.setdefault(index, set()).add(minimum)
+    return cuts
+
+
+def _saturation(rules: RuleSet) -> Dict[int, Tuple[int, int]]:
+    """Per field, (top threshold, largest possible drop in one turn)
+
+    With R turns left, two values both at or above top + drop * R can
+    never be told apart by a requirement or a rule, so keys can clamp
+    them to that bound without changing any probability.
+    """
+    tops = {FIELD_INDEX[name]: value for name, value in rules.thresholds().items()}
+    rises = dict.fromkeys(range(len(STAT_FIELDS)), 0)
+    for index, low, _ in REGENERATION:
+        rises[index] += low
+    drops = dict.fromkeys(range(len(STAT_FIELDS)), 0)
+    resets = set()
+    for event in EVENTS.values():
+        for spec in event.choices:
+            for index, minimum in spec.requires:
+                tops[index] = max(tops.get(index, minimum), minimum)
+            for outcome in (spec.success, spec.failure, spec.unmet):
+                if outcome is None:
+                    continue
+                resets.update(outcome.reset)
+                for index, change in enumerate(outcome.delta):
+                    drops[index] = max(drops[index], -change)
+    return {index: (top, max(0, drops[index] - rises[index]))
+            for index, top in tops.items() if index not in resets}
+
+
+def bucket_starts(cuts: Iterable[int], step: int, reach: int = 1 << 16) -> Tuple[int, ...]:
+    """Sorted bucket starts for a field: every cut, then widths doubling away from it
+
+    The buckets on either side of a cut are `step` wide, the next ones
+    twice that and so on, meeting halfway between neighbouring cuts, so
+    values are told apart finely near a threshold and coarsely far from
+    one. No bucket contains a cut except at its start. Buckets run out to
+    `reach` beyond the outermost cuts.
+    """
+    cuts = sorted(set(cuts)) or [0]
+    starts = set(cuts)
+    segments = [(None, cuts[0], cuts[0] - reach)]
+    segments += [(low, high, (low + high) / 2) for low, high in zip(cuts, cuts[1:])]
+    segments.append((cuts[-1], None, cuts[-1] + reach))
+    for low, high, middle in segments:
+        width, start = step, (low or 0) + step
+        while low is not None and start <= middle:
+            starts.add(start)
+            width *= 2
+            start += width
+        width, start = step, (high or 0) - step
+        while high is not None and start > middle:
+            starts.add(start)
+            width *= 2
+            start -= width
+    return tuple(sorted(starts))
+
+
+class ExactSolver:
+    """Evaluates a policy by memoised recursion over game states
+
+    `policy` is None for a uniformly random choice, a mapping from event
+    name to choice number, or a simulator policy callable. Mappings and
+    None do not look at the state, which lets keys clamp resources that can
+    no longer matter before the horizon and lets successors be built field
+    by field; a callable is asked about every regeneration outcome.
+
+    `ignore` names fields left out of the key (zeroed), which is exact as
+    long as neither the policy nor the rules read them. `step` turns on the
+    buckets described in the module docstring; None keeps keys exact.
+    """
+
+    def __init__(self, policy=None, max_turns: int = 15,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 ignore: Iterable[str] = (), step: Optional[int] = None,
+                 rules: RuleSet = DEFAULT_RULES):
+        self.max_turns = max_turns
+        self.cache_size = cache_size
+        self.rules = rules
+        self.step = step
+        self.ignored = tuple(FIELD_INDEX[name] for name in ignore)
+        self.cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._callable = callable(policy)
+        self._policy = policy
+        self._saturation = {} if self._callable else _saturation(rules)
+        cuts = _cuts(rules)
+        # Per bucketed field index, in index order, the starts of its buckets
+        self._buckets = {index: bucket_starts(cuts.get(index, ()), step)
+                         for index in sorted(FIELD_INDEX[name] for name in BUCKET_FIELDS)
+                         } if step else {}
+        self._regeneration = _regeneration()
+        for index in self.ignored:
+            self._regeneration[index] = [(0, 1.0)]
+        # Ignored fields start, regenerate and move by zero, so they stay zero
+        self._branches = {
+            (event, number, met): [
+                (probability, tuple(0 if index in self.ignored else change
+                                    for index, change in enumerate(vector)), reset)
+                for probability, vector, reset in choice_branches(
+                    option, met or not option.requires)]
+            for event in EVENT_NAMES
+            for number, option in enumerate(EVENTS[event].choices, 1)
+            for met in (False, True)
+        }
+        # Values are flat tuples: (victory, *defeats, timeout, turns)
+        width = len(rules.defeats) + 2
+        self._timeout = (0.0,) * (width - 1) + (1.0, 0.0)
+        self._terminal_values = {}
+        for position, rule in enumerate(rules.victories + rules.defeats):
+            value = [0.0] * (width + 1)
+            value[0 if rule.victory else position - len(rules.victories) + 1] = 1.0
+            self._terminal_values[rule] = tuple(value)
+        self._place = lru_cache(maxsize=1 << 16)(self._place)
+
+    def evaluate(self, state: Optional[GameState] = None) -> Evaluation:
+        """Outcome probabilities of playing on from `state`"""
+        state = state or GameState()
+        vector = [0 if index in self.ignored else value
+                  for index, value in enumerate(state.vector())]
+        rule = self.rules.first(vector) if state.turn else None
+        if rule is not None:
+            value = self._terminal_values[rule]
+        else:
+            limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(max(limit, 4 * self.max_turns + 100))
+            try:
+                remaining = self.max_turns - state.turn
+                places = [self._place(index, value, remaining)
+                          for index, value in enumerate(vector)]
+                key = tuple(key for key, _ in places)
+                vector = tuple(representative for _, representative in places)
+                value = (self._propagate(key, vector) if self.step
+                         else self._value(key, vector))
+            finally:
+                sys.setrecursionlimit(limit)
+        return Evaluation(value[0], tuple(value[1:-2]), value[-2], value[-1])
+
+    def _place(self, index: int, value: int, remaining: int) -> Tuple[int, int]:
+        """A field's (key value, value to play on from) with `remaining` turns left"""
+        saturation = self._saturation.get(index)
+        if saturation is not None:
+            top, drop = saturation
+            value = min(value, top + drop * remaining)
+        starts = self._buckets.get(index)
+        if starts is None:
+            return value, value
+        return starts[max(0, bisect_right(starts, value) - 1)], value
+
+    def _choices(self, event: str) -> List[Tuple[float, int]]:
+        count = len(EVENTS[event].choices)
+        if self._policy is None:
+            return [(1.0 / count, number) for number in range(1, count + 1)]
+        return [(1.0, self._policy[event])]
+
+    def _cells(self, fields: list, event: str):
+        """(weight, cell, choice, requirements met) after regeneration
+
+        `fields` holds per-field distributions, or for a callable policy the
+        joint (vector, probability) outcomes. A cell is a list of per-field
+        distributions, or for a callable policy the vector it was asked about.
+        """
+        options = EVENTS[event].choices
+        if self._callable:
+            for vector, weight in fields:
+                number = self._policy(GameState(*vector), event, len(options))
+                met = all(vector[index] >= minimum
+                          for index, minimum in options[number - 1].requires)
+                yield weight, vector, number, met
+            return
+        for choice_probability, number in self._choices(event):
+            requires = options[number - 1].requires
+            if not requires:
+                yield choice_probability, fields, number, True
+                continue
+            for sides in itertools.product((True, False), repeat=len(requires)):
+                split = list(fields)
+                weight = choice_probability
+                for side, (index, minimum) in zip(sides, requires):
+                    part = [(value, probability) for value, probability in split[index]
+                            if (value >= minimum) == side]
+                    mass = sum(probability for _, probability in part)
+                    if not mass:
+                        weight = 0.0
+                        break
+                    weight *= mass
+                    split[index] = [(value, probability / mass) for value, probability in part]
+                if weight:
+                    yield weight, split, number, all(sides)
+
+    def _value(self, key: tuple, vector: tuple) -> tuple:
+        """Outcome values of a key, expanded from `vector` on a cache miss"""
+        cache = self.cache
+        cached = cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cached
+        self.misses += 1
+
+        if key[TURN] >= self.max_turns:
+            result = self._timeout
+        else:
+            result = self._expand(vector)
+
+        cache[key] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def _successors(self, vector: tuple, into: Dict[tuple, list], scale: float = 1.0):
+        """Add `scale` times the successor distribution of `vector` into `into`
+
+        Entries are successor key -> [probability, ...]: with buckets the
+        rest is the probability-weighted sums of the bucketed fields (for
+        a callable policy, which must see integers, the first vector
+        reaching the key instead); without buckets the key is the vector.
+        """
+        # Per field, the distribution after regeneration
+        fields = [[(value + change, probability) for change, probability in changes]
+                  for value, changes in zip(vector, self._regeneration)]
+        if self._callable:
+            fields = _product(fields)
+        remaining = self.max_turns - vector[TURN] - 1
+        place, buckets = self._place, self._buckets
+        # (field, distribution id, delta) -> (distribution, its placed form);
+        # holding the distribution keeps its id from being reused
+        placements: Dict[tuple, tuple] = {}
+        event_share = scale / len(EVENT_NAMES)
+        for event in EVENT_NAMES:
+            for weight, cell, number, met in self._cells(fields, event):
+                weight *= event_share
+                for probability, change, reset in self._branches[event, number, met]:
+                    weight_here = weight * probability
+                    if self._callable:  # The cell is one concrete vector
+                        after = list(map(add, cell, change))
+                        for index in reset:
+                            after[index] = 0
+                        key = after = tuple(after)
+                        if buckets:
+                            key = tuple(place(index, value, remaining)[0]
+                                        for index, value in enumerate(after))
+                        entry = into.get(key)
+                        if entry is None:
+                            into[key] = [weight_here, after]
+                        else:
+                            entry[0] += weight_here
+                        continue
+                    # Fields with one placement fill a template; the others multiply out
+                    keys, values, spread = [], [], []
+                    for index, (distribution, delta) in enumerate(zip(cell, change)):
+                        if index in reset:
+                            field = ((place(index, 0, remaining), 1.0),)
+                        else:
+                            memo = (index, id(distribution), delta)
+                            field = placements.get(memo)
+                            if field is not None:
+                                field = field[1]
+                            else:
+                                field = self._placed(index, distribution, delta, remaining)
+                                placements[memo] = (distribution, field)
+                        (key, value), _ = field[0]
+                        keys.append(key)
+                        if index in buckets:
+                            values.append(value)
+                        if len(field) > 1:
+                            spread.append((index, len(values) - 1, field))
+                    joint = [(keys, values, weight_here)]
+                    for index, position, field in spread:
+                        grown = []
+                        for keys, values, share in joint:
+                            for (key, value), part in field:
+                                keys = keys[:]
+                                keys[index] = key
+                                if index in buckets:
+                                    values = values[:]
+                                    values[position] = value
+                                grown.append((keys, values, share * part))
+                        joint = grown
+                    for keys, values, share in joint:
+                        key = tuple(keys)
+                        entry = into.get(key)
+                        if entry is None:
+                            into[key] = [share, [share * value for value in values]]
+                        elif values:
+                            entry[0] += share
+                            entry[1] = [total + share * value
+                                        for total, value in zip(entry[1], values)]
+                        else:
+                            entry[0] += share
+        return into
+
+    def _placed(self, index: int, distribution, delta: int,
+                remaining: int) -> List[Tuple[Tuple[int, float], float]]:
+        """A field's distribution moved by `delta`: ((key value, mean value), share) pairs"""
+        if len(distribution) == 1:
+            return [(self._place(index, distribution[0][0] + delta, remaining), 1.0)]
+        # Key value -> [probability, probability-weighted value sum]
+        placed: Dict[int, list] = {}
+        for value, share in distribution:
+            key, value = self._place(index, value + delta, remaining)
+            bucket = placed.get(key)
+            if bucket is None:
+                placed[key] = [share, share * value]
+            else:
+                bucket[0] += share
+                bucket[1] += share * value
+        return [((key, total / share), share) for key, (share, total) in placed.items()]
+
+    def _mean(self, key: tuple, sums: Sequence[float], probability: float) -> tuple:
+        """The vector to play a bucketed key on from, given weighted sums
+
+        Means are rounded to nine places so float error never moves one
+        out of its bucket; fields that are not bucketed take the key value.
+        """
+        vector = list(key)
+        for index, total in zip(self._buckets, sums):
+            vector[index] = round(total / probability, 9)
+        return tuple(vector)
+
+    def _expand(self, vector: tuple) -> tuple:
+        first, terminal = self.rules.first, self._terminal_values
+        totals = [0.0] * len(self._timeout)
+        totals[-1] = 1.0
+        for key, entry in self._successors(vector, {}).items():
+            probability = entry[0]
+            rule = first(key)
+            if rule is not None:
+                value = terminal[rule]
+            else:
+                value = self._value(key, entry[1] if self._callable else key)
+                totals[-1] += probability * value[-1]
+            for index in range(len(totals) - 1):
+                totals[index] += probability * value[index]
+        return tuple(totals)
+
+    def _propagate(self, key: tuple, vector: tuple) -> tuple:
+        """Outcome values of a key by pushing its probability forward turn by turn
+
+        Used with buckets: all the mass reaching a bucket in a turn is merged
+        before the bucket is played on, from the mean of that mass.
+        """
+        first, terminal = self.rules.first, self._terminal_values
+        totals = [0.0] * len(self._timeout)
+        layer = [(1.0, vector)]
+        turn = key[TURN]
+        while layer and turn < self.max_turns:
+            self.misses += len(layer)
+            merged: Dict[tuple, list] = {}
+            for probability, vector in layer:
+                totals[-1] += probability
+                self._successors(vector, merged, probability)
+            layer = []
+            for key, (probability, rest) in merged.items():
+                rule = first(key)
+                if rule is not None:
+                    for index, part in enumerate(terminal[rule][:-1]):
+                        totals[index] += probability * part
+                else:
+                    layer.append((probability, rest if self._callable
+                                  else self._mean(key, rest, probability)))
+            turn += 1
+        totals[-2] += sum(probability for probability, _ in layer)
+        return tuple(totals)
+
+
+def _product(fields: List[Sequence[Tuple[object, float]]]) -> List[Tuple[tuple, float]]:
+    """Joint (vector, probability) pairs of independent per-field distributions"""
+    joint: List[Tuple[tuple, float]] = [((), 1.0)]
+    for distribution in fields:
+        if len(distribution) == 1:
+            value = distribution[0][0]
+            joint = [(vector + (value,), probability) for vector, probability in joint]
+        else:
+            joint = [(vector + (value,), probability * share)
+                     for vector, probability in joint for value, share in distribution]
+    return joint
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--policy", type=int, default=None,
+                        help="always pick this option (default: uniform random)")
+    parser.add_argument("--horizon", type=int, default=40,
+                        help="number of turns to look ahead")
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP,
+                        help="grid spacing between thresholds")
+    parser.add_argument("--exact", action="store_true",
+                        help="keep exact keys (only practical for short horizons)")
+    parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                        help="start from a state with this field changed")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    args = parser.parse_args()
+
+    state = GameState()
+    for assignment in args.set:
+        name, value = assignment.split("=")
+        setattr(state, name, int(value))
+    policy = None if args.policy is None else dict.fromkeys(EVENT_NAMES, args.policy)
+    solver = ExactSolver(policy, state.turn + args.horizon, args.cache_size,
+                         ignore=("patents_released", "pamela_relationship"),
+                         step=None if args.exact else args.step)
+    start = time.perf_counter()
+    result = solver.evaluate(state)
+    elapsed = time.perf_counter() - start
+    print(f"P(victory):              {result.victory:.6f}")
+    for cause, probability in zip(solver.rules.causes, result.defeats):
+        print(f"{f'P(defeat, {cause}):':25s}{probability:.6f}")
+    print(f"P(out of turns):         {result.timeout:.6f}")
+    print(f"Expected turns:          {result.turns:.3f}")
+    print(f"States: {solver.misses} ({solver.hits} cache hits, "
+          f"{solver.evictions} evictions) in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Cold-start measurement and a preforking launcher for Accelerando: Lobsters
+
+`measure` reports where the game's startup goes and checks it against a
+budget:
+- import time per module, from `python -X importtime`, with the total
+  for accelerando_game
+- milliseconds from exec to the first main-menu prompt (best and median)
+- milliseconds from connecting to a zygote to the same prompt
+
+`zygote` serves the game over TCP the way a process-per-connection
+deployment would, without paying startup per player: a warm parent
+imports the game once and keeps `--workers` forked children, each with
+an AccelerandoGame already built, waiting in accept(). A child that gets
+a connection reseeds the RNG, points stdin/stdout at the socket and runs
+the unchanged terminal game; the parent forks a replacement when it
+exits. Needs os.fork (Linux, macOS).
+
+Bytecode caching matters as much as imports: with PYTHONDONTWRITEBYTECODE
+set, every start recompiles the game's modules. The harness runs with it
+unset, so the .pyc files are written once and used.
+
+Usage:
+    python3 startup.py measure --runs 20 --budget 60
+    python3 startup.py zygote --port 7778 --workers 4
+"""
+
+import argparse
+import os
+import random
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from benchmarks import GAME_SCRIPT, time_to_prompt
+
+
+DEFAULT_BUDGET_MS = 60.0
+DEFAULT_PORT = 7778
+PROMPT = b"Enter choice"
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class ImportTime(NamedTuple):
+    """One line of -X importtime output, in microseconds"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _environment() -> Dict[str, str]:
+    environment = dict(os.environ)
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    return environment
+
+
+def parse_importtime(text: str) -> List[ImportTime]:
+    """Parse the stderr of `python -X importtime`"""
+    entries = []
+    for line in text.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(ImportTime(module, int(self_us), int(cumulative_us),
+                                      len(indent) // 2))
+    return entries
+
+
+def import_times(module: str = "accelerando_game") -> List[ImportTime]:
+    """Import times of `module` and everything it imports, in a fresh interpreter"""
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    subprocess.run(command, cwd=HERE, env=_environment(), capture_output=True)  # Write .pyc
+    result = subprocess.run(command, cwd=HERE, env=_environment(), capture_output=True,
+                            text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def exec_to_prompt(runs: int) -> List[float]:
+    """Seconds from exec of the game script to its first prompt, per run"""
+    command = [sys.executable, GAME_SCRIPT]
+    time_to_prompt(command)  # Write .pyc
+    return [time_to_prompt(command) for _ in range(runs)]
+
+
+def connect_to_prompt(host: str, port: int) -> float:
+    """Seconds from connecting to a zygote until the game's prompt arrives"""
+    start = time.perf_counter()
+    with socket.create_connection((host, port)) as connection:
+        received = b""
+        while PROMPT not in received:
+            chunk = connection.recv(4096)
+            if not chunk:
+                raise RuntimeError("zygote closed the connection before the prompt")
+            received += chunk
+        elapsed = time.perf_counter() - start
+        connection.shutdown(socket.SHUT_WR)  # The game sees EOF and exits
+        while connection.recv(4096):
+            pass
+    return elapsed
+
+
+def _play_child(listener: socket.socket):
+    # Runs in a forked child: everything is imported and the game is built
+    # before a player connects
+    from accelerando_game import AccelerandoGame
+    game = AccelerandoGame()
+    connection, _ = listener.accept()
+    listener.close()
+    random.seed()  # Otherwise every child repeats the parent's random sequence
+    os.dup2(connection.fileno(), 0)
+    os.dup2(connection.fileno(), 1)
+    connection.close()
+    try:
+        game.run()
+    finally:
+        sys.stdout.flush()
+
+
+def _fork(listener: socket.socket) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    status = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        _play_child(listener)
+    except BaseException:
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def serve_zygote(listener: socket.socket, workers: int = 4):
+    """Keep `workers` warm children accepting on `listener`; runs until killed"""
+    if not hasattr(os, "fork"):
+        raise OSError("the zygote launcher needs os.fork")
+    import accelerando_game  # noqa: F401  Warm the parent once for every child
+    children = set()
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        while True:
+            while len(children) < workers:
+                children.add(_fork(listener))
+            pid, _ = os.wait()
+            children.discard(pid)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def start_zygote(workers: int = 2) -> Tuple[subprocess.Popen, int]:
+    """Launch a zygote on a free local port; returns the process and port"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "zygote", "--port", "0",
+         "--workers", str(workers)],
+        cwd=HERE, env=_environment(), stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Serving on"):
+        process.kill()
+        raise RuntimeError(f"zygote failed to start: {line!r}")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+def zygote_to_prompt(runs: int, workers: int = 2) -> List[float]:
+    """Seconds from connecting to a zygote to the first prompt, per run"""
+    process, port = start_zygote(workers)
+    try:
+        connect_to_prompt("127.0.0.1", port)
+        samples = []
+        for _ in range(runs):
+            time.sleep(0.02)  # Let the replacement child get to accept()
+            samples.append(connect_to_prompt("127.0.0.1", port))
+        return samples
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _milliseconds(samples: List[float]) -> str:
+    return f"best {min(samples) * 1000:6.1f} ms, median {statistics.median(samples) * 1000:6.1f} ms"
+
+
+def measure(runs: int, budget_ms: float, top: int = 8) -> bool:
+    """Print the startup report; True when exec-to-prompt is within budget"""
+    entries = import_times()
+    end = next(index for index, entry in enumerate(entries)
+               if entry.module == "accelerando_game")
+    start = end
+    while start > 0 and entries[start - 1].depth > 0:
+        start -= 1  # importtime lists a module's imports before the module
+    total = entries[end]
+    print(f"Imports of accelerando_game: {total.cumulative_us / 1000:.1f} ms")
+    for entry in sorted(entries[start:end], key=lambda entry: entry.cumulative_us,
+                        reverse=True)[:top]:
+        print(f"  {entry.module:24s} {entry.cumulative_us / 1000:6.1f} ms "
+              f"({entry.self_us / 1000:.1f} ms own)")
+
+    executed = exec_to_prompt(runs)
+    print(f"Exec to first prompt:    {_milliseconds(executed)}")
+    if hasattr(os, "fork"):
+        print(f"Zygote to first prompt:  {_milliseconds(zygote_to_prompt(runs))}")
+
+    best = min(executed) * 1000
+    if best > budget_ms:
+        print(f"OVER BUDGET: {best:.1f} ms > {budget_ms:.0f} ms")
+        return False
+    print(f"Within the {budget_ms:.0f} ms budget")
+    return True
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    measuring = commands.add_parser("measure", help="report startup time against a budget")
+    measuring.add_argument("--runs", type=int, default=20)
+    measuring.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MS,
+                           help="milliseconds allowed from exec to the first prompt")
+    serving = commands.add_parser("zygote", help="serve games from prefork children")
+    serving.add_argument("--host", default="127.0.0.1")
+    serving.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serving.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        return 0 if measure(args.runs, args.budget) else 1
+
+    listener = socket.create_server((args.host, args.port))
+    print(f"Serving on {args.host}:{listener.getsockname()[1]}", flush=True)
+    try:
+        serve_zygote(listener, args.workers)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Parameter sweeps over the tuning constants of Accelerando: Lobsters
+
+Every number that balances the game is a named parameter with a dotted
+key:
+
+    <event>.<choice>.requires.<stat>      minimum needed to pick the choice
+    <event>.<choice>.cost.<stat>          requirement and matching spend together
+    <event>.<choice>.roll                 success needs randint(1, 100) above it
+    <event>.<choice>.<outcome>.<stat>     stat change of success/failure/unmet
+    rules.<rule>.<stat>                   threshold of a win/lose rule
+
+`list` prints every parameter with its current value. `run` evaluates a
+grid (--grid key=v1,v2,...) or a random sample (--sample N with
+--range key=low:high) of parameter sets, simulating the same seeded
+games for every point so differences come from the parameters rather
+than the dice. Points run in parallel across cores. Each result is
+cached on disk under a hash of the parameters, the simulation settings
+and the engine version (a digest of the engine's source), so a re-run
+only computes new points. The report ends with each parameter's
+sensitivity: the mean win rate and game length at each of its values,
+and the spread between them.
+
+Usage:
+    python3 sweep.py list
+    python3 sweep.py run --grid lobster_asylum.1.cost.influence=10,20,30 \\
+        --grid russian_ai.1.roll=30,40,50 --games 20000 --seed 1
+    python3 sweep.py run --sample 50 --range rules.ascension.reputation=30:70
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import accelerando_game
+import event_table
+import rng as rng_module
+import rules as rules_module
+import simulator
+from event_table import EVENTS, FIELD_INDEX, EventSpec
+from journal import atomic_write
+from rng import RngStream
+from rules import DEFAULT_RULES, RuleSet
+from simulator import DEFAULT_MAX_TURNS, POLICIES, play_table_game
+
+
+DEFAULT_CACHE = ".sweep_cache"
+OUTCOME_KINDS = ("success", "failure", "unmet")
+
+
+def engine_version(*modules) -> str:
+    """Digest of the source of the modules that decide a simulated game"""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# Changes whenever the code that decides a simulated game changes
+ENGINE_VERSION = engine_version(accelerando_game, event_table, rng_module, rules_module,
+                                simulator)
+
+Parameters = Dict[str, int]
+
+
+def parameters(events: Dict[str, EventSpec] = EVENTS,
+               rules: RuleSet = DEFAULT_RULES) -> Parameters:
+    """Every tunable constant and its current value"""
+    found: Parameters = {}
+    for name, event in events.items():
+        for number, option in enumerate(event.choices, 1):
+            prefix = f"{name}.{number}"
+            for index, minimum in option.requires:
+                stat = event_table.STAT_FIELDS[index]
+                found[f"{prefix}.requires.{stat}"] = minimum
+                if option.success.delta[index] == -minimum:
+                    found[f"{prefix}.cost.{stat}"] = minimum
+            if option.roll is not None:
+                found[f"{prefix}.roll"] = option.roll
+            for kind in OUTCOME_KINDS:
+                result = getattr(option, kind)
+                if result is None:
+                    continue
+                for index, change in enumerate(result.delta):
+                    if change:
+                        found[f"{prefix}.{kind}.{event_table.STAT_FIELDS[index]}"] = change
+    for rule in rules.rules:
+        for stat, _, value in rule.conditions:
+            found.setdefault(f"rules.{rule.name}.{stat}", value)
+    return found
+
+
+def _set_delta(result, stat: str, value: int):
+    delta = list(result.delta)
+    delta[FIELD_INDEX[stat]] = value
+    return replace(result, delta=tuple(delta))
+
+
+def _set_requirement(option, stat: str, value: int):
+    index = FIELD_INDEX[stat]
+    requires = dict(option.requires)
+    requires[index] = value
+    return replace(option, requires=tuple(requires.items()))
+
+
+def apply(overrides: Parameters, events: Dict[str, EventSpec] = EVENTS,
+          rules: RuleSet = DEFAULT_RULES) -> Tuple[Dict[str, EventSpec], RuleSet]:
+    """An event table and rule set with `overrides` applied to copies"""
+    known = parameters(events, rules)
+    events = dict(events)
+    thresholds: Dict[Tuple[str, str], int] = {}
+    for key, value in overrides.items():
+        if key not in known:
+            raise KeyError(f"Unknown parameter {key!r}; see `python3 sweep.py list`")
+        parts = key.split(".")
+        if parts[0] == "rules":
+            thresholds[parts[1], parts[2]] = value
+            continue
+        name, number, kind = parts[0], int(parts[1]), parts[2]
+        event = events[name]
+        options = list(event.choices)
+        option = options[number - 1]
+        if kind == "roll":
+            option = replace(option, roll=value)
+        elif kind == "requires":
+            option = _set_requirement(option, parts[3], value)
+        elif kind == "cost":
+            option = _set_requirement(option, parts[3], value)
+            option = replace(option, success=_set_delta(option.success, parts[3], -value))
+        else:
+            option = replace(option, **{kind: _set_delta(getattr(option, kind), parts[3], value)})
+        options[number - 1] = option
+        events[name] = replace(event, choices=tuple(options))
+    if thresholds:
+        def tuned(rule):
+            return replace(rule, conditions=tuple(
+                (stat, operator, thresholds.get((rule.name, stat), value))
+                for stat, operator, value in rule.conditions))
+        rules = RuleSet(map(tuned, rules.victories), map(tuned, rules.defeats))
+    return events, rules
+
+
+class Point(NamedTuple):
+    """One parameter set and the simulation that evaluates it"""
+    overrides: Tuple[Tuple[str, int], ...]  # Sorted (key, value) pairs
+    games: int
+    seed: int
+    policy: str
+    max_turns: int
+
+    def key(self) -> str:
+        """Cache key: hash of the parameters, settings and engine version"""
+        text = json.dumps([list(self.overrides), self.games, self.seed, self.policy,
+                           self.max_turns, ENGINE_VERSION])
+        return hashlib.sha256(text.encode()).hexdigest()
+
+
+class Score(NamedTuple):
+    """Win rate and game length of one point"""
+    games: int
+    victories: int
+    turns: int           # Total over all games
+    turns_squared: int
+
+    @property
+    def win_rate(self) -> float:
+        return self.victories / self.games if self.games else 0.0
+
+    @property
+    def mean_turns(self) -> float:
+        return self.turns / self.games if self.games else 0.0
+
+
+def evaluate(point: Point) -> Score:
+    """Simulate a point's games; runs inside a worker process"""
+    events, rules = apply(dict(point.overrides))
+    policy = POLICIES[point.policy](point.seed)
+    rng = RngStream(point.seed)
+    victories = turns = squared = 0
+    for _ in range(point.games):
+        state = play_table_game(policy, point.max_turns, rng, events=events, rules=rules)
+        victories += state.victory
+        turns += state.turn
+        squared += state.turn * state.turn
+    return Score(point.games, victories, turns, squared)
+
+
+class ResultCache:
+    """Scores on disk, one JSON file per point key"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, point: Point) -> Optional[Score]:
+        try:
+            with open(self._path(point.key())) as f:
+                return Score(*json.load(f)["score"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, point: Point, score: Score):
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self._path(point.key()), json.dumps(
+            {"overrides": dict(point.overrides), "engine": ENGINE_VERSION,
+             "score": list(score)}))
+
+
+def grid(values: Dict[str, List[int]]) -> List[Parameters]:
+    """Every combination of the given values"""
+    keys = sorted(values)
+    return [dict(zip(keys, combination))
+            for combination in itertools.product(*(values[key] for key in keys))]
+
+
+def sample(ranges: Dict[str, Tuple[int, int]], count: int, seed: int) -> List[Parameters]:
+    """`count` parameter sets drawn uniformly from inclusive integer ranges"""
+    generator = random.Random(seed)
+    return [{key: generator.randint(low, high) for key, (low, high) in sorted(ranges.items())}
+            for _ in range(count)]
+
+
+def run_sweep(sets: Iterable[Parameters], games: int, seed: int, policy: str = "random",
+              max_turns: int = DEFAULT_MAX_TURNS, workers: Optional[int] = None,
+              cache: Optional[ResultCache] = None) -> Tuple[List[Tuple[Parameters, Score]], int]:
+    """Score every parameter set; returns the results and how many were computed"""
+    known = parameters()
+    points = []
+    for overrides in sets:
+        unknown = set(overrides) - set(known)
+        if unknown:
+            raise KeyError(f"Unknown parameters {sorted(unknown)}; see `python3 sweep.py list`")
+        points.append(Point(tuple(sorted(overrides.items())), games, seed, policy, max_turns))
+
+    scores: Dict[Point, Score] = {}
+    if cache is not None:
+        for point in points:
+            score = cache.get(point)
+            if score is not None:
+                scores[point] = score
+    missing = list(dict.fromkeys(point for point in points if point not in scores))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(missing) <= 1:
+        computed = map(evaluate, missing)
+        for point, score in zip(missing, computed):
+            scores[point] = score
+            if cache is not None:
+                cache.put(point, score)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            for point, score in zip(missing, pool.map(evaluate, missing)):
+                scores[point] = score
+                if cache is not None:
+                    cache.put(point, score)
+    return [(dict(point.overrides), scores[point]) for point in points], len(missing)
+
+
+class Sensitivity(NamedTuple):
+    """How much one parameter moves the results, across the points swept"""
+    key: str
+    levels: List[Tuple[int, float, float]]  # (value, mean win rate, mean turns)
+    win_rate_spread: float
+    turns_spread: float
+
+
+def sensitivity(results: List[Tuple[Parameters, Score]]) -> List[Sensitivity]:
+    """Per parameter, mean results at each of its values; most influential first"""
+    by_key: Dict[str, Dict[int, List[Score]]] = {}
+    for overrides, score in results:
+        for key, value in overrides.items():
+            by_key.setdefault(key, {}).setdefault(value, []).append(score)
+    report = []
+    for key, levels in by_key.items():
+        rows = []
+        for value in sorted(levels):
+            scores = levels[value]
+            games = sum(score.games for score in scores)
+            rows.append((value, sum(score.victories for score in scores) / games,
+                         sum(score.turns for score in scores) / games))
+        wins = [row[1] for row in rows]
+        turns = [row[2] for row in rows]
+        report.append(Sensitivity(key, rows, max(wins) - min(wins), max(turns) - min(turns)))
+    return sorted(report, key=lambda entry: entry.win_rate_spread, reverse=True)
+
+
+def _parse_values(text: str) -> Tuple[str, List[int]]:
+    key, _, values = text.partition("=")
+    return key, [int(value) for value in values.split(",")]
+
+
+def _parse_range(text: str) -> Tuple[str, Tuple[int, int]]:
+    key, _, bounds = text.partition("=")
+    low, _, high = bounds.partition(":")
+    return key, (int(low), int(high))
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="print every parameter and its current value")
+    running = commands.add_parser("run", help="evaluate a grid or sample of parameter sets")
+    running.add_argument("--grid", action="append", default=[], metavar="KEY=V1,V2,...")
+    running.add_argument("--range", action="append", default=[], metavar="KEY=LOW:HIGH")
+    running.add_argument("--sample", type=int, default=0,
+                         help="random parameter sets drawn from the --range bounds")
+    running.add_argument("--games", type=int, default=10000)
+    running.add_argument("--seed", type=int, default=0)
+    running.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    running.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    running.add_argument("--workers", type=int, default=None)
+    running.add_argument("--cache", default=DEFAULT_CACHE, help="result cache directory")
+    running.add_argument("--out", default=None, help="write every point as JSON")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for key, value in parameters().items():
+            print(f"{key:55s} {value}")
+        return 0
+
+    if args.sample:
+        sets = sample(dict(map(_parse_range, args.range)), args.sample, args.seed)
+    else:
+        sets = grid(dict(map(_parse_values, args.grid)))
+    baseline = {}
+    start = time.perf_counter()
+    results, computed = run_sweep([baseline] + sets, args.games, args.seed, args.policy,
+                                  args.max_turns, args.workers, ResultCache(args.cache))
+    elapsed = time.perf_counter() - start
+    (_, reference), results = results[0], results[1:]
+    print(f"{len(results)} points and the defaults: {computed} computed, "
+          f"{len(results) + 1 - computed} cached ({elapsed:.1f}s); engine {ENGINE_VERSION}")
+    print(f"Defaults: win rate {reference.win_rate:.2%}, mean turns {reference.mean_turns:.1f}")
+    for overrides, score in sorted(results, key=lambda row: row[1].win_rate, reverse=True):
+        settings = ", ".join(f"{key}={value}" for key, value in overrides.items())
+        print(f"  {score.win_rate:7.2%} {score.mean_turns:6.1f} turns  {settings}")
+    print("Sensitivity (win rate and mean turns by value):")
+    for entry in sensitivity(results):
+        print(f"  {entry.key}: spread {entry.win_rate_spread * 100:.1f} pp, "
+              f"{entry.turns_spread:.1f} turns")
+        for value, win_rate, turns in entry.levels:
+            print(f"    {value:6d}: {win_rate:7.2%} {turns:6.1f} turns")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump([{"overrides": overrides, "games": score.games,
+                        "win_rate": score.win_rate, "mean_turns": score.mean_turns}
+                       for overrides, score in results], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for Aineko's lookahead advisor
+"""
+
+import time
+
+from accelerando_game import AccelerandoGame, GameState
+from advisor import TURN, Advisor
+from choices import PolicyChoices
+from event_table import play_choice, regenerate
+from renderer import BufferedRenderer
+from rng import RngStream
+from simulator import fixed_policy
+
+
+def rollout_win_rate(advisor, vector, event, choice, games):
+    """Win rate of an option followed by random play, estimated independently"""
+    search = advisor.search(vector, event)
+    won = 0
+    for _ in range(games):
+        after = play_choice(advisor.options(event)[choice - 1], vector, advisor.rng)[0]
+        rule = advisor.rules.first(after)
+        if rule is not None:
+            won += rule.victory
+            continue
+        after = regenerate(after, advisor.rng)
+        won += search._rollout(after, advisor.scheduler.draw(after, advisor.rng),
+                               after[TURN] + advisor.horizon)
+    return won / games
+
+
+def test_hint_finds_the_best_option():
+    """The recommended option should be as good as the best by brute force"""
+    print("Testing advice quality...")
+    vector = GameState(reputation=20, bandwidth=30, influence=12, turn=3).vector()
+    hint = Advisor(seed=1).advise(vector, "aineko_advice", iterations=4000)
+    assert hint.iterations == 4000 and sum(hint.visits) == 4000
+    reference = Advisor(seed=2)
+    rates = [rollout_win_rate(reference, vector, "aineko_advice", choice, 3000)
+             for choice in range(1, 5)]
+    assert rates[hint.choice - 1] >= max(rates) - 0.05, (hint, rates)
+    print(f"✓ Hint {hint.choice} wins {rates[hint.choice - 1]:.0%} (best {max(rates):.0%})!")
+
+
+def test_budget_and_interning():
+    """Searches should stop at the deadline, resume, and intern their nodes"""
+    print("\nTesting the time budget...")
+    advisor = Advisor(seed=3, budget=0.02)
+    vector = GameState().vector()
+    start = time.perf_counter()
+    hint = advisor.advise(vector, "russian_ai")
+    elapsed = time.perf_counter() - start
+    assert hint.iterations > 0 and elapsed < 0.02 + 0.03
+    assert 1 < hint.nodes <= hint.iterations + 1
+
+    search = advisor.search(vector, "russian_ai")
+    search.run(iterations=50)
+    search.run(iterations=50)
+    assert search.iterations == 100 and sum(search.root.counts) == 100
+    assert search.nodes[(tuple(vector), "russian_ai")] is search.root
+    print(f"✓ {hint.iterations} iterations in {elapsed * 1e3:.1f} ms!")
+
+
+def test_game_shows_hints_without_changing_play():
+    """Aineko's hints should appear in the game and leave seeded play unchanged"""
+    print("\nTesting hints in the game...")
+    finals = []
+    for advisor in (None, Advisor(seed=4, budget=0.002)):
+        renderer = BufferedRenderer()
+        game = AccelerandoGame(renderer, PolicyChoices(fixed_policy(2)), rng=RngStream(8),
+                               advisor=advisor)
+        events = []
+        while not game.state.game_over:
+            game.play_turn()
+            events.append(game.last_move[0])
+        text = "\n".join(renderer.lines)
+        assert ("Aineko's tail twitches" in text) == (
+            advisor is not None and "aineko_advice" in events)
+        finals.append(game.state)
+    assert finals[0] == finals[1] and "aineko_advice" in events
+    print("✓ Hints shown, play unchanged!")
+
+
+if __name__ == "__main__":
+    test_hint_finds_the_best_option()
+    test_budget_and_interning()
+    test_game_shows_hints_without_changing_play()
+    print("\n✓ ALL ADVISOR TESTS PASSED!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched struct-of-arrays simulator
+"""
+
+from accelerando_game import GameState, defeat_reached, victory_reached
+from batch import BatchSimulator, BatchState, fixed_choices, np
+
+
+def check_finished_games(simulator):
+    """Every finished game must satisfy the scalar win/lose rules"""
+    state = simulator.state
+    for index in range(len(state)):
+        game = state.state(index)
+        if game.victory:
+            assert game.game_over and victory_reached(game)
+        elif game.game_over:
+            assert defeat_reached(game) and not victory_reached(game)
+        else:
+            assert game.turn == simulator.max_turns
+
+
+def test_batch_state_round_trip():
+    """States copied into a batch should come back unchanged"""
+    print("Testing BatchState round trip...")
+    states = [GameState(), GameState(reputation=80, turn=3, victory=True)]
+    for use_numpy in (False, True):
+        if use_numpy and np is None:
+            continue
+        batch = BatchState.from_states(states, use_numpy=use_numpy)
+        assert [batch.state(i) for i in range(2)] == states
+        assert list(batch.reputation) == [50, 80]
+    print("✓ BatchState round trip works!")
+
+
+def test_python_backend():
+    """The array-module backend should play games to completion"""
+    print("\nTesting array backend...")
+    simulator = BatchSimulator(300, seed=5, use_numpy=False)
+    result = simulator.run()
+    assert result.games == 300
+    assert result.victories + sum(result.defeats.values()) + result.timeouts == 300
+    check_finished_games(simulator)
+    print("✓ Array backend works!")
+
+
+def test_numpy_backend():
+    """The NumPy backend should agree with the scalar rules"""
+    print("\nTesting NumPy backend...")
+    if np is None:
+        print("○ NumPy not installed, skipped")
+        return
+    simulator = BatchSimulator(2000, seed=5, max_turns=40)
+    result = simulator.run()
+    assert result.games == 2000
+    assert sum(result.turns.values()) == 2000
+    check_finished_games(simulator)
+    print("✓ NumPy backend works!")
+
+
+def test_backends_agree_statistically():
+    """Both backends should give similar win rates"""
+    print("\nTesting backend agreement...")
+    if np is None:
+        print("○ NumPy not installed, skipped")
+        return
+    vectorised = BatchSimulator(20000, seed=1).run()
+    scalar = BatchSimulator(4000, seed=1, use_numpy=False).run()
+    assert abs(vectorised.win_rate - scalar.win_rate) < 0.04
+    print("✓ Backends agree!")
+
+
+def test_fixed_choices():
+    """Fixed batch policies should pick the given option per event"""
+    print("\nTesting fixed batch policies...")
+    seen = []
+
+    def policy(stats, events, rng):
+        choices = fixed_choices([1, 2, 3, 4, 1, 2])(stats, events, rng)
+        seen.extend(zip(list(events), list(choices)))
+        return choices
+
+    BatchSimulator(50, policy=policy, seed=2, use_numpy=False).run()
+    assert seen and all(choice == [1, 2, 3, 4, 1, 2][event] for event, choice in seen)
+    print("✓ Fixed batch policies work!")
+
+
+if __name__ == "__main__":
+    test_batch_state_round_trip()
+    test_python_backend()
+    test_numpy_backend()
+    test_backends_agree_statistically()
+    test_fixed_choices()
+    print("\n✓ ALL BATCH TESTS PASSED!")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite
+"""
+
+import json
+
+from benchmarks import Measurement, compare, run_benchmarks, to_json
+
+
+def test_benchmarks_produce_json():
+    """A quick run of every benchmark should give positive, serialisable results"""
+    print("Testing benchmark run...")
+    results = run_benchmarks(scale=0.01, repeat=1)
+    names = {result.name for result in results}
+    assert {"play_turn", "win_lose_checks", "save_game", "save_game.bytes",
+            "load_game", "cold_start", "event.russian_ai"} <= names
+    assert all(result.value > 0 for result in results)
+    data = json.loads(json.dumps(to_json(results)))
+    assert data["results"]["play_turn"]["unit"] == "turns/sec"
+    print(f"✓ {len(results)} measurements written as JSON!")
+
+
+def test_compare_flags_regressions():
+    """Only metrics worse than the tolerance, in their own direction, are flagged"""
+    print("\nTesting baseline comparison...")
+    baseline = to_json([Measurement("play_turn", 1000.0, "turns/sec", True),
+                        Measurement("save_game", 1.0, "ms/call", False),
+                        Measurement("load_game", 1.0, "ms/call", False)])
+    results = [Measurement("play_turn", 800.0, "turns/sec", True),
+               Measurement("save_game", 0.5, "ms/call", False),
+               Measurement("load_game", 1.05, "ms/call", False),
+               Measurement("cold_start", 40.0, "ms", False)]
+    regressions = compare(results, baseline, tolerance=0.1)
+    assert [regression.name for regression in regressions] == ["play_turn"]
+    assert abs(regressions[0].change - 0.2) < 1e-9
+    assert compare(results, baseline, tolerance=0.25) == []
+    print("✓ Regressions are flagged!")
+
+
+if __name__ == "__main__":
+    test_benchmarks_produce_json()
+    test_compare_flags_regressions()
+    print("\n✓ ALL BENCHMARK TESTS PASSED!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for content packs
+"""
+
+import os
+import tempfile
+
+from accelerando_game import AccelerandoGame
+from catalog import PackedCatalog, decode_event, encode_event, synthesize, write_pack
+from choices import PolicyChoices
+from event_table import EVENT_NAMES, EVENTS
+from renderer import BufferedRenderer
+from rng import RngStream
+from simulator import random_policy
+
+
+def _play(catalog, seed: int = 3, turns: int = 30) -> str:
+    renderer = BufferedRenderer()
+    game = AccelerandoGame(renderer, PolicyChoices(random_policy(seed)),
+                           rng=RngStream(seed), catalog=catalog)
+    for _ in range(turns):
+        if game.state.game_over:
+            break
+        game.play_turn()
+    return "\n".join(renderer.lines)
+
+
+def test_events_round_trip():
+    """Encoding and decoding should give back every built-in event"""
+    print("Testing event encoding...")
+    for event in EVENTS.values():
+        assert decode_event(encode_event(event)) == event
+    print("✓ Events round-trip!")
+
+
+def test_pack_plays_like_builtin():
+    """A pack of the built-in events should play the same game as the table"""
+    print("\nTesting a packed built-in catalog...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "builtin.acat")
+        write_pack(EVENTS.values(), path)
+        catalog = PackedCatalog(path)
+        assert list(catalog.names) == list(EVENT_NAMES)
+        assert _play(catalog) == _play(None)
+        catalog.close()
+    print("✓ Packed events play identically!")
+
+
+def test_large_pack_is_lazy():
+    """Opening a big pack should decode nothing, and lookups should be bounded"""
+    print("\nTesting lazy loading...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "big.acat")
+        write_pack(synthesize(5000), path)
+        catalog = PackedCatalog(path, cache_size=8)
+        assert len(catalog) == 5000 and catalog.decoded == 0
+        assert "russian_ai_4322" in catalog and "russian_ai" not in catalog
+        assert catalog.event("lobster_asylum_4998").intro[-1] == "(Variant 4998)"
+        for name in list(catalog.names)[:20]:
+            catalog.event(name)
+        assert len(catalog._cache) == 8
+        try:
+            catalog.event("missing")
+            assert False, "expected KeyError"
+        except KeyError:
+            pass
+        _play(catalog, turns=10)
+        catalog.close()
+    print("✓ Packs load lazily!")
+
+
+if __name__ == "__main__":
+    test_events_round_trip()
+    test_pack_plays_like_builtin()
+    test_large_pack_is_lazy()
+    print("\n✓ ALL CATALOG TESTS PASSED!")
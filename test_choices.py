@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the choice providers
+"""
+
+import random
+import threading
+
+from accelerando_game import AccelerandoGame
+from choices import PolicyChoices, QueuedChoices, ScriptedChoices
+from renderer import NullRenderer
+
+
+def test_scripted_session():
+    """A scripted run() should play real turns and stop when the script ends"""
+    print("Testing scripted choices...")
+    random.seed(8)
+    game = AccelerandoGame(NullRenderer(), ScriptedChoices([1, 2, 1, 2, 1]))
+    game.run()  # New Game, then two turns, then the script runs out
+    assert game.state.turn == 3 or game.state.game_over
+    print("✓ Scripted sessions play through run()!")
+
+
+def test_scripted_rejects_bad_choices():
+    """Out-of-range scripted choices should fail loudly"""
+    print("\nTesting scripted validation...")
+    game = AccelerandoGame(NullRenderer(), ScriptedChoices([7]))
+    try:
+        game.get_choice(4)
+    except ValueError:
+        print("✓ Invalid scripted choices are rejected!")
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_policy_choices():
+    """Policies see events; menus get the configured answer"""
+    print("\nTesting policy choices...")
+    seen = []
+
+    def policy(state, event, max_choice):
+        seen.append(event)
+        return 3
+
+    random.seed(2)
+    game = AccelerandoGame(NullRenderer(), PolicyChoices(policy, menu=3))
+    game.play_turn()
+    assert len(seen) == 1 and game.state.turn == 1
+    assert game.state.game_over  # The menu answered 3: Quit
+    print("✓ Policy choices drive events and menus!")
+
+
+def test_queued_choices_from_another_thread():
+    """Choices pushed from another thread should be consumed in order"""
+    print("\nTesting queued choices...")
+    provider = QueuedChoices(timeout=5)
+    game = AccelerandoGame(NullRenderer(), provider)
+    feeder = threading.Thread(target=provider.put, args=(1, 2, 1))
+    feeder.start()
+    random.seed(6)
+    game.main_menu()
+    game.play_turn()
+    feeder.join()
+    provider.close()
+    try:
+        game.get_choice(3)
+    except EOFError:
+        pass
+    else:
+        raise AssertionError("expected EOFError")
+    assert game.state.turn == 1
+    print("✓ Queued choices work across threads!")
+
+
+if __name__ == "__main__":
+    test_scripted_session()
+    test_scripted_rejects_bad_choices()
+    test_policy_choices()
+    test_queued_choices_from_another_thread()
+    print("\n✓ ALL CHOICE PROVIDER TESTS PASSED!")
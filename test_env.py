@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorised RL environment
+"""
+
+from batch import np
+from event_table import EVENT_NAMES, EVENTS, FIELD_INDEX
+from env import EVENT, OBSERVATION_FIELDS, VectorEnv, random_actions
+
+TURN = FIELD_INDEX["turn"]
+
+
+def test_reset_and_masks():
+    """Reset should start every game at turn 1 with its event's options masked"""
+    if np is None:
+        print("NumPy not installed; skipping")
+        return
+    print("Testing reset...")
+    env = VectorEnv(500, seed=1)
+    observations, info = env.reset()
+    assert observations.shape == (500, len(OBSERVATION_FIELDS))
+    assert (observations[:, TURN] == 1).all()
+    mask = info["action_mask"]
+    for row, event in zip(mask, observations[:, EVENT]):
+        assert row.sum() == len(EVENTS[EVENT_NAMES[event]].choices)
+    again, _ = VectorEnv(500, seed=1).reset()
+    assert (again == observations).all()
+    try:
+        env.step(np.full(500, env.action_count))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Reset and masks are right!")
+
+
+def test_auto_reset():
+    """Finished games should report once and restart on the next observation"""
+    if np is None:
+        print("NumPy not installed; skipping")
+        return
+    print("\nTesting auto-reset...")
+    env = VectorEnv(200, seed=2)
+    observations, info = env.reset()
+    episodes = 0
+    for _ in range(60):
+        # Always option 2 wins every game
+        observations, rewards, terminated, truncated, info = env.step(np.ones(200, int))
+        done = terminated | truncated
+        assert (rewards[done] == 1).all() and (rewards[~done] == 0).all()
+        if done.any():
+            final = info["final_observation"]
+            assert (final[done, FIELD_INDEX["singularity_progress"]] >= 100).all()
+            assert (observations[done, TURN] == 1).all()
+        episodes += int(done.sum())
+    assert episodes > 200
+    print(f"✓ {episodes} episodes reset automatically!")
+
+
+def test_random_win_rate():
+    """Random play should win about as often as in the simulator"""
+    if np is None:
+        print("NumPy not installed; skipping")
+        return
+    print("\nTesting random play...")
+    env = VectorEnv(1000, seed=3)
+    agent = np.random.default_rng(4)
+    _, info = env.reset()
+    won = lost = 0
+    for _ in range(100):
+        _, rewards, terminated, truncated, info = env.step(
+            random_actions(info["action_mask"], agent))
+        won += int((rewards > 0).sum())
+        lost += int((rewards < 0).sum())
+    assert 0.62 < won / (won + lost) < 0.72
+    print(f"✓ Random play wins {won / (won + lost):.1%}!")
+
+
+if __name__ == "__main__":
+    test_reset_and_masks()
+    test_auto_reset()
+    test_random_win_rate()
+    print("\n✓ ALL ENVIRONMENT TESTS PASSED!")
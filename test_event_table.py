@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative event table
+"""
+
+import random
+from dataclasses import fields
+
+from accelerando_game import GameState
+from event_table import (EVENT_NAMES, EVENTS, FIELD_INDEX, STAT_FIELDS, play,
+                         regenerate)
+
+
+class FixedRoll:
+    """RNG stand-in whose randint always returns the same value"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def randint(self, low, high):
+        return max(low, min(high, self.value))
+
+
+def test_stat_fields_match_game_state():
+    """Delta vectors should cover every integer GameState field in order"""
+    print("Testing stat layout...")
+    ints = tuple(f.name for f in fields(GameState) if f.type in (int, "int"))
+    assert STAT_FIELDS == ints
+    assert GameState().vector() == tuple(getattr(GameState(), n) for n in ints)
+    print("✓ Stat layout matches GameState!")
+
+
+def test_table_covers_events():
+    """All six events should be present with four choices each"""
+    print("\nTesting table coverage...")
+    assert EVENT_NAMES == ("lobster_asylum", "patent_decision", "russian_ai",
+                           "pamela_confrontation", "aineko_advice",
+                           "idea_generation")
+    assert all(len(EVENTS[name].choices) == 4 for name in EVENT_NAMES)
+    print("✓ All events are tabulated!")
+
+
+def test_requirements_and_costs():
+    """Unmet requirements should pick the unmet outcome"""
+    print("\nTesting requirements...")
+    rich = GameState(influence=50, bandwidth=50).vector()
+    vector, outcome, _ = play("lobster_asylum", 1, rich, FixedRoll(1))
+    assert outcome.key == "success"
+    assert vector[FIELD_INDEX["influence"]] == 30
+    assert vector[FIELD_INDEX["bandwidth"]] == 20
+    assert vector[FIELD_INDEX["entities_helped"]] == 1
+
+    poor = GameState(influence=5).vector()
+    vector, outcome, _ = play("lobster_asylum", 1, poor, FixedRoll(1))
+    assert outcome.key == "unmet"
+    assert vector[FIELD_INDEX["dead_kittens"]] == 2
+    print("✓ Requirements are enforced!")
+
+
+def test_roll_thresholds():
+    """A roll must beat the threshold to succeed"""
+    print("\nTesting roll thresholds...")
+    start = GameState().vector()
+    assert play("russian_ai", 1, start, FixedRoll(41))[1].key == "success"
+    assert play("russian_ai", 1, start, FixedRoll(40))[1].key == "failure"
+    print("✓ Rolls use the same thresholds as before!")
+
+
+def test_bonus_and_reset():
+    """Random bonuses are drawn and resets zero the field"""
+    print("\nTesting bonuses and resets...")
+    start = GameState(pamela_relationship=35).vector()
+    vector, _, amount = play("idea_generation", 1, start, FixedRoll(7))
+    assert amount == 7
+    assert vector[FIELD_INDEX["ideas"]] == 17
+    vector, _, _ = play("pamela_confrontation", 4, start, FixedRoll(1))
+    assert vector[FIELD_INDEX["pamela_relationship"]] == 0
+    print("✓ Bonuses and resets work!")
+
+
+def test_regenerate():
+    """Regeneration advances the turn and adds resources in range"""
+    print("\nTesting regeneration...")
+    start = GameState().vector()
+    vector = regenerate(start, random.Random(1))
+    changes = [after - before for before, after in zip(start, vector)]
+    assert changes[FIELD_INDEX["turn"]] == 1
+    assert 5 <= changes[FIELD_INDEX["bandwidth"]] <= 10
+    assert changes[FIELD_INDEX["reputation"]] == 0
+    print("✓ Regeneration works!")
+
+
+if __name__ == "__main__":
+    test_stat_fields_match_game_state()
+    test_table_covers_events()
+    test_requirements_and_costs()
+    test_roll_thresholds()
+    test_bonus_and_reset()
+    test_regenerate()
+    print("\n✓ ALL EVENT TABLE TESTS PASSED!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the instrumentation layer
+"""
+
+import asyncio
+import os
+import tempfile
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import PolicyChoices
+from instrumentation import Metrics, MetricsDumper, instrument, uninstrument
+from renderer import NullRenderer
+from rng import RngStream
+from server import GameServer
+from simulator import random_policy
+from test_server import transcript
+
+
+def played_game(turns=40):
+    game = AccelerandoGame(NullRenderer(), PolicyChoices(random_policy(1)), rng=RngStream(1))
+    metrics = instrument(game)
+    for _ in range(turns):
+        if game.state.game_over:
+            game.state = GameState()
+        game.play_turn()
+    return game, metrics
+
+
+def test_counts_follow_play():
+    """Events, choices, outcomes and checks should add up to the turns played"""
+    print("Testing instrumented play...")
+    game, metrics = played_game()
+    snapshot = metrics.snapshot()
+    turns = snapshot["turn_seconds"][""]["count"]
+    assert turns == 40
+    assert sum(timing["count"] for timing in snapshot["event_seconds"].values()) == turns
+    event_choices = sum(count for labels, count in snapshot["choices"].items()
+                        if not labels.startswith("event=menu"))
+    assert event_choices == turns == sum(snapshot["outcomes"].values())
+    assert snapshot["check_seconds"]["rule=win"]["count"] == turns
+    assert snapshot["turn_seconds"][""]["cpu"] is not None
+    assert snapshot["get_choice_seconds"][""]["cpu"] is None
+    print(f"✓ {turns} turns counted!")
+
+
+def test_uninstrument_restores_methods():
+    """Removing instrumentation should leave the class methods in place"""
+    print("\nTesting uninstrument...")
+    game, metrics = played_game(5)
+    uninstrument(game)
+    assert "play_turn" not in vars(game) and "event_russian_ai" not in vars(game)
+    game.play_turn()
+    assert metrics.timings["turn", ()].count == 5
+    print("✓ Plain methods restored!")
+
+
+def test_openmetrics_dump():
+    """The dump should be OpenMetrics text with cumulative buckets"""
+    print("\nTesting OpenMetrics output...")
+    _, metrics = played_game()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metrics.txt")
+        MetricsDumper(metrics, path, interval=0.01).start().stop()
+        with open(path) as f:
+            text = f.read()
+    lines = text.splitlines()
+    assert lines[-1] == "# EOF"
+    assert "# TYPE accelerando_turn_seconds histogram" in lines
+    assert 'accelerando_turn_seconds_bucket{le="+Inf"} 40' in lines
+    assert "accelerando_turn_seconds_count 40" in lines
+    assert any(line.startswith('accelerando_outcomes_total{event=') for line in lines)
+    print("✓ OpenMetrics text written!")
+
+
+def test_server_sessions_share_metrics():
+    """Instrumented server sessions should report into one Metrics"""
+    print("\nTesting server metrics...")
+    metrics = Metrics()
+
+    async def run():
+        server = GameServer(seed=3, metrics=metrics)
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        await asyncio.gather(transcript(port, [1, 1, 2, 1]), transcript(port, [3, 1]))
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(run())
+    assert sum(metrics.snapshot()["choices"].values()) == 3
+    print("✓ Server sessions are instrumented!")
+
+
+if __name__ == "__main__":
+    test_counts_follow_play()
+    test_uninstrument_restores_methods()
+    test_openmetrics_dump()
+    test_server_sessions_share_metrics()
+    print("\n✓ ALL INSTRUMENTATION TESTS PASSED!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the save backends
+"""
+
+import os
+import random
+import tempfile
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import ScriptedChoices
+from journal import JournalBackend, JsonFileBackend
+from renderer import NullRenderer
+
+
+def states(count, seed=1):
+    """A sequence of states with small changes between them"""
+    rng = random.Random(seed)
+    state = GameState()
+    result = []
+    for turn in range(1, count + 1):
+        state = GameState(**state.to_dict())
+        state.turn = turn
+        state.reputation += rng.randint(-5, 5)
+        state.bandwidth += rng.randint(-10, 10)
+        result.append(state)
+    return result
+
+
+def test_json_backend_is_atomic():
+    """JSON saves should round trip and leave no temporary files"""
+    print("Testing atomic JSON saves...")
+    with tempfile.TemporaryDirectory() as directory:
+        backend = JsonFileBackend(os.path.join(directory, "save.json"))
+        state = GameState(reputation=77, turn=9)
+        backend.save(state)
+        backend.save(state)
+        assert backend.load() == state
+        assert os.listdir(directory) == ["save.json"]
+    print("✓ JSON saves are atomic!")
+
+
+def test_journal_replays_deltas():
+    """Loading should replay every record after the snapshot"""
+    print("\nTesting journal replay...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.json")
+        backend = JournalBackend(path, snapshot_every=7, sync_every=4)
+        history = states(20)
+        for state in history:
+            backend.save(state, ("idea_generation", 1))
+        backend.close()
+        assert len(backend.records()) == 20 % 7
+        assert backend.records()[-1][1:3] == ["idea_generation", 1]
+        assert JournalBackend(path).load() == history[-1]
+        assert backend.fsyncs < 20
+    print("✓ Journal replays to the latest state!")
+
+
+def test_torn_and_stale_records():
+    """A torn final line and records older than the snapshot are ignored"""
+    print("\nTesting crash recovery...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.json")
+        backend = JournalBackend(path, snapshot_every=1000)
+        history = states(5)
+        for state in history:
+            backend.save(state)
+        backend.close()
+        with open(path + ".journal", "a") as f:
+            f.write('[6,null,null,[[0,')  # Crash mid-append
+        recovered = JournalBackend(path)
+        assert recovered.load() == history[-1]
+        recovered.save(history[0])  # Appends after the torn tail was dropped
+        recovered.close()
+        assert JournalBackend(path).load() == history[0]
+
+        # A snapshot that already covers the journal's records
+        with open(path + ".journal") as f:
+            lines = f.read()
+        JournalBackend(path, snapshot_every=1)._snapshot(history[2], 6)
+        with open(path + ".journal", "w") as f:
+            f.write(lines)
+        assert JournalBackend(path).load() == history[2]
+    print("✓ Torn and stale records are ignored!")
+
+
+def test_game_autosave_with_journal():
+    """The game should autosave each turn through its backend"""
+    print("\nTesting game autosave...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.json")
+        random.seed(4)
+        game = AccelerandoGame(NullRenderer(), ScriptedChoices([2, 1, 2, 1, 2, 1]),
+                               saves=JournalBackend(path))
+        game.autosave = True
+        for _ in range(3):
+            game.play_turn()
+        game.saves.close()
+        loaded = AccelerandoGame(NullRenderer(), saves=JournalBackend(path))
+        assert loaded.load_game()
+        assert loaded.state == game.state
+        assert [record[1] for record in game.saves.records()][-1] == game.last_move[0]
+    print("✓ Autosave journals every turn!")
+
+
+if __name__ == "__main__":
+    test_json_backend_is_atomic()
+    test_journal_replays_deltas()
+    test_torn_and_stale_records()
+    test_game_autosave_with_journal()
+    print("\n✓ ALL JOURNAL TESTS PASSED!")
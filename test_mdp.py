@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the optimal-policy MDP solver
+"""
+
+from accelerando_game import GameState
+from event_table import EVENT_NAMES
+from mdp import SMALL_GRID, MDPSolver, np
+from simulator import fixed_policy, simulate
+
+
+TINY_GRID = dict(SMALL_GRID, ideas=(0, 20), influence=(0, 20, 40),
+                 bandwidth=(1, 30, 90))
+
+_solution = None
+
+
+def solve_tiny():
+    """Solve the tiny grid once for all tests"""
+    global _solution
+    if _solution is None:
+        _solution = MDPSolver(TINY_GRID).solve(tolerance=1e-5)
+    return _solution
+
+
+def test_values_are_probabilities():
+    """Values should be win probabilities and converge"""
+    print("Testing value iteration...")
+    if np is None:
+        print("○ NumPy not installed, skipped")
+        return
+    solution = solve_tiny()
+    assert solution.residual <= 1e-5
+    assert solution.values.min() >= 0.0 and solution.values.max() <= 1.0
+    assert solution.choices.shape == (len(EVENT_NAMES),) + solution.values.shape
+    assert solution.choices.min() >= 1 and solution.choices.max() <= 4
+    print("✓ Value iteration converges to probabilities!")
+
+
+def test_values_follow_the_rules():
+    """States next to victory should be worth more than states next to defeat"""
+    print("\nTesting values against the win/lose rules...")
+    if np is None:
+        print("○ NumPy not installed, skipped")
+        return
+    solution = solve_tiny()
+    close = GameState(singularity_progress=100, reputation=50)
+    doomed = GameState(reputation=5, dead_kittens=9, bandwidth=1)
+    assert solution.win_probability(close) > 0.99
+    assert solution.win_probability(doomed) < solution.win_probability(close)
+    print("✓ Values follow the rules!")
+
+
+def test_optimal_policy_beats_fixed_policies():
+    """Playing the solved policy should win at least as often as any fixed choice"""
+    print("\nTesting the solved policy in simulation...")
+    if np is None:
+        print("○ NumPy not installed, skipped")
+        return
+    optimal = simulate(1000, solve_tiny().policy(), seed=3).win_rate
+    for choice in range(1, 5):
+        # The tiny grid's policy is approximate; allow a game or two of noise
+        assert optimal >= simulate(1000, fixed_policy(choice), seed=3).win_rate - 0.005
+    print(f"✓ Solved policy wins {optimal:.1%} of games!")
+
+
+if __name__ == "__main__":
+    test_values_are_probabilities()
+    test_values_follow_the_rules()
+    test_optimal_policy_beats_fixed_policies()
+    print("\n✓ ALL MDP TESTS PASSED!")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the packed GameState encoding
+"""
+
+from accelerando_game import GameState
+from packed_state import (NARROW, WIDE, PackedState, count_packed, pack_many,
+                          unpack_many)
+
+
+def test_round_trip():
+    """Packing and unpacking should give back the same state"""
+    print("Testing pack/unpack round trip...")
+    state = GameState(reputation=-5, pamela_relationship=-20, turn=17,
+                      game_over=True, victory=False)
+    packed = PackedState.pack(state)
+    assert len(packed) == NARROW.size
+    assert packed.unpack() == state
+    assert packed.vector() == state.vector()
+    assert packed.game_over and not packed.victory
+    print(f"✓ Round trip works in {len(packed)} bytes!")
+
+
+def test_wide_values():
+    """Values beyond int16 should widen the record instead of failing"""
+    print("\nTesting wide records...")
+    state = GameState(bandwidth=100000, victory=True)
+    packed = PackedState.pack(state)
+    assert len(packed) == WIDE.size
+    assert packed.unpack() == state
+    print("✓ Large values round trip!")
+
+
+def test_usable_as_keys():
+    """Equal states should pack to equal, hashable keys"""
+    print("\nTesting packed states as keys...")
+    seen = {PackedState.pack(GameState(turn=3)): "a"}
+    assert seen[PackedState.pack(GameState(turn=3))] == "a"
+    assert PackedState.from_vector(GameState(turn=3).vector()) in seen
+    assert PackedState.pack(GameState(turn=4)) not in seen
+    assert not hasattr(PackedState.pack(GameState()), "__dict__")
+    print("✓ Packed states work as dictionary keys!")
+
+
+def test_bulk_buffer():
+    """Many states should pack into one contiguous buffer"""
+    print("\nTesting bulk packing...")
+    states = [GameState(turn=index, reputation=index * 3) for index in range(100)]
+    buffer = pack_many(states)
+    assert len(buffer) == 1 + 100 * NARROW.size
+    assert count_packed(buffer) == 100
+    assert unpack_many(buffer) == states
+
+    states.append(GameState(ideas=-70000))
+    wide = pack_many(states)
+    assert count_packed(wide) == 101 and unpack_many(wide) == states
+    assert unpack_many(pack_many([])) == []
+    print("✓ Bulk buffers round trip!")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_wide_values()
+    test_usable_as_keys()
+    test_bulk_buffer()
+    print("\n✓ ALL PACKED STATE TESTS PASSED!")
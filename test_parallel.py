@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel simulation runner
+"""
+
+from parallel import chunk_seed, plan_chunks, run_parallel
+
+
+def totals(result):
+    return (result.games, result.victories, result.defeats, result.timeouts,
+            dict(result.turns))
+
+
+def test_chunk_plan():
+    """Chunks cover every game and get distinct seeds"""
+    print("Testing chunk planning...")
+    chunks = plan_chunks(1050, seed=9, chunk_size=100)
+    assert len(chunks) == 11
+    assert sum(chunk.games for chunk in chunks) == 1050
+    assert len({chunk.seed for chunk in chunks}) == 11
+    assert chunk_seed(9, 3) == chunks[3].seed
+    print("✓ Chunk plans are deterministic!")
+
+
+def test_worker_count_does_not_change_results():
+    """Same seed gives identical totals on one or several workers"""
+    print("\nTesting determinism across worker counts...")
+    for engine in ("table", "batch"):
+        serial = run_parallel(600, seed=4, workers=1, engine=engine, chunk_size=150)
+        pooled = run_parallel(600, seed=4, workers=2, engine=engine, chunk_size=150)
+        assert totals(serial) == totals(pooled), engine
+        assert serial.games == 600
+    print("✓ Results are independent of the worker count!")
+
+
+if __name__ == "__main__":
+    test_chunk_plan()
+    test_worker_count_does_not_change_results()
+    print("\n✓ ALL PARALLEL TESTS PASSED!")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the evolutionary policy search
+"""
+
+from accelerando_game import GameState
+from batch import BATCH_POLICIES, BatchSimulator
+from event_table import EVENT_NAMES
+from policy_search import FitnessCache, TablePolicy, evaluate_all, search
+from simulator import simulate
+
+
+def test_table_policy_buckets():
+    """Scalar and batch forms of a table should pick the same options"""
+    print("Testing table policies...")
+    buckets = (("reputation", (30,)), ("influence", (10, 20)))
+    table = TablePolicy(tuple(range(len(EVENT_NAMES) * 6)), buckets)
+    assert table.bucket(GameState(reputation=10, influence=5)) == 0
+    assert table.bucket(GameState(reputation=10, influence=25)) == 2
+    assert table.bucket(GameState(reputation=30, influence=10)) == 4
+    assert table.choice(GameState(reputation=40, influence=15), EVENT_NAMES[1]) == 10
+    assert TablePolicy.from_dict(table.to_dict()) == table
+    assert TablePolicy.fixed(2).key() != TablePolicy.fixed(3).key()
+
+    always = TablePolicy.fixed(1)
+    for use_numpy in (False, True):
+        ours = BatchSimulator(300, always.batch_policy(), seed=4, use_numpy=use_numpy).run()
+        theirs = BatchSimulator(300, BATCH_POLICIES["first"], seed=4,
+                                use_numpy=use_numpy).run()
+        assert (ours.victories, ours.turns) == (theirs.victories, theirs.turns)
+    assert simulate(200, always.policy(), seed=2).victories == simulate(
+        200, lambda state, event, count: 1, seed=2).victories
+    print("✓ Table policies agree across engines!")
+
+
+def test_fitness_cache():
+    """A policy scored once should not be played again"""
+    print("\nTesting the fitness cache...")
+    cache = FitnessCache()
+    policies = [TablePolicy.fixed(1), TablePolicy.fixed(2), TablePolicy.fixed(1)]
+    first = evaluate_all(policies, 500, seed=1, cache=cache)
+    assert len(cache.entries) == 2 and first[0] == first[2]
+    second = evaluate_all(policies, 500, seed=1, cache=cache)
+    assert second == first and cache.hits >= 3
+    print("✓ Fitness cached per policy!")
+
+
+def test_search_improves():
+    """The search should never end below the best fixed policy it started from"""
+    print("\nTesting the search...")
+    found = search(games=500, seed=3, generations=3, population=8, workers=1)
+    fixed = evaluate_all([TablePolicy.fixed(choice) for choice in range(1, 5)], 500, seed=3)
+    assert found.fitness.win_rate >= max(entry.win_rate for entry in fixed)
+    assert [best for best, _ in found.history] == sorted(best for best, _ in found.history)
+    assert found.evaluated > 8
+    print("✓ Search keeps its best candidates!")
+
+
+if __name__ == "__main__":
+    test_table_policy_buckets()
+    test_fitness_cache()
+    test_search_improves()
+    print("\n✓ ALL POLICY SEARCH TESTS PASSED!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the output renderers
+"""
+
+import io
+import random
+from contextlib import redirect_stdout
+
+from accelerando_game import AccelerandoGame
+from renderer import BufferedRenderer, NullRenderer, TerminalRenderer
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class ScriptedGame(AccelerandoGame):
+    """Game that always picks the first option"""
+
+    def get_choice(self, max_choice):
+        self.renderer.flush()
+        return 1
+
+
+def play_turn_output(renderer, seed=4):
+    """Text written by one turn of a seeded game"""
+    captured = io.StringIO()
+    random.seed(seed)
+    with redirect_stdout(captured):
+        game = ScriptedGame(renderer)
+        game.play_turn()
+        renderer.flush()
+    return captured.getvalue()
+
+
+def test_terminal_matches_print():
+    """The terminal renderer should print exactly like print()"""
+    print("Testing terminal renderer...")
+    captured = io.StringIO()
+    with redirect_stdout(captured):
+        TerminalRenderer().write("a", "", "\nb")
+        TerminalRenderer().write()
+    assert captured.getvalue() == "a\n\n\nb\n\n"
+    print("✓ Terminal renderer matches print()!")
+
+
+def test_buffered_matches_terminal():
+    """Buffering should not change the text, only how it is written"""
+    print("\nTesting buffered renderer...")
+    assert play_turn_output(BufferedRenderer()) == play_turn_output(TerminalRenderer())
+    print("✓ Buffered output is identical!")
+
+
+def test_buffered_writes_once_per_flush():
+    """A whole turn should reach the stream in a single write"""
+    print("\nTesting buffered write count...")
+    stream = CountingStream()
+    game = AccelerandoGame(BufferedRenderer(stream))
+    game.display_stats()
+    game.display_victory()
+    assert stream.writes == 0
+    game.renderer.flush()
+    game.renderer.flush()
+    assert stream.writes == 1
+    print("✓ One write per flush!")
+
+
+def test_null_renderer_is_silent():
+    """The null renderer should discard everything"""
+    print("\nTesting null renderer...")
+    renderer = NullRenderer()
+    assert not renderer.enabled
+    assert play_turn_output(renderer) == ""
+    print("✓ Null renderer is silent!")
+
+
+if __name__ == "__main__":
+    test_terminal_matches_print()
+    test_buffered_matches_terminal()
+    test_buffered_writes_once_per_flush()
+    test_null_renderer_is_silent()
+    print("\n✓ ALL RENDERER TESTS PASSED!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for record/replay
+"""
+
+import asyncio
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import PolicyChoices, ScriptedChoices
+from renderer import NullRenderer
+from replay import Replay, record, record_games, run_replay, verify_many
+from simulator import random_policy
+from test_server import serve_and, transcript
+
+
+def test_replays_reproduce_games():
+    """Replaying a recording should reach the same final state"""
+    print("Testing replay round trip...")
+    game = AccelerandoGame(NullRenderer(), PolicyChoices(random_policy(3)))
+    replay = record(game, seed=42)
+    while not game.state.game_over and game.state.turn < 200:
+        game.play_turn()
+    replay = Replay.from_json(replay.to_json())
+    assert len(replay.choices) == len(replay.digests) == game.state.turn
+    result = run_replay(replay)
+    assert result.ok
+    assert result.state == game.state
+    print(f"✓ {game.state.turn} turns replayed exactly!")
+
+
+def test_divergence_is_reported_at_its_turn():
+    """A changed choice should be caught at the first turn it matters"""
+    print("\nTesting divergence detection...")
+    replays = record_games(50, seed=7)
+    assert verify_many(replays) == []
+
+    tampered = next(replay for replay in replays if len(replay.choices) > 6)
+    tampered.digests[5] ^= 1
+    assert verify_many(replays) == [(replays.index(tampered), 6)]
+
+    # A game that now ends before the recording does also diverges
+    short = Replay(tampered.seed, tampered.choices + bytearray([1] * 500),
+                   tampered.digests + [0] * 500)
+    assert run_replay(short).diverged_at is not None
+    print("✓ Divergent replays are reported with their turn!")
+
+
+def test_interactive_game_records_after_menu():
+    """run() should record event choices only, from the loaded state"""
+    print("\nTesting recording through run()...")
+    game = AccelerandoGame(NullRenderer(), ScriptedChoices([1, 2, 1, 3, 1]))
+    game.state = GameState(reputation=70)
+    replay = record(game, seed="menu")
+    game.run()
+    assert replay.start is None  # New Game was chosen
+    assert list(replay.choices) == [2, 3]
+    assert run_replay(replay).state == game.state
+    print("✓ Menu answers are not recorded!")
+
+
+def test_server_sessions_record_replays():
+    """Every server session should leave a replay that verifies"""
+    print("\nTesting server replays...")
+
+    async def players(port):
+        return await asyncio.gather(*(transcript(port, [2, 1, 3, 1, 1, 1, 4])
+                                      for _ in range(5)))
+
+    server, _ = asyncio.run(serve_and(players))
+    assert len(server.replays) == 5
+    assert all(len(replay.choices) == 4 for replay in server.replays)
+    assert verify_many(server.replays) == []
+    print("✓ Server replays verify!")
+
+
+if __name__ == "__main__":
+    test_replays_reproduce_games()
+    test_divergence_is_reported_at_its_turn()
+    test_interactive_game_records_after_menu()
+    test_server_sessions_record_replays()
+    print("\n✓ ALL REPLAY TESTS PASSED!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled win/lose rules
+"""
+
+import random
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import ScriptedChoices
+from renderer import BufferedRenderer
+from rules import DEFAULT_RULES, RuleSet, RuleTracker, rule
+
+
+def _reference(state: GameState):
+    """The rules as the game hard-coded them before rules.py"""
+    if ((state.singularity_progress >= 100 and state.reputation >= 50)
+            or (state.entities_helped >= 10 and state.reputation >= 75)):
+        return "victory"
+    if state.reputation <= 0:
+        return "reputation"
+    if state.dead_kittens >= 10:
+        return "dead_kittens"
+    if state.bandwidth <= 0:
+        return "bandwidth"
+    return None
+
+
+def _states(count: int, seed: int = 0):
+    generator = random.Random(seed)
+    state = GameState()
+    for _ in range(count):
+        field = generator.choice(("reputation", "singularity_progress", "entities_helped",
+                                  "dead_kittens", "bandwidth", "ideas", "turn"))
+        setattr(state, field, generator.randint(-5, 110))
+        yield GameState(**state.to_dict())
+
+
+def test_default_rules_match_reference():
+    """Every compiled form of the default rules should agree with the old checks"""
+    print("Testing the default rules...")
+    plain, tracked = RuleTracker(DEFAULT_RULES), RuleTracker(DEFAULT_RULES, tracking=True)
+    for state in _states(3000):
+        expected = _reference(state)
+        found = DEFAULT_RULES.first(state.vector())
+        assert (None if found is None else "victory" if found.victory
+                else found.name) == expected
+        assert bool(DEFAULT_RULES.victory(state)) == (expected == "victory")
+        cause = DEFAULT_RULES.cause(state)
+        assert bool(DEFAULT_RULES.defeat(state)) == (cause is not None)
+        if expected != "victory":
+            assert cause == expected
+        assert plain.check(state) is found and tracked.check(state) is found
+        assert tracked.rule is found
+    print("✓ Compiled rules agree with the reference!")
+
+
+def test_tracking_choice():
+    """Tracking should be picked for rule sets with many conditions per field"""
+    print("\nTesting when rules are tracked...")
+    assert not RuleTracker(DEFAULT_RULES).tracking
+    many = RuleSet([rule(f"v{level}", True, f"ideas >= {level}", f"influence >= {level}")
+                    for level in range(100, 140)],
+                   [rule("broke", False, "bandwidth <= 0")])
+    tracker = RuleTracker(many)
+    assert tracker.tracking and "c0 = f0 != m[0]" in tracker.source
+    state = GameState(ideas=120, influence=110)
+    assert tracker.check(state).name == "v100"
+    state.influence = 125
+    assert tracker.check(state).name == "v100"
+    state.ideas = state.influence = 0
+    assert tracker.check(state) is None
+    state.bandwidth = 0
+    assert tracker.check(state).name == "broke"
+    print("✓ Large rule sets are tracked!")
+
+
+def test_configured_rules_drive_the_game():
+    """A game should win and lose by its own rules and show the triggering message"""
+    print("\nTesting configured rules...")
+    custom = RuleSet.from_dict({
+        "victory": [{"name": "open_source", "when": ["patents_released >= 1"]}],
+        "defeat": [{"name": "burnout", "when": ["ideas < 12"],
+                    "message": ["\\nYou ran out of ideas."]}],
+    })
+    assert RuleSet.from_dict(custom.to_dict()).to_dict() == custom.to_dict()
+
+    renderer = BufferedRenderer()
+    game = AccelerandoGame(renderer, ScriptedChoices([]), rules=custom)
+    game.state = GameState(ideas=11)
+    assert not game.check_win_condition() and game.check_lose_condition()
+    assert game.finish_turn() and not game.state.victory
+    assert "You ran out of ideas." in "\n".join(renderer.lines)
+
+    game.state = GameState(patents_released=1)
+    assert game.check_win_condition() and game.finish_turn() and game.state.victory
+    print("✓ Configured rules win and lose games!")
+
+
+if __name__ == "__main__":
+    test_default_rules_match_reference()
+    test_tracking_choice()
+    test_configured_rules_drive_the_game()
+    print("\n✓ ALL RULES TESTS PASSED!")
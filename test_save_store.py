@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite save store
+"""
+
+import os
+import random
+import tempfile
+
+from accelerando_game import AccelerandoGame, GameState
+from choices import ScriptedChoices
+from renderer import NullRenderer
+from save_store import SaveStore
+
+
+def test_slots_round_trip():
+    """Each (player, slot) should hold its own state"""
+    print("Testing save slots...")
+    store = SaveStore(":memory:")
+    store.save("ada", GameState(turn=3))
+    store.save("ada", GameState(turn=5, victory=True, game_over=True), slot="b")
+    store.save("bob", GameState(turn=7))
+    store.save("ada", GameState(turn=4))  # Overwrites the default slot
+    assert store.load("ada") == GameState(turn=4)
+    assert store.load("ada", "b") == GameState(turn=5, victory=True, game_over=True)
+    assert store.load("carol") is None
+    assert store.count() == 3
+    print("✓ Save slots round trip!")
+
+
+def test_batched_commits():
+    """Single saves should be committed once per batch"""
+    print("\nTesting batched commits...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "saves.db")
+        store = SaveStore(path, batch_size=10)
+        for index in range(25):
+            store.save(f"p{index}", GameState(turn=index))
+        assert store.pending == 5
+        assert SaveStore(path).count() == 20
+        store.flush()
+        assert SaveStore(path).count() == 25
+        store.close()
+    print("✓ Saves are committed in batches!")
+
+
+def test_bulk_and_query():
+    """Bulk saves and loads should agree, and queries use the stat columns"""
+    print("\nTesting bulk APIs and queries...")
+    store = SaveStore(":memory:")
+    saves = [(f"p{index}", "default", GameState(turn=index, reputation=index * 2,
+                                                victory=index % 10 == 0))
+             for index in range(200)]
+    store.save_many(saves)
+    loaded = store.load_many()
+    assert len(loaded) == 200
+    assert loaded["p42", "default"] == saves[42][2]
+    assert list(store.load_many(["p1", "p2", "nobody"])) == [("p1", "default"), ("p2", "default")]
+    assert len(store.query(victory=True)) == 20
+    assert [player for player, _, _ in store.query(min_turn=195)] == \
+        ["p195", "p196", "p197", "p198", "p199"]
+    assert len(store.query(min_reputation=100, max_turn=59, limit=3)) == 3
+    try:
+        store.query(colour="red")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    print("✓ Bulk APIs and queries work!")
+
+
+def test_game_saves_into_store():
+    """A game should save and load through a store slot"""
+    print("\nTesting game integration...")
+    store = SaveStore(":memory:")
+    random.seed(5)
+    game = AccelerandoGame(NullRenderer(), ScriptedChoices([2]), saves=store.backend("ada"))
+    game.random_event()
+    game.save_game()
+    loaded = AccelerandoGame(NullRenderer(), saves=store.backend("ada"))
+    assert loaded.load_game() and loaded.state == game.state
+    assert not AccelerandoGame(NullRenderer(), saves=store.backend("bob")).load_game()
+    print("✓ Games save into the store!")
+
+
+def test_game_save_is_committed():
+    """A game's save should be on disk without any flush or close"""
+    print("\nTesting interactive saves are committed...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "saves.db")
+        store = SaveStore(path)
+        game = AccelerandoGame(NullRenderer(), saves=store.backend("alice"))
+        game.state.turn = 7
+        game.save_game()
+        reopened = SaveStore(path)
+        assert reopened.load("alice") == game.state
+        reopened.close()
+        store.close()
+    print("✓ Interactive saves are committed!")
+
+
+if __name__ == "__main__":
+    test_slots_round_trip()
+    test_batched_commits()
+    test_bulk_and_query()
+    test_game_saves_into_store()
+    test_game_save_is_committed()
+    print("\n✓ ALL SAVE STORE TESTS PASSED!")
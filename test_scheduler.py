@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the weighted, conditional event scheduler
+"""
+
+import os
+import random
+import tempfile
+from collections import Counter
+
+from catalog import PackedCatalog, write_pack
+from event_table import (BUILTIN, EVENTS, FIELD_INDEX, STAT_FIELDS, EventSpec, TableCatalog,
+                         preconditions)
+from rng import RngStream
+from scheduler import EventScheduler
+
+
+def _catalog() -> TableCatalog:
+    base = EVENTS["aineko_advice"].choices
+    return TableCatalog({
+        "common": EventSpec("common", base, weight=3.0),
+        "rare": EventSpec("rare", base, weight=1.0),
+        "romance": EventSpec("romance", base, when=preconditions(
+            {"pamela_relationship": (1, None)})),
+        "brainstorm": EventSpec("brainstorm", base, weight=2.0, when=preconditions(
+            {"ideas": (10, None), "bandwidth": (None, 50)})),
+    })
+
+
+def _vector(**stats) -> list:
+    vector = [0] * len(STAT_FIELDS)
+    for name, value in stats.items():
+        vector[FIELD_INDEX[name]] = value
+    return vector
+
+
+def test_builtin_draws_unchanged():
+    """The built-in catalog should draw exactly as rng.choice did"""
+    print("Testing the uniform fast path...")
+    scheduler = EventScheduler(BUILTIN)
+    assert scheduler.uniform
+    random.seed(5)
+    drawn = [scheduler.draw(_vector(), random) for _ in range(50)]
+    random.seed(5)
+    assert drawn == [random.choice(BUILTIN.names) for _ in range(50)]
+    print("✓ Built-in draws unchanged!")
+
+
+def test_preconditions_and_weights():
+    """Draws should only name eligible events, in proportion to their weights"""
+    print("\nTesting preconditions and weights...")
+    scheduler = EventScheduler(_catalog())
+    rng = RngStream(1)
+    for stats in ({}, {"pamela_relationship": 1}, {"ideas": 10, "bandwidth": 50},
+                  {"ideas": 10, "bandwidth": 51, "pamela_relationship": -3},
+                  {"ideas": 12, "bandwidth": 20, "pamela_relationship": 40}):
+        vector = _vector(**stats)
+        eligible = set(scheduler.eligible(vector))
+        assert {scheduler.draw(vector, rng) for _ in range(300)} == eligible, stats
+    counts = Counter(scheduler.draw(_vector(ideas=10), rng) for _ in range(60000))
+    assert abs(counts["common"] / counts["rare"] - 3.0) < 0.15
+    assert abs(counts["brainstorm"] / counts["rare"] - 2.0) < 0.1
+    assert len(scheduler.tables) <= 5
+    print("✓ Only eligible events drawn, by weight!")
+
+
+def test_pack_preserves_scheduling():
+    """Weights and preconditions should survive a pack round trip"""
+    print("\nTesting scheduling from a pack...")
+    catalog = _catalog()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scheduled.acat")
+        write_pack(catalog.events.values(), path)
+        packed = PackedCatalog(path)
+        assert list(packed.weights) == list(catalog.weights)
+        assert packed.conditions == list(catalog.conditions)
+        assert packed.event("brainstorm") == catalog.event("brainstorm")
+        vector = _vector(ideas=11, pamela_relationship=2)
+        assert (EventScheduler(packed).eligible(vector)
+                == EventScheduler(catalog).eligible(vector))
+        packed.close()
+    print("✓ Packs keep weights and preconditions!")
+
+
+if __name__ == "__main__":
+    test_builtin_draws_unchanged()
+    test_preconditions_and_weights()
+    test_pack_preserves_scheduling()
+    print("\n✓ ALL SCHEDULER TESTS PASSED!")
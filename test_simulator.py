@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless simulator
+"""
+
+import io
+import random
+from contextlib import redirect_stdout
+
+from accelerando_game import GameState
+from event_table import EVENTS
+from simulator import (SimulationResult, defeat_cause, fixed_policy,
+                       play_game, play_table_game, random_policy, simulate)
+
+
+def test_play_game_is_silent():
+    """A headless game should finish without writing to stdout"""
+    print("Testing headless play...")
+    captured = io.StringIO()
+    with redirect_stdout(captured):
+        state = play_game(random_policy(1))
+    assert captured.getvalue() == ""
+    assert state.game_over or state.turn == 500
+    print("✓ Headless games produce no output!")
+
+
+def test_policy_sees_events():
+    """The policy should be asked about real events only"""
+    print("\nTesting policy callbacks...")
+    seen = set()
+
+    def policy(state, event, max_choice):
+        seen.add((event, max_choice))
+        return 2
+
+    simulate(20, policy, seed=3)
+    assert seen
+    assert all(event in EVENTS and max_choice == 4
+               for event, max_choice in seen)
+    print("✓ Policies receive event names!")
+
+
+def test_table_game_matches_play_turn():
+    """The table-driven loop should reproduce the interactive game exactly"""
+    print("\nTesting table engine against play_turn...")
+    for seed in range(25):
+        random.seed(seed)
+        expected = play_game(random_policy(seed))
+        random.seed(seed)
+        actual = play_table_game(random_policy(seed))
+        assert actual == expected, seed
+    print("✓ Table engine matches the interactive game!")
+
+
+def test_simulate_is_reproducible():
+    """Same seed and policy should give the same totals"""
+    print("\nTesting reproducibility...")
+    first = simulate(200, fixed_policy(1), seed=7)
+    second = simulate(200, fixed_policy(1), seed=7)
+    assert first.games == 200
+    assert first.victories + sum(first.defeats.values()) + first.timeouts == 200
+    assert (first.victories, first.defeats, first.turns) == \
+        (second.victories, second.defeats, second.turns)
+    print("✓ Seeded simulations are reproducible!")
+
+
+def test_defeat_cause_order():
+    """Defeat causes follow display_defeat's precedence"""
+    print("\nTesting defeat causes...")
+    assert defeat_cause(GameState()) is None
+    assert defeat_cause(GameState(reputation=0, dead_kittens=12)) == "reputation"
+    assert defeat_cause(GameState(dead_kittens=10, bandwidth=0)) == "dead_kittens"
+    assert defeat_cause(GameState(bandwidth=-5)) == "bandwidth"
+    print("✓ Defeat causes are classified correctly!")
+
+
+def test_merge_results():
+    """Merged results should add up"""
+    print("\nTesting result merging...")
+    total = SimulationResult()
+    total.merge(simulate(50, fixed_policy(2), seed=1))
+    total.merge(simulate(50, fixed_policy(2), seed=2))
+    assert total.games == 100
+    assert sum(total.turns.values()) == 100
+    print("✓ Results merge correctly!")
+
+
+if __name__ == "__main__":
+    test_play_game_is_silent()
+    test_policy_sees_events()
+    test_table_game_matches_play_turn()
+    test_simulate_is_reproducible()
+    test_defeat_cause_order()
+    test_merge_results()
+    print("\n✓ ALL SIMULATOR TESTS PASSED!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the exact outcome solver
+"""
+
+import random
+
+from accelerando_game import GameState, defeat_reached, victory_reached
+from event_table import EVENT_NAMES, play, regenerate
+from solver import ExactSolver
+
+
+def sample_victories(state, choice, turns, games, seed):
+    """Monte Carlo estimate of P(victory) within `turns` turns"""
+    rng = random.Random(seed)
+    wins = 0
+    for _ in range(games):
+        vector = state.vector()
+        for _ in range(turns):
+            vector = regenerate(vector, rng)
+            vector = play(rng.choice(EVENT_NAMES), choice, vector, rng)[0]
+            game = GameState(*vector)
+            if victory_reached(game):
+                wins += 1
+                break
+            if defeat_reached(game):
+                break
+    return wins / games
+
+
+def test_probabilities_sum_to_one():
+    """All outcome probabilities together should cover every game"""
+    print("Testing probability mass...")
+    state = GameState(singularity_progress=92, reputation=40)
+    result = ExactSolver(dict.fromkeys(EVENT_NAMES, 1), max_turns=2).evaluate(state)
+    total = result.victory + result.defeat + result.timeout
+    assert abs(total - 1.0) < 1e-9
+    assert 1.0 <= result.turns <= 2.0
+    print("✓ Probabilities sum to one!")
+
+
+def test_matches_monte_carlo():
+    """Exact answers should agree with sampling"""
+    print("\nTesting against Monte Carlo...")
+    state = GameState(singularity_progress=90, reputation=45, dead_kittens=8)
+    exact = ExactSolver(dict.fromkeys(EVENT_NAMES, 1), max_turns=2).evaluate(state)
+    sampled = sample_victories(state, 1, 2, 20000, seed=11)
+    assert abs(exact.victory - sampled) < 0.02, (exact.victory, sampled)
+    print("✓ Exact solver agrees with sampling!")
+
+
+def test_policy_forms_agree():
+    """A mapping, a callable and the uniform policy are all supported"""
+    print("\nTesting policy forms...")
+    state = GameState(singularity_progress=95, reputation=52)
+    mapping = ExactSolver(dict.fromkeys(EVENT_NAMES, 3), max_turns=1).evaluate(state)
+    callback = ExactSolver(lambda s, e, n: 3, max_turns=1).evaluate(state)
+    assert abs(mapping.victory - callback.victory) < 1e-12
+    uniform = ExactSolver(None, max_turns=1).evaluate(state)
+    assert 0.0 < uniform.victory < 1.0
+    print("✓ Policy forms agree!")
+
+
+def test_cache_is_bounded():
+    """The transposition table should evict beyond its size"""
+    print("\nTesting cache bound...")
+    solver = ExactSolver(dict.fromkeys(EVENT_NAMES, 2), max_turns=2, cache_size=50)
+    solver.evaluate(GameState(singularity_progress=90))
+    assert len(solver.cache) <= 50 and solver.evictions > 0
+    print("✓ Cache stays within its bound!")
+
+
+if __name__ == "__main__":
+    test_probabilities_sum_to_one()
+    test_matches_monte_carlo()
+    test_policy_forms_agree()
+    test_cache_is_bounded()
+    print("\n✓ ALL SOLVER TESTS PASSED!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the startup harness and the zygote launcher
+"""
+
+import os
+import socket
+
+from startup import PROMPT, import_times, parse_importtime, start_zygote
+
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _typing
+import time:      3000 |       3120 | typing
+import time:       900 |       4020 | accelerando_game
+"""
+
+
+def test_parse_importtime():
+    """importtime lines should parse into module, times and depth"""
+    print("Testing -X importtime parsing...")
+    entries = parse_importtime(SAMPLE)
+    assert [entry.module for entry in entries] == ["_typing", "typing", "accelerando_game"]
+    assert entries[0].depth == 1 and entries[1].depth == 0
+    assert entries[2].cumulative_us == 4020
+    print("✓ Import times parsed!")
+
+
+def test_game_import_skips_typing():
+    """The game's own modules should not pull in typing or queue"""
+    print("\nTesting lazy imports...")
+    modules = {entry.module for entry in import_times()}
+    assert "accelerando_game" in modules and "event_table" in modules
+    assert "typing" not in modules
+    assert "queue" not in modules
+    print(f"✓ {len(modules)} modules imported, typing not among them!")
+
+
+def test_zygote_serves_games():
+    """Each connection should get a fresh game from a warm child"""
+    print("\nTesting the zygote launcher...")
+    if not hasattr(os, "fork"):
+        print("○ os.fork not available, skipped")
+        return
+    process, port = start_zygote(workers=2)
+    try:
+        for _ in range(3):
+            with socket.create_connection(("127.0.0.1", port), timeout=10) as connection:
+                received = b""
+                while PROMPT not in received:
+                    received += connection.recv(4096)
+                assert b"ACCELERANDO" in received
+                connection.sendall(b"3\n")
+                while True:
+                    chunk = connection.recv(4096)
+                    if not chunk:
+                        break
+    finally:
+        process.terminate()
+        process.wait()
+    print("✓ Zygote children serve games!")
+
+
+if __name__ == "__main__":
+    test_parse_importtime()
+    test_game_import_skips_typing()
+    test_zygote_serves_games()
+    print("\n✓ ALL STARTUP TESTS PASSED!")
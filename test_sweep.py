@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the parameter sweep harness
+"""
+
+import tempfile
+
+from event_table import EVENTS, FIELD_INDEX
+from rules import DEFAULT_RULES
+from simulator import random_policy, simulate
+from sweep import ResultCache, apply, grid, parameters, run_sweep, sensitivity
+
+
+def test_apply_parameters():
+    """Overrides should change copies only and round-trip through parameters()"""
+    print("Testing parameter overrides...")
+    defaults = parameters()
+    assert defaults["lobster_asylum.1.cost.influence"] == 20
+    assert defaults["rules.ascension.reputation"] == 50
+    overrides = {"lobster_asylum.1.cost.influence": 12, "russian_ai.1.roll": 35,
+                 "rules.ascension.reputation": 60}
+    events, rules = apply(overrides)
+    tuned = parameters(events, rules)
+    assert all(tuned[key] == value for key, value in overrides.items())
+    assert tuned["lobster_asylum.1.requires.influence"] == 12
+    option = events["lobster_asylum"].choices[0]
+    assert option.success.delta[FIELD_INDEX["influence"]] == -12
+    assert parameters() == defaults and EVENTS["lobster_asylum"].choices[0].requires[0][1] == 20
+    assert DEFAULT_RULES.victories[0].conditions[1][2] == 50
+    try:
+        apply({"lobster_asylum.9.roll": 1})
+        assert False, "expected KeyError"
+    except KeyError:
+        pass
+    print("✓ Overrides apply to copies!")
+
+
+def test_defaults_match_simulator():
+    """The default parameter set should score exactly like the simulator"""
+    print("\nTesting the default point...")
+    (_, score), = run_sweep([{}], games=400, seed=3, workers=1)[0]
+    result = simulate(400, random_policy(3), seed=3)
+    assert (score.games, score.victories) == (result.games, result.victories)
+    assert score.turns == sum(turns * count for turns, count in result.turns.items())
+    print("✓ Default point matches the simulator!")
+
+
+def test_cache_and_sensitivity():
+    """A repeated sweep should come from the cache, and sensitivity should rank keys"""
+    print("\nTesting the result cache...")
+    sets = grid({"rules.ascension.reputation": [40, 90], "russian_ai.1.roll": [40, 41]})
+    assert len(sets) == 4
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(directory)
+        first, computed = run_sweep(sets, games=200, seed=1, workers=1, cache=cache)
+        assert computed == 4
+        second, computed = run_sweep(sets, games=200, seed=1, workers=1, cache=cache)
+        assert computed == 0 and second == first
+        _, computed = run_sweep(sets, games=201, seed=1, workers=1, cache=cache)
+        assert computed == 4
+    report = sensitivity(first)
+    assert report[0].key == "rules.ascension.reputation"
+    assert [value for value, _, _ in report[0].levels] == [40, 90]
+    assert report[0].levels[0][1] > report[0].levels[1][1]
+    print("✓ Cached results reused and sensitivity ranked!")
+
+
+if __name__ == "__main__":
+    test_apply_parameters()
+    test_defaults_match_simulator()
+    test_cache_and_sensitivity()
+    print("\n✓ ALL SWEEP TESTS PASSED!")